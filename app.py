@@ -1,5 +1,60 @@
 import streamlit as st
-import traceback
+import json
+import time
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from config import INTERVALO_SONDEO_SEGUNDOS
+from informe_word import formatear_parrafos
+from secciones import NOMBRES_SECCIONES, SECCIONES, SECCIONES_RAZONAMIENTO, estimar_ahorro
+from trabajos import ETAPAS, PlanificadorTrabajos, TrabajoAnalisis, TrabajoRechazado, clave_trabajo
+
+
+@st.cache_resource
+def planificador_compartido() -> PlanificadorTrabajos:
+    # Un solo pool de procesos para todas las sesiones del servidor: el
+    # análisis de una sesión no frena la página de las demás.
+    return PlanificadorTrabajos()
+
+
+def usuario_actual() -> str:
+    # Cada sesión del navegador cuenta como un usuario en el reparto de turnos.
+    return get_script_run_ctx().session_id
+
+
+def parametros_simulacion():
+    # Controles de la simulación de pesos y umbrales. Todas las pestañas se
+    # dibujan en cada rerun, así que sus valores se conservan en la sesión.
+    from corpus import CRITERIOS, ParametrosPuntuacion
+
+    base = ParametrosPuntuacion()
+    pestanas = st.tabs(["Pesos y C5"] + list(base.escaleras))
+    with pestanas[0]:
+        pesos = {
+            c: st.slider(f"Peso de {c}", 0.0, 5.0, float(base.pesos.get(c, 1.0)), 0.5, key=f"peso_{c}")
+            for c in CRITERIOS
+        }
+        umbral_c5 = st.slider(
+            "C5 por debajo del cual se penaliza el ICI", 0, 100,
+            int(base.umbral_penalizacion_c5), key="umbral_c5",
+        )
+        maxima_c5 = st.slider(
+            "Penalización máxima por C5 (puntos)", 0, 40,
+            int(base.penalizacion_maxima_c5), key="penalizacion_c5",
+        )
+    escaleras = {}
+    for pestana, (criterio, (umbrales, puntajes)) in zip(pestanas[1:], base.escaleras.items()):
+        with pestana:
+            nuevos = [
+                st.slider(
+                    f"{criterio}: {puntajes[k + 1]} puntos desde (coincidencias)", 0, 30,
+                    int(u), key=f"umbral_{criterio}_{k}",
+                )
+                for k, u in enumerate(umbrales)
+            ]
+            # Si se cruzan dos controles, los umbrales se reordenan.
+            escaleras[criterio] = (tuple(sorted(nuevos)), puntajes)
+    return ParametrosPuntuacion(escaleras, umbral_c5, maxima_c5, pesos)
+
 
 # ==============================
 #   TÍTULO PRINCIPAL
@@ -22,6 +77,30 @@ opcion = st.radio(
 )
 
 texto_bruto = ""
+datos_archivo = None
+nombre_archivo = None
+
+diagnostico = st.checkbox(
+    "Mostrar diagnóstico de rendimiento (tiempos y memoria por etapa)",
+    help="Mide extracción, criterios C1–C12, bloques de reglas e informe. "
+         "El análisis es más lento en este modo y no usa la caché.",
+)
+
+acotar = st.checkbox(
+    "Analizar solo algunas secciones de la sentencia",
+    help="Omite, por ejemplo, los antecedentes y la transcripción de la acusación "
+         "o de las declaraciones: es más rápido y evita falsos positivos. Si no se "
+         "reconocen los encabezados de la sentencia, se analiza el texto completo.",
+)
+secciones = None
+if acotar:
+    secciones = st.multiselect(
+        "Secciones a analizar",
+        SECCIONES,
+        default=list(SECCIONES_RAZONAMIENTO),
+        format_func=NOMBRES_SECCIONES.get,
+    )
+
 
 
 # =================================================
@@ -36,35 +115,14 @@ if opcion == "Subir archivo PDF/Word":
     )
 
     if archivo is not None:
-        st.info("📄 Archivo recibido. Iniciando extracción de texto…")
-
-        try:
-            from extractores import leer_pdf, leer_word
-        except Exception:
-            st.error("❌ Error al importar el módulo `extractores.py`.")
-            st.code(traceback.format_exc())
-            st.stop()
-
-        try:
-            archivo.seek(0)
-            nombre = archivo.name.lower()
-
-            if nombre.endswith(".pdf"):
-                texto_bruto = leer_pdf(archivo)
-            elif nombre.endswith(".docx") or nombre.endswith(".doc"):
-                texto_bruto = leer_word(archivo)
-            else:
-                st.error("Formato no reconocido.")
-                st.stop()
-
-            if not texto_bruto or texto_bruto.strip() == "":
-                st.warning("⚠ No se pudo extraer texto del archivo.")
-            else:
-                st.success("✔ Texto extraído correctamente.")
-
-        except Exception:
-            st.error("❌ Error al procesar el archivo.")
-            st.code(traceback.format_exc())
+        nombre = archivo.name.lower()
+        if nombre.endswith(".pdf") or nombre.endswith(".docx") or nombre.endswith(".doc"):
+            # La extracción corre con el análisis, en segundo plano.
+            datos_archivo = archivo.getvalue()
+            nombre_archivo = nombre
+            st.info("📄 Archivo recibido. El texto se extrae al iniciar el análisis.")
+        else:
+            st.error("Formato no reconocido.")
             st.stop()
 
 
@@ -87,50 +145,177 @@ if opcion == "Pegar texto manualmente":
 #   BOTÓN PARA INICIAR ANÁLISIS
 # =================================================
 
+# El análisis corre en el pool compartido (trabajos.PlanificadorTrabajos) y se
+# guarda en la sesión: los reruns solo muestran su avance, y uno terminado no
+# se repite.
+
 if st.button("🔍 Iniciar Análisis Indiciario"):
 
-    if texto_bruto.strip() == "":
+    if datos_archivo is not None:
+        datos, nombre = datos_archivo, nombre_archivo
+    elif texto_bruto.strip() != "":
+        datos, nombre = texto_bruto, None
+    else:
         st.error("❌ No hay texto para analizar.")
         st.stop()
 
-    st.info("🧠 Iniciando análisis… Por favor espera.")
+    previo = st.session_state.get("trabajo")
+    clave = clave_trabajo(datos, nombre, secciones, diagnostico)
+    if previo is None or previo.clave != clave or previo.estado in ("cancelado", "error"):
+        if previo is not None and previo.activo:
+            previo.cancelar()
+        try:
+            st.session_state["trabajo"] = planificador_compartido().encolar(
+                TrabajoAnalisis(datos, nombre, secciones, diagnostico), usuario_actual()
+            )
+        except TrabajoRechazado as e:
+            st.error(f"❌ {e}")
+            st.stop()
 
-    # Importamos los módulos de análisis dentro del botón
-    try:
-        from evaluador import evaluar_todo
-        from incongruencias import analizar_incongruencias
-        from informe_word import generar_informe
-    except Exception:
-        st.error("❌ Error al cargar los módulos de análisis.")
-        st.code(traceback.format_exc())
-        st.stop()
 
-    try:
-        resultados = evaluar_todo(texto_bruto)
-        incong = analizar_incongruencias(texto_bruto, resultados)
+# =================================================
+#   AVANCE Y RESULTADOS DEL TRABAJO
+# =================================================
 
-        # Mostrar resultados
-        st.subheader("📊 Resultados del análisis (C1–C12)")
-        st.json(resultados)
+trabajo = st.session_state.get("trabajo")
+
+if trabajo is not None:
+
+    if trabajo.estado == "en_espera":
+        planificador = planificador_compartido()
+        delante = planificador.posicion(trabajo)
+        if delante is not None:
+            ocupacion = planificador.estado()
+            st.info(
+                f"🕒 En cola: {delante} trabajo(s) por delante del tuyo "
+                f"({ocupacion['en_curso']} en curso en {ocupacion['procesos']} procesos)."
+            )
+    elif trabajo.activo:
+        st.info("🧠 Análisis en curso…" if not trabajo.cancelando else "⏹ Cancelando…")
+    if trabajo.activo:
+        st.progress(trabajo.fraccion(), text=trabajo.resumen(trabajo.etapa or ETAPAS[0]))
+        if st.button("⏹ Cancelar análisis", disabled=trabajo.cancelando):
+            trabajo.cancelar()
+    for etapa in ETAPAS:
+        st.caption(trabajo.resumen(etapa))
+
+    if trabajo.estado == "cancelado":
+        st.warning("⏹ Análisis cancelado. Puedes iniciarlo de nuevo.")
+    elif trabajo.estado == "error":
+        st.error(f"❌ Error durante el análisis indiciario: {trabajo.error}")
+        with st.expander("Detalle del error"):
+            st.code(trabajo.detalle)
+
+    if trabajo.modos_pdf:
+        completas = [n for n, modo in enumerate(trabajo.modos_pdf, start=1) if modo == "completo"]
+        st.caption(
+            f"📄 Extracción: {len(trabajo.modos_pdf) - len(completas)} de {len(trabajo.modos_pdf)} "
+            f"páginas en modo rápido"
+            + (f"; modo completo en las páginas {formatear_parrafos(completas)}." if completas else ".")
+        )
+
+    resultados = trabajo.resultados
+    incong = trabajo.incongruencias
+    ambito = (resultados or {}).get("ambito")
+
+    if ambito is not None and incong is not None:
+        if ambito["acotado"]:
+            ahorro = estimar_ahorro(trabajo.segundos_analisis, ambito)
+            st.info(
+                f"✂ Se analizaron {ambito['parrafos']} de {ambito['parrafos_totales']} "
+                f"párrafos ({ambito['caracteres'] / max(ambito['caracteres_totales'], 1):.0%} "
+                f"del texto) en {trabajo.segundos_analisis:.2f} s"
+                + (f"; ahorro estimado: {ahorro:.2f} s." if ahorro is not None else ".")
+            )
+        else:
+            st.warning("⚠ No se reconocieron las secciones de la sentencia; se analizó el texto completo.")
+        with st.expander("📑 Secciones detectadas"):
+            st.dataframe(trabajo.tramos, use_container_width=True)
+
+    # Resultados provisionales: mientras se extrae el PDF, sobre las páginas ya leídas.
+    provisional = trabajo.provisional
+    if provisional is not None and incong is None and trabajo.activo:
+        st.subheader(f"⏳ Resultados provisionales ({provisional['paginas']} páginas con texto leídas)")
+        if resultados is None:
+            col1, col2 = st.columns(2)
+            col1.metric("ICI ajustado (provisional)", provisional["resultados"]["ICI_ajustado"])
+            col2.metric(
+                "ICI sin penalización (provisional)", provisional["resultados"]["ICI_sin_penalizacion"]
+            )
+        st.caption(
+            "Pueden cambiar con el resto del documento: las reglas de pares y globales "
+            "(convergencia, contraposiciones) se resuelven al terminar la extracción."
+        )
+        with st.expander(f"🧩 Hallazgos provisionales ({len(provisional['incongruencias'])})"):
+            st.json(provisional["incongruencias"])
 
+    # Resultados parciales: los criterios se muestran mientras siguen las reglas.
+    if resultados is not None:
+        st.subheader("📊 Resultados del análisis (C1–C12)")
+        st.json({k: v for k, v in resultados.items() if k not in ("conteos", "cercanos_C7")})
+
+    # Simulación: se re-puntúa desde los conteos guardados, sin volver a analizar.
+    if resultados is not None and "conteos" in resultados:
+        with st.expander("🎚 Simular otros pesos y umbrales"):
+            from corpus import CRITERIOS, repuntuar
+
+            parametros = parametros_simulacion()
+            t0 = time.perf_counter()
+            simulado = repuntuar(resultados, parametros)
+            milisegundos = (time.perf_counter() - t0) * 1000
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric(
+                "ICI ajustado", simulado["ICI_ajustado"],
+                delta=round(simulado["ICI_ajustado"] - resultados["ICI_ajustado"], 2),
+            )
+            col2.metric(
+                "ICI sin penalización", simulado["ICI_sin_penalizacion"],
+                delta=round(simulado["ICI_sin_penalizacion"] - resultados["ICI_sin_penalizacion"], 2),
+            )
+            col3.metric("ICI ponderado", simulado["ICI_ponderado"])
+            st.caption(f"{simulado['interpretacion']} (recalculado en {milisegundos:.1f} ms)")
+            st.dataframe(
+                [
+                    {"criterio": c, "actual": resultados["criterios"][c], "simulado": simulado["criterios"][c]}
+                    for c in CRITERIOS
+                ],
+                use_container_width=True,
+            )
+            st.download_button(
+                "⬇ Descargar parámetros (JSON)",
+                data=json.dumps(parametros.como_dict(), ensure_ascii=False, indent=2),
+                file_name="Parametros_ICI_V5.json",
+                mime="application/json",
+                help="Para re-puntuar un lote ya procesado: python -m corpus resultados.jsonl --parametros …",
+            )
+
+    if incong is not None:
         st.subheader("🧩 Incongruencias detectadas")
         st.json(incong)
 
-        # Generar informe
-        st.info("📑 Generando informe…")
-
-        docx_bytes = generar_informe(texto_bruto, resultados, incong)
-
+    if trabajo.informe is not None:
         st.success("✔ Informe generado exitosamente.")
 
         st.download_button(
             "⬇ Descargar Informe Word (ICI-V5)",
-            data=docx_bytes,
+            data=trabajo.informe,
             file_name="Informe_ICI_V5.docx",
             mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
         )
 
-    except Exception:
-        st.error("❌ Error durante el análisis indiciario.")
-        st.code(traceback.format_exc())
-        st.stop()
+    perfil = trabajo.perfil
+    if perfil is not None and trabajo.estado == "terminado":
+        with st.expander("🛠 Diagnóstico de rendimiento"):
+            st.dataframe(perfil.filas(), use_container_width=True)
+            st.download_button(
+                "⬇ Descargar diagnóstico (JSON)",
+                data=perfil.a_json(),
+                file_name="Diagnostico_ICI_V5.json",
+                mime="application/json",
+            )
+
+    # Sondeo: mientras el trabajo siga activo, se vuelve a dibujar la página.
+    if trabajo.activo:
+        time.sleep(INTERVALO_SONDEO_SEGUNDOS)
+        st.rerun()
@@ -0,0 +1,9 @@
+"""
+Scripts de medición de rendimiento del sistema ICI-V5.
+
+Se ejecutan desde la raíz del repositorio, por ejemplo:
+
+    python -m benchmarks.bench_escaner
+    python -m benchmarks.bench_extraccion_pdf expediente.pdf
+    python -m benchmarks.bench_pipeline --guardar base.json
+"""
@@ -0,0 +1,80 @@
+"""
+Benchmark de la puntuación de un corpus: documento a documento
+(puntuar_criterios + calcular_ici) frente a corpus.puntuar_corpus sobre la
+matriz documentos × patrones.
+
+Escanea --muestras sentencias sintéticas y arma con sus filas (repetidas al
+azar) una matriz de --documentos filas; mide solo la puntuación, que es lo
+que se repite al cambiar pesos o umbrales, y comprueba que ambos caminos dan
+los mismos criterios e ICI.
+
+    python -m benchmarks.bench_corpus [--documentos 50000] [--muestras 200]
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.generador import generar_sentencia
+from corpus import COLUMNAS, matriz_conteos, puntuar_corpus, resultado_documento
+from evaluador import calcular_ici, puntuar_criterios
+
+
+def _conteos_fila(fila: np.ndarray) -> Dict[str, List[int]]:
+    conteos: Dict[str, List[int]] = {}
+    for (grupo, _), valor in zip(COLUMNAS, fila.tolist()):
+        conteos.setdefault(grupo, []).append(valor)
+    return conteos
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documentos", type=int, default=50000)
+    parser.add_argument("--muestras", type=int, default=200, help="sentencias que se escanean")
+    parser.add_argument("--parrafos", type=int, default=60, help="párrafos de cada sentencia")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    muestras, cercanos = matriz_conteos(
+        generar_sentencia(args.parrafos, semilla=i) for i in range(args.muestras)
+    )
+    escaneo = time.perf_counter() - t0
+    print(f"escaneo: {args.muestras} sentencias en {escaneo:.2f} s "
+          f"({escaneo / args.muestras * 1000:.1f} ms/sentencia)")
+
+    elegidas = np.random.default_rng(0).integers(0, args.muestras, args.documentos)
+    matriz = muestras[elegidas]
+    cercanos = None if cercanos is None else cercanos[elegidas]
+
+    # Los dicts de conteos se arman fuera de la medición.
+    filas = [_conteos_fila(fila) for fila in muestras]
+    cercanos_filas = [None] * args.muestras if cercanos is None else cercanos.tolist()
+
+    t0 = time.perf_counter()
+    por_documento = [
+        calcular_ici(puntuar_criterios(filas[k], cercanos_filas[k])) for k in elegidas.tolist()
+    ]
+    python = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    puntuacion = puntuar_corpus(matriz, cercanos)
+    vectorizado = time.perf_counter() - t0
+
+    distintos = 0
+    for i, esperado in enumerate(por_documento):
+        obtenido = resultado_documento(puntuacion, i)
+        del obtenido["ICI_ponderado"]
+        distintos += obtenido != esperado
+
+    print(f"{args.documentos} documentos × {len(COLUMNAS)} patrones")
+    print(f"  documento a documento: {python:.3f} s")
+    print(f"  puntuar_corpus:        {vectorizado:.3f} s  (x{python / max(vectorizado, 1e-9):.0f})")
+    print(f"  filas distintas: {distintos}")
+    return 0 if distintos == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
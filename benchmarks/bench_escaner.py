@@ -0,0 +1,100 @@
+"""
+Benchmark del escáner de una sola pasada frente a `contar_patrones`.
+
+Comprueba que los conteos por patrón de `evaluador.contar_criterios` coinciden
+exactamente con los de `re.findall` patrón por patrón y mide ambos tiempos.
+
+    python -m benchmarks.bench_escaner [--parrafos 4000] [--repeticiones 3]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from evaluador import PATRONES_CRITERIOS, contar_criterios, contar_patrones, normalizar_texto
+
+
+# Frases de relleno y casos límite: solapamientos entre patrones de distintos
+# criterios, repeticiones consecutivas, variantes con y sin tilde, mayúsculas,
+# palabras pegadas a signos y caracteres que re.IGNORECASE pliega (ı, ſ).
+FRASES = [
+    "El hecho indiciario y el hecho base fueron analizados con el indicio principal.",
+    "Según el acta de fojas 12 y el folio 30, la declaración del testigo de descargo es clara.",
+    "No existe prueba suficiente; no se ha acreditado nada y queda acreditado lo contrario.",
+    "Por lo tanto, en consecuencia, se infiere y se concluye; por consiguiente se infiere.",
+    "El conjunto de indicios, la pluralidad de indicios y los indicios convergentes.",
+    "La hipotesis alternativa y la hipótesis alternativa; no se descarta una posible explicación.",
+    "La presunción de inocencia exige prueba más allá de toda duda razonable y carga de la prueba.",
+    "La FECHA y el LUGAR del hecho imputado: ocurrió, aconteció según el relato fáctico.",
+    "Su función, su rol, su participación, su aporte y su intervención en el hecho.",
+    "La prueba de descargo y la prueba ofrecida por la defensa; se valoró la versión del acusado.",
+    "Es típico; la tipicidad encuadra en el tipo penal y la adecuación típica es clara.",
+    "La pena, la proporcionalidad, la culpabilidad y la gravedad del hecho; circunstancias atenuantes.",
+    "La determinación judicial de la pena considera circunstancias agravantes.",
+    "Indicio indicio indicio; hecho base hecho base; no se probó, no se probo.",
+    "La funcıon del acusado y la verſion de descargo (variantes plegadas).",
+    "indicios_2020 acta2 pena-pena ata, ata; prueba suficiente prueba suficiente.",
+    "Texto neutro sin expresiones relevantes para ningún criterio de evaluación.",
+]
+
+
+def generar_texto(parrafos: int, semilla: int = 2024) -> str:
+    rnd = random.Random(semilla)
+    return "\n\n".join(
+        " ".join(rnd.choice(FRASES) for _ in range(rnd.randint(1, 6)))
+        for _ in range(parrafos)
+    )
+
+
+def conteos_referencia(texto: str):
+    return {
+        grupo: [contar_patrones(texto, p) for p in patrones]
+        for grupo, patrones in PATRONES_CRITERIOS.items()
+    }
+
+
+def medir(funcion, texto: str, repeticiones: int):
+    mejor = None
+    resultado = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion(texto)
+        dt = time.perf_counter() - t0
+        mejor = dt if mejor is None else min(mejor, dt)
+    return resultado, mejor
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--parrafos", type=int, default=4000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    texto = normalizar_texto(generar_texto(args.parrafos))
+    referencia, t_ref = medir(conteos_referencia, texto, args.repeticiones)
+    escaner, t_esc = medir(contar_criterios, texto, args.repeticiones)
+
+    diferencias = [
+        (grupo, PATRONES_CRITERIOS[grupo][i], referencia[grupo][i], escaner[grupo][i])
+        for grupo in PATRONES_CRITERIOS
+        for i in range(len(PATRONES_CRITERIOS[grupo]))
+        if referencia[grupo][i] != escaner[grupo][i]
+    ]
+
+    print(f"Texto: {len(texto):,} caracteres ({args.parrafos} párrafos)")
+    print(f"contar_patrones (un findall por patrón): {t_ref * 1000:.1f} ms")
+    print(f"escáner de una sola pasada:             {t_esc * 1000:.1f} ms")
+    print(f"Aceleración: x{t_ref / t_esc:.2f}")
+
+    if diferencias:
+        print("ERROR: los conteos no coinciden:")
+        for grupo, patron, esperado, obtenido in diferencias:
+            print(f"  {grupo} {patron}: esperado {esperado}, obtenido {obtenido}")
+        return 1
+    print(f"Conteos idénticos en los {sum(map(len, PATRONES_CRITERIOS.values()))} patrones.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Benchmark de la extracción de PDF: secuencial frente a paralela y modo
+completo (extract_text de pdfplumber) frente a "auto" (modo rápido con
+vuelta al completo por página).
+
+Comprueba que `leer_pdf` devuelve exactamente el mismo texto en secuencial y
+en paralelo y que las páginas que "auto" leyó en modo rápido tienen el mismo
+texto que con el modo completo; cualquier diferencia es un fallo.
+
+    python -m benchmarks.bench_extraccion_pdf expediente.pdf [--procesos 4]
+"""
+
+import argparse
+import sys
+import time
+
+import pdfplumber
+
+from extractores import leer_pdf
+
+
+def _paginas_distintas(ruta: str, modos) -> int:
+    from extractores import _extraer_pagina, _texto_rapido
+
+    distintas = 0
+    with pdfplumber.open(ruta) as pdf:
+        for pagina, modo in zip(pdf.pages, modos):
+            if modo == "rapido":
+                distintas += _texto_rapido(pagina)[0] != _extraer_pagina(pagina)
+            pagina.close()
+    return distintas
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("--procesos", type=int, default=0,
+                        help="procesos del modo paralelo (0 = todos los núcleos)")
+    args = parser.parse_args(argv)
+
+    errores = 0
+    for ruta in args.pdfs:
+        t0 = time.perf_counter()
+        secuencial = leer_pdf(ruta, procesos=1, motor="completo")
+        t_sec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        paralelo = leer_pdf(ruta, procesos=args.procesos, motor="completo")
+        t_par = time.perf_counter() - t0
+
+        identico = secuencial.encode("utf-8") == paralelo.encode("utf-8")
+        errores += not identico
+        print(
+            f"{ruta}: secuencial {t_sec:.2f} s | paralelo {t_par:.2f} s "
+            f"(x{t_sec / t_par:.2f}) | {'idéntico' if identico else 'DIFERENTE'}"
+        )
+
+        modos = []
+        t0 = time.perf_counter()
+        leer_pdf(ruta, procesos=1, motor="auto", modos=modos)
+        t_auto = time.perf_counter() - t0
+        rapidas = modos.count("rapido")
+        distintas = _paginas_distintas(ruta, modos)
+        errores += distintas > 0
+        print(
+            f"  auto secuencial {t_auto:.2f} s (x{t_sec / t_auto:.2f} frente a completo) | "
+            f"{rapidas} de {len(modos)} páginas en modo rápido, "
+            f"{distintas} con texto distinto del completo"
+            + ("" if distintas == 0 else " (DIFERENTE)")
+        )
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
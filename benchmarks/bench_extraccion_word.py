@@ -0,0 +1,95 @@
+"""
+Benchmark de la extracción de Word: motor "xml" (word/document.xml en
+streaming) frente a "python-docx" (documento completo en memoria).
+
+Sin argumentos genera un .docx sintético de --parrafos párrafos; también
+acepta rutas a .docx reales. Cada motor se mide en un proceso nuevo para que
+el pico de memoria (RSS máximo, solo en Unix) sea el suyo. Comprueba que el
+texto de python-docx coincide con el del motor xml cuando el documento no
+tiene tablas, notas ni encabezados (con ellos, xml entrega párrafos de más).
+
+    python -m benchmarks.bench_extraccion_word [expediente.docx ...] [--parrafos 20000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+from benchmarks.generador import escribir_docx, generar_parrafos
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _rss_max_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss: KiB en Linux, bytes en macOS.
+    escala = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / escala
+
+
+def _medir(ruta: str, motor: str) -> Tuple[float, Optional[float], str]:
+    """
+    Tarea del proceso hijo: (segundos, MB de RSS añadidos por la lectura, texto).
+    """
+    from extractores import leer_word
+
+    antes = _rss_max_mb()
+    t0 = time.perf_counter()
+    texto = leer_word(ruta, motor)
+    segundos = time.perf_counter() - t0
+    despues = _rss_max_mb()
+    return segundos, None if antes is None else despues - antes, texto
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("docx", nargs="*")
+    parser.add_argument("--parrafos", type=int, default=20000,
+                        help="párrafos del documento sintético (sin rutas)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = args.docx
+        if not rutas:
+            ruta = os.path.join(directorio, "sentencia.docx")
+            escribir_docx(generar_parrafos(args.parrafos), ruta)
+            rutas = [ruta]
+
+        contexto = multiprocessing.get_context("spawn")
+        errores = 0
+        for ruta in rutas:
+            medidas = {}
+            for motor in ("python-docx", "xml"):
+                with contexto.Pool(1) as pool:
+                    medidas[motor] = pool.apply(_medir, (ruta, motor))
+            (t_docx, mem_docx, texto_docx), (t_xml, mem_xml, texto_xml) = (
+                medidas["python-docx"], medidas["xml"]
+            )
+            parrafos_docx = texto_docx.split("\n\n")
+            parrafos_xml = texto_xml.split("\n\n")
+            identico = texto_docx == texto_xml
+            memoria = "" if mem_docx is None else f" | RSS +{mem_docx:.0f} MB frente a +{mem_xml:.0f} MB"
+            print(
+                f"{os.path.basename(ruta)} ({os.path.getsize(ruta) / 1e6:.1f} MB): "
+                f"python-docx {t_docx:.2f} s | xml {t_xml:.2f} s (x{t_docx / max(t_xml, 1e-9):.1f})"
+                f"{memoria}"
+            )
+            print(
+                f"  párrafos: python-docx {len(parrafos_docx)} | xml {len(parrafos_xml)} | "
+                f"{'idéntico' if identico else 'xml añade tablas, notas o encabezados'}"
+            )
+            # Sin contenido fuera del cuerpo (p. ej. el sintético) deben coincidir.
+            errores += not args.docx and not identico
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
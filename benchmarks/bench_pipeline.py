@@ -0,0 +1,227 @@
+"""
+Benchmark de extremo a extremo del flujo de análisis sobre sentencias sintéticas.
+
+Genera sentencias deterministas con `benchmarks.generador` y mide por separado
+cada etapa: `leer_pdf` y `leer_word` (sobre fixtures generados), `evaluar_todo`,
+`analizar_incongruencias` y `informe_word.generar_informe`; las dos etapas de
+análisis se miden también acotadas a secciones.SECCIONES_RAZONAMIENTO
+(`*_acotado`), con el ahorro frente al texto completo. Para cada etapa
+informa el mejor tiempo de N repeticiones, el rendimiento (páginas/s o
+párrafos/s) y el pico de memoria asignada (tracemalloc, en una pasada aparte
+para no distorsionar los tiempos). Las cachés de resultados no se usan.
+
+Las etapas cuya dependencia no está instalada (pdfplumber, python-docx) se
+registran como omitidas.
+
+    python -m benchmarks.bench_pipeline [--parrafos 200 1000] [--densidad 0.3]
+        [--guardar base.json] [--comparar base.json] [--tolerancia 0.15]
+
+Con --guardar se escribe una línea base JSON; con --comparar se contrasta la
+medición actual con una línea base y el script termina con código 1 si alguna
+etapa es más lenta que la base en más de la tolerancia.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.generador import escribir_docx, escribir_pdf, generar_parrafos
+from secciones import SECCIONES_RAZONAMIENTO
+
+
+def _commit_actual() -> Optional[str]:
+    try:
+        salida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def medir_etapa(funcion: Callable[[], Any], unidades: int, unidad: str, repeticiones: int) -> Dict[str, Any]:
+    """
+    Mejor tiempo de `repeticiones` llamadas, rendimiento en `unidad`/s y pico
+    de memoria asignada durante una llamada adicional bajo tracemalloc.
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        dt = time.perf_counter() - t0
+        mejor = dt if mejor is None else min(mejor, dt)
+
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "segundos": round(mejor, 6),
+        unidad: unidades,
+        f"{unidad}_por_segundo": round(unidades / mejor, 2) if mejor else None,
+        "memoria_pico_mb": round(pico / (1024 * 1024), 3),
+    }
+
+
+def medir_escenario(
+    parrafos: int,
+    palabras_por_parrafo: int,
+    densidad: float,
+    semilla: int,
+    repeticiones: int,
+) -> Dict[str, Dict[str, Any]]:
+    from evaluador import evaluar_todo
+    from incongruencias import analizar_incongruencias
+
+    lista = generar_parrafos(parrafos, palabras_por_parrafo, densidad, semilla)
+    texto = "\n\n".join(lista)
+    etapas: Dict[str, Dict[str, Any]] = {}
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_pdf = os.path.join(directorio, "sentencia.pdf")
+        paginas = escribir_pdf(lista, ruta_pdf)
+        try:
+            from extractores import leer_pdf, leer_word
+        except ImportError as e:
+            etapas["leer_pdf"] = {"omitida": str(e)}
+            etapas["leer_word"] = {"omitida": str(e)}
+        else:
+            etapas["leer_pdf"] = medir_etapa(
+                lambda: leer_pdf(ruta_pdf), paginas, "paginas", repeticiones
+            )
+            ruta_docx = os.path.join(directorio, "sentencia.docx")
+            escribir_docx(lista, ruta_docx)
+            etapas["leer_word"] = medir_etapa(
+                lambda: leer_word(ruta_docx), parrafos, "parrafos", repeticiones
+            )
+
+    etapas["evaluar_todo"] = medir_etapa(
+        lambda: evaluar_todo(texto, usar_cache=False), parrafos, "parrafos", repeticiones
+    )
+    etapas["analizar_incongruencias"] = medir_etapa(
+        lambda: analizar_incongruencias(texto, usar_cache=False), parrafos, "parrafos", repeticiones
+    )
+    etapas["evaluar_todo_acotado"] = medir_etapa(
+        lambda: evaluar_todo(texto, usar_cache=False, secciones=SECCIONES_RAZONAMIENTO),
+        parrafos, "parrafos", repeticiones,
+    )
+    etapas["analizar_incong_acotado"] = medir_etapa(
+        lambda: analizar_incongruencias(texto, usar_cache=False, secciones=SECCIONES_RAZONAMIENTO),
+        parrafos, "parrafos", repeticiones,
+    )
+
+    try:
+        from informe_word import generar_informe
+    except ImportError as e:
+        etapas["generar_informe"] = {"omitida": str(e)}
+    else:
+        resultados = evaluar_todo(texto, usar_cache=False)
+        incong = analizar_incongruencias(texto, usar_cache=False)
+        etapas["generar_informe"] = medir_etapa(
+            lambda: generar_informe(texto, resultados, incong), parrafos, "parrafos", repeticiones
+        )
+    return etapas
+
+
+def comparar(actual: Dict[str, Any], base: Dict[str, Any], tolerancia: float) -> List[str]:
+    """
+    Devuelve las regresiones (etapas más lentas que la base en más de
+    `tolerancia`) e imprime la relación de tiempos de cada etapa común.
+    """
+    regresiones = []
+    for escenario, etapas in actual["escenarios"].items():
+        etapas_base = base.get("escenarios", {}).get(escenario)
+        if not etapas_base:
+            continue
+        for etapa, medida in etapas.items():
+            medida_base = etapas_base.get(etapa, {})
+            if "segundos" not in medida or "segundos" not in medida_base:
+                continue
+            relacion = medida["segundos"] / medida_base["segundos"]
+            marca = ""
+            if relacion > 1 + tolerancia:
+                marca = "  <-- REGRESIÓN"
+                regresiones.append(f"{escenario}/{etapa}")
+            print(f"  {escenario:>8} {etapa:<24} x{relacion:.2f} respecto a la base{marca}")
+    return regresiones
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--parrafos", type=int, nargs="+", default=[200, 1000])
+    parser.add_argument("--palabras", type=int, default=80, help="palabras por párrafo")
+    parser.add_argument("--densidad", type=float, default=0.3,
+                        help="fracción de oraciones activadoras (0 a 1)")
+    parser.add_argument("--semilla", type=int, default=2024)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--guardar", help="ruta del JSON de línea base a escribir")
+    parser.add_argument("--comparar", help="ruta de un JSON de línea base previo")
+    parser.add_argument("--tolerancia", type=float, default=0.15,
+                        help="lentitud relativa admitida antes de marcar regresión")
+    args = parser.parse_args(argv)
+
+    informe: Dict[str, Any] = {
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": {
+            "palabras_por_parrafo": args.palabras,
+            "densidad": args.densidad,
+            "semilla": args.semilla,
+            "repeticiones": args.repeticiones,
+        },
+        "escenarios": {},
+    }
+
+    for parrafos in args.parrafos:
+        etapas = medir_escenario(
+            parrafos, args.palabras, args.densidad, args.semilla, args.repeticiones
+        )
+        informe["escenarios"][f"p{parrafos}"] = etapas
+        print(f"Sentencia sintética de {parrafos} párrafos:")
+        for etapa, medida in etapas.items():
+            if "omitida" in medida:
+                print(f"  {etapa:<24} omitida ({medida['omitida']})")
+                continue
+            unidad = "paginas" if "paginas" in medida else "parrafos"
+            print(
+                f"  {etapa:<24} {medida['segundos'] * 1000:9.1f} ms | "
+                f"{medida[f'{unidad}_por_segundo']:>10,.1f} {unidad}/s | "
+                f"pico {medida['memoria_pico_mb']:.1f} MB"
+            )
+        completo = sum(etapas[e]["segundos"] for e in ("evaluar_todo", "analizar_incongruencias"))
+        acotado = sum(etapas[e]["segundos"] for e in ("evaluar_todo_acotado", "analizar_incong_acotado"))
+        print(
+            f"  ahorro acotando a {', '.join(SECCIONES_RAZONAMIENTO)}: "
+            f"{(completo - acotado) * 1000:.1f} ms ({1 - acotado / completo:.0%})"
+        )
+
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"Línea base guardada en {args.guardar}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        print(f"Comparación con {args.comparar} (commit {base.get('commit')}):")
+        regresiones = comparar(informe, base, args.tolerancia)
+        if regresiones:
+            print("Regresiones: " + ", ".join(regresiones))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Prueba de carga del servicio HTTP local (servicio.py) en una sola máquina.
+
+Levanta el servicio en un puerto libre (o usa uno ya en marcha con --url) y
+envía --solicitudes sentencias sintéticas de texto plano desde --concurrencia
+clientes a la vez. Informa solicitudes por segundo, latencias p50/p95, los
+códigos HTTP recibidos (503 = cola llena, 504 = tiempo agotado) y /metricas.
+
+    python -m benchmarks.carga_servicio [--solicitudes 40] [--concurrencia 8]
+        [--parrafos 200] [--procesos 4] [--cola-max 16] [--url http://127.0.0.1:8765]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from benchmarks.generador import generar_sentencia
+
+
+def _enviar(url: str, cuerpo: bytes) -> Tuple[int, float]:
+    solicitud = urllib.request.Request(
+        url + "/analizar", data=cuerpo, headers={"Content-Type": "text/plain; charset=utf-8"}
+    )
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(solicitud, timeout=600) as respuesta:
+            respuesta.read()
+            codigo = respuesta.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        codigo = e.code
+    return codigo, time.perf_counter() - t0
+
+
+def _percentil(valores: List[float], q: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--solicitudes", type=int, default=40)
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--parrafos", type=int, default=200, help="párrafos de cada sentencia")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos del servicio levantado")
+    parser.add_argument("--cola-max", type=int, default=None, help="cola del servicio levantado")
+    parser.add_argument("--url", help="servicio ya en marcha (no se levanta uno propio)")
+    args = parser.parse_args(argv)
+
+    servidor = None
+    url = args.url
+    if url is None:
+        from config import COLA_MAX_SERVICIO
+        from servicio import ServicioAnalisis, ServidorAnalisis
+
+        servicio = ServicioAnalisis(args.procesos, args.cola_max or COLA_MAX_SERVICIO)
+        servidor = ServidorAnalisis(("127.0.0.1", 0), servicio, registrar=False)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{servidor.server_port}"
+        # Espera a que los procesos del pool terminen de cargar los módulos.
+        _enviar(url, generar_sentencia(5).encode("utf-8"))
+
+    # Semillas distintas: la caché de resultados de cada proceso no interviene.
+    cuerpos = [
+        generar_sentencia(args.parrafos, semilla=i).encode("utf-8") for i in range(args.solicitudes)
+    ]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrencia) as clientes:
+        respuestas = list(clientes.map(lambda c: _enviar(url, c), cuerpos))
+    total = time.perf_counter() - t0
+
+    codigos = Counter(codigo for codigo, _ in respuestas)
+    latencias = [dt for codigo, dt in respuestas if codigo == 200]
+    print(f"{args.solicitudes} solicitudes, {args.concurrencia} clientes, {url}")
+    print(f"  {args.solicitudes / total:.2f} solicitudes/s en {total:.2f} s")
+    print(f"  códigos: {dict(sorted(codigos.items()))}")
+    if latencias:
+        print(
+            f"  latencia OK: p50 {_percentil(latencias, 0.5) * 1000:.0f} ms | "
+            f"p95 {_percentil(latencias, 0.95) * 1000:.0f} ms"
+        )
+    with urllib.request.urlopen(url + "/metricas") as respuesta:
+        print("  /metricas: " + json.dumps(json.load(respuesta), ensure_ascii=False))
+
+    if servidor is not None:
+        servidor.shutdown()
+        servidor.server_close()
+        servidor.servicio.cerrar()
+    return 0 if codigos.get(200) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Generador determinista de sentencias sintéticas en español para los benchmarks.
+
+Con la misma semilla y los mismos parámetros produce siempre el mismo texto.
+Se controla:
+
+- el número de párrafos y su largo aproximado (en palabras);
+- la densidad de frases "activadoras": la fracción de oraciones tomadas de las
+  expresiones que buscan `evaluador` (criterios C1–C12) e `incongruencias`
+  (etiquetas y predicados de las REGLAS); el resto es relleno neutro.
+
+También escribe el texto como DOCX (python-docx) o como PDF simple de solo
+texto (escritor propio, sin dependencias) para medir `leer_word` / `leer_pdf`.
+"""
+
+import random
+import textwrap
+from typing import List
+
+# Expresiones de los criterios de `evaluador`.
+FRASES_CRITERIOS = [
+    "El hecho indiciario y el hecho base fueron analizados junto con el indicio principal.",
+    "Según el acta de fojas 12 y el folio 30, la declaración del testigo de descargo es clara.",
+    "No existe prueba suficiente y no se ha acreditado la participación en los hechos.",
+    "Por lo tanto, en consecuencia, se infiere y se concluye la responsabilidad penal.",
+    "El conjunto de indicios, la pluralidad de indicios y los indicios convergentes son relevantes.",
+    "Se examinó la hipótesis alternativa y no se descarta una posible explicación distinta.",
+    "La presunción de inocencia exige prueba más allá de toda duda razonable.",
+    "La fecha y el lugar del hecho imputado constan en el relato fáctico de la acusación.",
+    "Se describe su función, su rol y su participación en el hecho atribuido.",
+    "Se valoró la prueba de descargo y la versión del acusado ofrecida por la defensa.",
+    "La conducta es típica y la adecuación típica al tipo penal ha sido explicada.",
+    "La pena responde a la proporcionalidad, la culpabilidad y la gravedad del hecho.",
+    "La determinación judicial de la pena considera las circunstancias atenuantes y agravantes.",
+]
+
+# Expresiones de las etiquetas y predicados de `incongruencias`.
+FRASES_INCONGRUENCIAS = [
+    "Ha quedado acreditado el hecho con plena certeza.",
+    "Existe una mera sospecha inicial sobre el acusado.",
+    "Existe sospecha grave contra el acusado.",
+    "El indicio es débil y no es concluyente.",
+    "La prueba resulta contundente y es determinante.",
+    "No se descartan otras versiones propuestas por el imputado.",
+    "Es la única explicación posible de lo ocurrido.",
+    "El testigo rindió su declaración en juicio oral.",
+    "La pericia y el informe pericial del perito fueron incorporados.",
+    "El indicio contradice lo afirmado por el testigo.",
+    "Valorados en conjunto, los indicios permiten concluir la autoría.",
+    "Por el solo hecho de estar ahí, debía conocer el plan.",
+    "Por su calidad de gerente, dispuso los pagos observados.",
+    "Es evidente que actuó dolosamente.",
+    "Conforme a las máximas de la experiencia, lo normal es que nadie actúe así.",
+    "Según la sana crítica, la coartada no es creíble.",
+    "Existen otras hipótesis, pero es la única explicación razonable.",
+]
+
+FRASES_ACTIVADORAS = FRASES_CRITERIOS + FRASES_INCONGRUENCIAS
+
+# Vocabulario de relleno: oraciones plausibles sin expresiones de los patrones.
+_SUJETOS = [
+    "La sala", "El colegiado", "La audiencia", "El despacho", "La secretaría",
+    "El representante", "La parte civil", "El órgano jurisdiccional",
+]
+_VERBOS = [
+    "dejó constancia de", "revisó", "tuvo a la vista", "programó", "notificó",
+    "registró", "admitió", "ordenó la lectura de",
+]
+_OBJETOS = [
+    "los escritos presentados", "la agenda de la sesión", "el expediente remitido",
+    "las constancias de notificación", "el cronograma procesal", "los oficios recibidos",
+    "las actuaciones anteriores", "la resolución de trámite",
+]
+_COMPLEMENTOS = [
+    "en la sesión señalada", "conforme al trámite ordinario", "sin observaciones de las partes",
+    "dentro del plazo previsto", "en presencia de los asistentes", "según lo acordado",
+]
+
+# Encabezados de una sentencia típica.
+_SECCIONES = ["VISTOS:", "CONSIDERANDO:", "FUNDAMENTOS DE DERECHO:", "FALLO:"]
+
+
+def _oracion_relleno(rnd: random.Random) -> str:
+    return (
+        f"{rnd.choice(_SUJETOS)} {rnd.choice(_VERBOS)} {rnd.choice(_OBJETOS)} "
+        f"{rnd.choice(_COMPLEMENTOS)}."
+    )
+
+
+def generar_parrafos(
+    parrafos: int = 200,
+    palabras_por_parrafo: int = 80,
+    densidad: float = 0.3,
+    semilla: int = 2024,
+) -> List[str]:
+    """
+    Genera `parrafos` párrafos de unas `palabras_por_parrafo` palabras. Cada
+    oración es activadora con probabilidad `densidad` (0 a 1). Los encabezados
+    de sección se reparten a lo largo del documento y cuentan como párrafo.
+    """
+    rnd = random.Random(semilla)
+    cada_seccion = max(1, parrafos // len(_SECCIONES))
+    salida: List[str] = []
+    for i in range(parrafos):
+        if i % cada_seccion == 0 and i // cada_seccion < len(_SECCIONES):
+            salida.append(_SECCIONES[i // cada_seccion])
+            continue
+        oraciones: List[str] = []
+        palabras = 0
+        while palabras < palabras_por_parrafo:
+            if rnd.random() < densidad:
+                oracion = rnd.choice(FRASES_ACTIVADORAS)
+            else:
+                oracion = _oracion_relleno(rnd)
+            oraciones.append(oracion)
+            palabras += len(oracion.split())
+        salida.append(f"{i}. " + " ".join(oraciones))
+    return salida
+
+
+def generar_sentencia(
+    parrafos: int = 200,
+    palabras_por_parrafo: int = 80,
+    densidad: float = 0.3,
+    semilla: int = 2024,
+) -> str:
+    """
+    Texto completo de una sentencia sintética (párrafos separados por línea
+    en blanco, como los segmenta `incongruencias.segmentar_parrafos`).
+    """
+    return "\n\n".join(generar_parrafos(parrafos, palabras_por_parrafo, densidad, semilla))
+
+
+# -------------------
+# Fixtures de archivo
+# -------------------
+
+def escribir_docx(parrafos: List[str], ruta: str) -> None:
+    """
+    Guarda los párrafos como documento Word (requiere python-docx).
+    """
+    from docx import Document
+
+    doc = Document()
+    for texto in parrafos:
+        doc.add_paragraph(texto)
+    doc.save(ruta)
+
+
+def _literal_pdf(linea: str) -> bytes:
+    datos = linea.encode("cp1252", errors="replace")
+    return b"(" + datos.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def escribir_pdf(
+    parrafos: List[str],
+    ruta: str,
+    lineas_por_pagina: int = 50,
+    caracteres_por_linea: int = 95,
+) -> int:
+    """
+    Guarda los párrafos como PDF de solo texto (Helvetica 10, A4), con una
+    línea en blanco entre párrafos. Devuelve el número de páginas.
+    """
+    lineas: List[str] = []
+    for texto in parrafos:
+        lineas.extend(textwrap.wrap(texto, caracteres_por_linea) or [""])
+        lineas.append("")
+    paginas = [
+        lineas[i:i + lineas_por_pagina] for i in range(0, len(lineas), lineas_por_pagina)
+    ] or [[]]
+
+    # Objetos: 1 catálogo, 2 árbol de páginas, 3 fuente, luego (página, contenido).
+    objetos: List[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                            b"/Encoding /WinAnsiEncoding >>"]
+    hijos = []
+    for pagina in paginas:
+        flujo = [b"BT /F1 10 Tf 14 TL 50 800 Td"]
+        for linea in pagina:
+            flujo.append(_literal_pdf(linea) + b" Tj T*")
+        flujo.append(b"ET")
+        contenido = b"\n".join(flujo)
+        n_pagina = len(objetos) + 1
+        hijos.append(f"{n_pagina} 0 R".encode())
+        objetos.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {n_pagina + 1} 0 R >>".encode()
+        )
+        objetos.append(
+            f"<< /Length {len(contenido)} >>\nstream\n".encode() + contenido + b"\nendstream"
+        )
+    objetos[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objetos[1] = (
+        b"<< /Type /Pages /Kids [" + b" ".join(hijos) + b"] /Count "
+        + str(len(paginas)).encode() + b" >>"
+    )
+
+    salida = bytearray(b"%PDF-1.4\n")
+    desplazamientos = []
+    for i, cuerpo in enumerate(objetos, 1):
+        desplazamientos.append(len(salida))
+        salida += f"{i} 0 obj\n".encode() + cuerpo + b"\nendobj\n"
+    inicio_xref = len(salida)
+    salida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    for d in desplazamientos:
+        salida += f"{d:010d} 00000 n \n".encode()
+    salida += (
+        f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{inicio_xref}\n%%EOF\n"
+    ).encode()
+
+    with open(ruta, "wb") as f:
+        f.write(salida)
+    return len(paginas)
@@ -0,0 +1,195 @@
+# cache.py
+"""
+Cachés direccionadas por contenido para no repetir trabajo entre reruns de
+Streamlit (el script se vuelve a ejecutar completo en cada interacción).
+
+- CacheLRU: caché en memoria con tope de entradas y contadores de aciertos/fallos.
+- CacheDiscoTextos: textos en disco, con expulsión de los menos usados al
+  superar un tamaño total.
+- CacheTextos: combinación de ambas (memoria primero, disco opcional).
+
+Las claves las construye quien usa la caché, normalmente con `huella()` del
+contenido más una versión de lo que lo procesa (`huella_funcion()` permite
+derivarla del propio código, de modo que un cambio la invalida solo).
+"""
+
+import hashlib
+import os
+import threading
+import types
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Union
+
+
+def huella(contenido: Union[bytes, str]) -> str:
+    """
+    Hash SHA-256 (hex) de unos bytes o de un texto (codificado en UTF-8).
+    """
+    if isinstance(contenido, str):
+        contenido = contenido.encode("utf-8")
+    return hashlib.sha256(contenido).hexdigest()
+
+
+def _partes_codigo(codigo: types.CodeType) -> Iterator[bytes]:
+    yield codigo.co_code
+    yield repr(codigo.co_names).encode("utf-8")
+    for constante in codigo.co_consts:
+        if isinstance(constante, types.CodeType):
+            yield from _partes_codigo(constante)
+        else:
+            yield repr(constante).encode("utf-8")
+
+
+def huella_funcion(funcion: Callable) -> str:
+    """
+    Huella del código de una función: bytecode, constantes (umbrales, textos,
+    funciones anidadas) y nombres globales que usa. Cambia si cambia su lógica.
+    """
+    h = hashlib.sha256()
+    for parte in _partes_codigo(funcion.__code__):
+        h.update(parte)
+    return h.hexdigest()
+
+
+class CacheLRU:
+    """
+    Caché en memoria que descarta la entrada usada hace más tiempo cuando
+    supera `max_entradas`. Es segura entre hilos (sesiones de Streamlit).
+    """
+
+    def __init__(self, max_entradas: int = 32):
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave: Hashable, defecto: Any = None) -> Any:
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+            return defecto
+
+    def guardar(self, clave: Hashable, valor: Any) -> None:
+        if self.max_entradas <= 0:
+            return
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def __contains__(self, clave: Hashable) -> bool:
+        with self._lock:
+            return clave in self._datos
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+    def estadisticas(self) -> Dict[str, int]:
+        return {
+            "entradas": len(self._datos),
+            "max_entradas": self.max_entradas,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+        }
+
+
+class CacheDiscoTextos:
+    """
+    Textos guardados como archivos UTF-8 en `directorio`, uno por clave.
+    La fecha de modificación se actualiza en cada lectura y, cuando el total
+    supera `max_bytes`, se borran primero los archivos usados hace más tiempo.
+    """
+
+    def __init__(self, directorio: str, max_bytes: int = 512 * 1024 * 1024):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave: str) -> str:
+        # La clave puede contener ':' u otros separadores: usamos su hash.
+        return os.path.join(self.directorio, huella(clave) + ".txt")
+
+    def obtener(self, clave: str) -> Optional[str]:
+        ruta = self._ruta(clave)
+        # newline="": el texto vuelve tal cual se guardó (\r\n y \r incluidos).
+        try:
+            with open(ruta, "r", encoding="utf-8", newline="") as f:
+                texto = f.read()
+            os.utime(ruta)
+            return texto
+        except OSError:
+            return None
+
+    def guardar(self, clave: str, texto: str) -> None:
+        ruta = self._ruta(clave)
+        temporal = ruta + ".tmp"
+        try:
+            with open(temporal, "w", encoding="utf-8", newline="") as f:
+                f.write(texto)
+            os.replace(temporal, ruta)
+        except OSError:
+            return
+        self._expulsar()
+
+    def _expulsar(self) -> None:
+        with self._lock:
+            archivos = []
+            for nombre in os.listdir(self.directorio):
+                if not nombre.endswith(".txt"):
+                    continue
+                ruta = os.path.join(self.directorio, nombre)
+                try:
+                    st = os.stat(ruta)
+                except OSError:
+                    continue
+                archivos.append((st.st_mtime, st.st_size, ruta))
+            total = sum(tam for _, tam, _ in archivos)
+            for _, tam, ruta in sorted(archivos):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(ruta)
+                    total -= tam
+                except OSError:
+                    pass
+
+
+class CacheTextos:
+    """
+    Caché de textos en dos niveles: memoria (LRU) y, si se indica
+    `directorio`, disco. Un acierto en disco se sube a memoria.
+    """
+
+    def __init__(
+        self,
+        max_entradas: int = 32,
+        directorio: Optional[str] = None,
+        max_bytes_disco: int = 512 * 1024 * 1024,
+    ):
+        self.memoria = CacheLRU(max_entradas)
+        self.disco = CacheDiscoTextos(directorio, max_bytes_disco) if directorio else None
+
+    def obtener(self, clave: str) -> Optional[str]:
+        texto = self.memoria.obtener(clave)
+        if texto is None and self.disco is not None:
+            texto = self.disco.obtener(clave)
+            if texto is not None:
+                self.memoria.guardar(clave, texto)
+        return texto
+
+    def guardar(self, clave: str, texto: str) -> None:
+        self.memoria.guardar(clave, texto)
+        if self.disco is not None:
+            self.disco.guardar(clave, texto)
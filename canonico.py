@@ -0,0 +1,139 @@
+# canonico.py
+"""
+Texto canónico para buscar patrones: en minúsculas, con las vocales con tilde
+marcadas como la vocal ASCII en mayúscula (á é í ó ú → A E I O U), calculado
+una sola vez por texto. Tras lower() no queda ninguna otra mayúscula, así que
+la marca no se confunde con nada.
+
+Cada carácter del original da exactamente un carácter canónico, así que las
+posiciones coinciden: una coincidencia en canonizar(texto)[i:j] corresponde a
+texto[i:j], y los extractos que se muestran salen siempre del texto original.
+
+Los patrones de `evaluador` e `incongruencias` están escritos para el texto
+original con re.IGNORECASE y clases como [oó]; compilar_canonico los reescribe
+a su forma canónica (literales en minúsculas, "ó" → "O", [oó] → [oO]) y los
+compila sin IGNORECASE, de modo que el motor de expresiones regulares no
+pliega mayúsculas. Las coincidencias son las mismas que con IGNORECASE sobre
+el original: un literal sin tilde ("version") sigue sin aceptar la vocal con
+tilde, y solo las clases del patrón admiten ambas.
+
+plegar_tildes quita además la marca, para las búsquedas que no distinguen
+tildes en ninguna letra (encabezados de secciones.py, anclas de
+incongruencias).
+"""
+
+import re
+from functools import lru_cache
+
+from cache import huella, huella_funcion
+
+# Reemplazos tras lower(): vocales con tilde (marcadas en mayúscula), y las
+# equivalencias de re.IGNORECASE que lower() no reduce a una letra ASCII (ı, ſ).
+# La ü se queda como está: con IGNORECASE tampoco equivale a la u.
+_PLIEGUE = (
+    ("á", "A"), ("é", "E"), ("í", "I"), ("ó", "O"), ("ú", "U"),
+    ("ı", "i"), ("ſ", "s"),
+)
+
+
+def canonizar(texto: str) -> str:
+    """
+    Minúsculas con las tildes marcadas, con la misma longitud que `texto`.
+    """
+    if "İ" in texto:
+        # lower() la convierte en "i" + punto combinante: dos caracteres.
+        texto = texto.replace("İ", "I")
+    texto = texto.lower()
+    if not texto.isascii():
+        for original, plegado in _PLIEGUE:
+            if original in texto:
+                texto = texto.replace(original, plegado)
+    return texto
+
+
+def plegar_tildes(canonico: str) -> str:
+    """
+    Texto (o patrón) canónico sin distinguir tildes ni diéresis: "declaraciOn"
+    → "declaracion". Conserva la longitud.
+    """
+    canonico = canonico.lower()
+    return canonico.replace("ü", "u") if "ü" in canonico else canonico
+
+
+def _canonizar_plegado(texto: str) -> str:
+    return plegar_tildes(canonizar(texto))
+
+
+def _canonizar_literales(fragmento: str, pliegue=canonizar) -> str:
+    """
+    Canoniza los caracteres literales de un trozo de patrón y copia tal cual
+    las secuencias de escape (\\b, \\W...).
+    """
+    partes = re.split(r"(\\.)", fragmento)
+    return "".join(p if p.startswith("\\") else pliegue(p) for p in partes)
+
+
+def canonizar_patron(patron: str, tildes: bool = True) -> str:
+    """
+    Forma canónica de una expresión regular pensada para re.IGNORECASE:
+    literales canonizados y clases de variantes de una letra reducidas a sus
+    formas canónicas ([Aa] → a, [oó] → [oO]).
+
+    Con tildes=False el patrón es para plegar_tildes(canonizar(texto)):
+    literales y clases sin tildes ([oó] → o).
+    """
+    pliegue = canonizar if tildes else _canonizar_plegado
+    salida = []
+    i = 0
+    while i < len(patron):
+        c = patron[i]
+        if c == "\\":
+            salida.append(patron[i:i + 2])
+            i += 2
+        elif c == "[":
+            fin = patron.find("]", i + 2)
+            if fin < 0:
+                salida.append(_canonizar_literales(patron[i:], pliegue))
+                break
+            contenido = patron[i + 1:fin]
+            if any(e in contenido for e in "\\-^"):
+                salida.append("[" + _canonizar_literales(contenido, pliegue) + "]")
+            else:
+                letras = "".join(dict.fromkeys(pliegue(contenido)))
+                salida.append(re.escape(letras) if len(letras) == 1 else f"[{letras}]")
+            i = fin + 1
+        else:
+            j = i
+            while j < len(patron) and patron[j] not in "\\[":
+                j += 1
+            salida.append(pliegue(patron[i:j]))
+            i = j
+    return "".join(salida)
+
+
+@lru_cache(maxsize=None)
+def compilar_canonico(patron: str, flags: int = 0) -> "re.Pattern":
+    """
+    Compila la forma canónica de `patron` (sin IGNORECASE) para buscar sobre
+    canonizar(texto).
+    """
+    return re.compile(canonizar_patron(patron), flags & ~re.IGNORECASE)
+
+
+def patron_canonico(compilado: "re.Pattern") -> "re.Pattern":
+    """
+    Versión canónica de un patrón ya compilado.
+    """
+    return compilar_canonico(compilado.pattern, compilado.flags)
+
+
+def huella_canonico() -> str:
+    """
+    Huella de la canonización (entra en las huellas de versión de las cachés).
+    """
+    partes = [repr(_PLIEGUE)]
+    partes += [
+        huella_funcion(f)
+        for f in (canonizar, plegar_tildes, _canonizar_plegado, _canonizar_literales, canonizar_patron)
+    ]
+    return huella("\n".join(partes))
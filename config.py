@@ -12,6 +12,80 @@ PESOS_CRITERIOS = {
     "C7": 2.0,
 }
 
+# Extracción de PDF en paralelo (extractores.leer_pdf).
+# Número de procesos: 1 = secuencial, 0 = tantos como núcleos tenga la máquina.
+PROCESOS_EXTRACCION_PDF = 0
+# Por debajo de este número de páginas se extrae siempre de forma secuencial,
+# para que los documentos cortos no paguen el arranque de los procesos.
+PAGINAS_MINIMAS_PARALELO = 40
+# Motor de extracción de cada página: "auto" usa el modo rápido (texto
+# directo del flujo de caracteres, sin el layout de pdfplumber) y recurre al
+# completo (extract_text) si la página no pasa el control de calidad;
+# "rapido" y "completo" fuerzan uno u otro.
+MOTOR_PDF = "auto"
+# Control de calidad del modo rápido: longitud media de palabra admitida.
+# Fuera de este rango faltan espacios o las letras salen sueltas.
+LONGITUD_MEDIA_PALABRA_PDF = (2.0, 20.0)
+
+# Caché del texto extraído (extractores.extraer_texto), por hash del archivo.
+# Nivel en memoria: número de documentos que se conservan.
+CACHE_EXTRACCION_MAX_ENTRADAS = 32
+# Nivel en disco opcional: directorio (None = desactivado) y tamaño máximo.
+CACHE_EXTRACCION_DIR = None
+CACHE_EXTRACCION_MAX_BYTES_DISCO = 512 * 1024 * 1024
+
+# Extracción de Word (extractores.leer_word). "xml" lee word/document.xml en
+# streaming, con tablas, cuadros de texto, notas, encabezados y pies;
+# "python-docx" carga el documento entero y solo lee los párrafos del cuerpo.
+MOTOR_WORD = "xml"
+
+# Caché de resultados de evaluar_todo / analizar_incongruencias (en memoria),
+# por hash del texto y huella de versión de patrones, umbrales y reglas.
+CACHE_RESULTADOS_MAX_ENTRADAS = 128
+
+# Memo por párrafo de incongruencias (etiquetas y hallazgos de las reglas por
+# párrafo), por hash del contenido: al re-analizar un texto editado solo se
+# recalculan los párrafos nuevos o modificados.
+MEMO_PARRAFOS_MAX_ENTRADAS = 20000
+
+# Procesamiento por lotes (lote.py): procesos del pool (0 = todos los núcleos)
+# y documentos en curso por proceso. Este tope limita cuántos archivos se
+# extraen por adelantado mientras otros se analizan.
+PROCESOS_LOTE = 0
+PENDIENTES_POR_PROCESO_LOTE = 2
+
+# Servicio HTTP local (servicio.py): procesos del pool (0 = todos los núcleos),
+# trabajos admitidos a la vez (en curso + en espera; los demás reciben 503),
+# tiempo máximo de espera de una respuesta y tamaño máximo del cuerpo.
+PROCESOS_SERVICIO = 0
+COLA_MAX_SERVICIO = 32
+TIEMPO_MAX_SERVICIO_SEGUNDOS = 120
+TAMANO_MAX_SERVICIO_BYTES = 50 * 1024 * 1024
+
+# App de Streamlit (trabajos.py): cada cuántos segundos se vuelve a dibujar la
+# página para mostrar el avance de un análisis en segundo plano.
+INTERVALO_SONDEO_SEGUNDOS = 0.5
+# Mientras se extrae un PDF, cada cuántos segundos como mucho se publican el
+# ICI y los hallazgos provisionales de las páginas ya leídas.
+INTERVALO_PROVISIONAL_SEGUNDOS = 2.0
+# Pool de procesos compartido por todas las sesiones (0 = todos los núcleos),
+# trabajos en curso o en espera por usuario (sesión del navegador) y tamaño
+# máximo del documento de cada trabajo.
+PROCESOS_APP = 0
+TRABAJOS_MAX_POR_USUARIO = 2
+TAMANO_MAX_TRABAJO_BYTES = 50 * 1024 * 1024
+
+# Segmentación estructural del texto de PDF (segmentador.py): largo máximo
+# de un párrafo, para que el costo de las reglas por párrafo no dependa de
+# cómo venga maquetada la sentencia.
+PARRAFO_MAX_CARACTERES = 2500
+
+# Criterio C7 (evaluador.puntuar_C7): una expresión de falta de prueba ("no se
+# ha acreditado") y una de prueba plena ("queda acreditado") solo cuentan como
+# posible contradicción si están a esta distancia (caracteres del texto
+# normalizado) o menos. None = en cualquier parte del texto (criterio clásico).
+VENTANA_CONTRADICCION_C7 = None
+
 
 def interpretar_ici(ici: float, criterios: dict) -> str:
     """
@@ -0,0 +1,365 @@
+# corpus.py
+"""
+Puntuación vectorizada de un corpus completo de sentencias.
+
+evaluar_todo puntúa de a un documento: escanea el texto y después recorre
+en Python las escaleras puntuar_C1…C12 y calcular_ici. Para (re)puntuar un
+archivo entero conviene separar las dos cosas:
+
+- matriz_conteos: escanea cada texto una sola vez con ESCANER_CRITERIOS y
+  arma una matriz documentos × patrones, con las columnas de COLUMNAS (el
+  orden de PATRONES_CRITERIOS);
+- puntuar_corpus: a partir de esa matriz calcula, con operaciones de NumPy
+  sobre todas las filas a la vez, los criterios C1–C12 (np.add.reduceat
+  suma los patrones de cada grupo, np.digitize recorre las
+  ESCALERAS_CRITERIOS y np.select resuelve C7), el ICI sin penalización, el
+  ICI ajustado por C5 y un ICI ponderado con PESOS_CRITERIOS.
+
+Cada fila da los mismos criterios, ICI e interpretación que evaluar_todo
+sobre su texto (ver resultado_documento). Volver a puntuar la matriz no
+repite ningún escaneo: 50.000 sentencias se puntúan en una fracción de
+segundo.
+
+Umbrales, penalización de C5 y pesos salen de ParametrosPuntuacion (por
+defecto, los de evaluador y config), así que se pueden ensayar otros sin
+volver a analizar: evaluar_todo y los registros de lote.py guardan sus
+"conteos", matriz_desde_resultados los reúne y repuntuar recalcula un
+resultado en milisegundos (lo usan los controles de la app). Para un archivo
+ya procesado:
+
+    python -m corpus resultados.jsonl [--parametros parametros.json]
+        [--salida puntajes.csv]
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from config import PESOS_CRITERIOS, VENTANA_CONTRADICCION_C7
+from evaluador import (
+    ESCALERA_INTERPRETACION,
+    ESCALERAS_CRITERIOS,
+    PATRONES_CRITERIOS,
+    PENALIZACION_MAXIMA_C5,
+    UMBRAL_PENALIZACION_C5,
+    _escanear_criterios,
+    normalizar_texto,
+)
+
+CRITERIOS = tuple(f"C{i}" for i in range(1, 13))
+
+# Grupos de patrones (C1…C6, C7_neg, C7_pos, C8…C12) y columnas de la matriz.
+GRUPOS = tuple(PATRONES_CRITERIOS)
+COLUMNAS: Tuple[Tuple[str, int], ...] = tuple(
+    (grupo, i) for grupo, patrones in PATRONES_CRITERIOS.items() for i in range(len(patrones))
+)
+
+# Primera columna de cada grupo, para np.add.reduceat.
+_INICIOS = np.cumsum([0] + [len(p) for p in PATRONES_CRITERIOS.values()])[:-1]
+
+
+Escalera = Tuple[Tuple[float, ...], Tuple[int, ...]]
+
+
+@dataclass
+class ParametrosPuntuacion:
+    """
+    Lo que convierte conteos en puntajes: la escalera (umbrales, puntajes) de
+    cada criterio salvo C7, la penalización del ICI ajustado por C5 bajo y
+    los pesos del ICI ponderado.
+    """
+
+    escaleras: Dict[str, Escalera] = field(default_factory=lambda: dict(ESCALERAS_CRITERIOS))
+    umbral_penalizacion_c5: float = UMBRAL_PENALIZACION_C5
+    penalizacion_maxima_c5: float = PENALIZACION_MAXIMA_C5
+    pesos: Dict[str, float] = field(default_factory=lambda: dict(PESOS_CRITERIOS))
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            "escaleras": {c: [list(u), list(p)] for c, (u, p) in self.escaleras.items()},
+            "umbral_penalizacion_c5": self.umbral_penalizacion_c5,
+            "penalizacion_maxima_c5": self.penalizacion_maxima_c5,
+            "pesos": dict(self.pesos),
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: Mapping[str, Any]) -> "ParametrosPuntuacion":
+        """
+        Parámetros a partir de un dict como el de como_dict; las claves que
+        falten toman el valor por defecto. Lanza ValueError si una escalera
+        no es válida.
+        """
+        parametros = cls()
+        for criterio, (umbrales, puntajes) in datos.get("escaleras", {}).items():
+            if criterio not in parametros.escaleras:
+                raise ValueError(f"Criterio sin escalera: {criterio!r}")
+            if len(puntajes) != len(umbrales) + 1:
+                raise ValueError(f"La escalera de {criterio} necesita un puntaje más que umbrales")
+            if list(umbrales) != sorted(umbrales):
+                raise ValueError(f"Los umbrales de {criterio} deben ser crecientes")
+            parametros.escaleras[criterio] = (tuple(umbrales), tuple(int(p) for p in puntajes))
+        for nombre in ("umbral_penalizacion_c5", "penalizacion_maxima_c5"):
+            if nombre in datos:
+                setattr(parametros, nombre, float(datos[nombre]))
+        parametros.pesos.update({c: float(w) for c, w in datos.get("pesos", {}).items()})
+        return parametros
+
+
+# -------------------
+# Matriz de conteos
+# -------------------
+
+def fila_conteos(conteos: Mapping[str, List[int]]) -> np.ndarray:
+    """
+    Conteos por patrón de un documento (como los de contar_criterios) en el
+    orden de COLUMNAS.
+    """
+    return np.fromiter(
+        (conteos[grupo][i] for grupo, i in COLUMNAS), dtype=np.int32, count=len(COLUMNAS)
+    )
+
+
+def matriz_conteos(textos: Iterable[str]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Escanea cada texto una vez y devuelve la matriz documentos × patrones y,
+    si está configurada VENTANA_CONTRADICCION_C7, el vector de
+    contradicciones próximas de C7 por documento (si no, None).
+    """
+    filas: List[np.ndarray] = []
+    cercanos: List[int] = []
+    for texto in textos:
+        conteos, cercanos_C7 = _escanear_criterios(normalizar_texto(texto))
+        filas.append(fila_conteos(conteos))
+        cercanos.append(0 if cercanos_C7 is None else cercanos_C7)
+    matriz = np.vstack(filas) if filas else np.zeros((0, len(COLUMNAS)), dtype=np.int32)
+    if VENTANA_CONTRADICCION_C7 is None:
+        return matriz, None
+    return matriz, np.asarray(cercanos, dtype=np.int32)
+
+
+def matriz_desde_resultados(
+    resultados: Iterable[Mapping[str, Any]]
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Matriz de conteos (y vector de C7) a partir de los "conteos" que guardan
+    evaluar_todo y los registros de lote.py, sin escanear ningún texto.
+    """
+    filas: List[np.ndarray] = []
+    cercanos: List[Optional[int]] = []
+    for resultado in resultados:
+        filas.append(fila_conteos(resultado["conteos"]))
+        cercanos.append(resultado.get("cercanos_C7"))
+    matriz = np.vstack(filas) if filas else np.zeros((0, len(COLUMNAS)), dtype=np.int32)
+    if all(c is None for c in cercanos):
+        return matriz, None
+    # Sin ventana, C7 no exige proximidad: equivale a tener una pareja próxima.
+    return matriz, np.array([1 if c is None else c for c in cercanos], dtype=np.int32)
+
+
+def conteos_grupos(matriz: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Total de coincidencias de cada grupo de PATRONES_CRITERIOS, por documento.
+    """
+    matriz = np.asarray(matriz)
+    if not len(matriz):
+        return {grupo: np.zeros(0, dtype=np.int64) for grupo in GRUPOS}
+    sumas = np.add.reduceat(matriz, _INICIOS, axis=1)
+    return {grupo: sumas[:, k] for k, grupo in enumerate(GRUPOS)}
+
+
+# -------------------
+# Criterios e ICI
+# -------------------
+
+def puntuar_C7_vector(
+    neg: np.ndarray, pos: np.ndarray, cercanos: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    puntuar_C7 sobre vectores (mismas condiciones, en el mismo orden).
+    """
+    proximos = True if cercanos is None else cercanos > 0
+    return np.select(
+        [
+            (pos == 0) & (neg == 0),
+            (pos > 0) & (neg > 0) & (np.abs(pos - neg) <= 2) & proximos,
+            (pos >= 3) & (neg == 0),
+            (pos >= 1) & (neg == 0),
+            (neg >= 3) & (pos == 0),
+        ],
+        [40, 30, 90, 70, 80],
+        default=50,
+    )
+
+
+def puntuar_matriz(
+    matriz: np.ndarray,
+    cercanos_C7: Optional[np.ndarray] = None,
+    parametros: Optional[ParametrosPuntuacion] = None,
+) -> np.ndarray:
+    """
+    Matriz documentos × CRITERIOS con los puntajes de cada criterio.
+    """
+    escaleras = (parametros or ParametrosPuntuacion()).escaleras
+    n = conteos_grupos(matriz)
+    puntajes = np.empty((len(matriz), len(CRITERIOS)), dtype=np.int16)
+    for k, criterio in enumerate(CRITERIOS):
+        if criterio == "C7":
+            puntajes[:, k] = puntuar_C7_vector(n["C7_neg"], n["C7_pos"], cercanos_C7)
+        else:
+            umbrales, valores = escaleras[criterio]
+            puntajes[:, k] = np.asarray(valores)[np.digitize(n[criterio], umbrales)]
+    return puntajes
+
+
+def vector_pesos(pesos: Optional[Mapping[str, float]] = None) -> np.ndarray:
+    """
+    Peso de cada uno de CRITERIOS (por defecto PESOS_CRITERIOS; 1.0 para los
+    criterios que no figuran).
+    """
+    pesos = PESOS_CRITERIOS if pesos is None else pesos
+    return np.array([float(pesos.get(c, 1.0)) for c in CRITERIOS])
+
+
+def calcular_ici_corpus(
+    puntajes: np.ndarray, parametros: Optional[ParametrosPuntuacion] = None
+) -> Dict[str, np.ndarray]:
+    """
+    calcular_ici por filas: ICI sin penalización (media simple), ICI ajustado
+    (penalización por C5 bajo) e índice de interpretación en
+    ESCALERA_INTERPRETACION, más el ICI ponderado (media de los criterios
+    con los pesos de `parametros`, sin penalización).
+    """
+    parametros = parametros or ParametrosPuntuacion()
+    puntajes = np.asarray(puntajes, dtype=np.float64)
+    ici_sin = puntajes.mean(axis=1) if puntajes.size else np.zeros(len(puntajes))
+    c5 = puntajes[:, CRITERIOS.index("C5")]
+    umbral = parametros.umbral_penalizacion_c5
+    if umbral > 0:
+        penalizacion_c5 = np.maximum(0, (umbral - c5) / umbral * parametros.penalizacion_maxima_c5)
+    else:
+        penalizacion_c5 = np.zeros(len(puntajes))
+    ici_aj = np.maximum(0.0, ici_sin - penalizacion_c5)
+    w = vector_pesos(parametros.pesos)
+    if not w.sum():
+        w = np.ones(len(CRITERIOS))
+    return {
+        "ICI_sin_penalizacion": np.round(ici_sin, 2),
+        "ICI_ajustado": np.round(ici_aj, 2),
+        "ICI_ponderado": np.round(puntajes @ w / w.sum(), 2),
+        "interpretacion": np.digitize(ici_aj, ESCALERA_INTERPRETACION[0]).astype(np.int8),
+    }
+
+
+def puntuar_corpus(
+    matriz: np.ndarray,
+    cercanos_C7: Optional[np.ndarray] = None,
+    parametros: Optional[ParametrosPuntuacion] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Criterios (matriz documentos × CRITERIOS) e ICI de todo el corpus a
+    partir de la matriz de conteos.
+    """
+    puntajes = puntuar_matriz(matriz, cercanos_C7, parametros)
+    return {"criterios": puntajes, **calcular_ici_corpus(puntajes, parametros)}
+
+
+def evaluar_corpus(
+    textos: Iterable[str], parametros: Optional[ParametrosPuntuacion] = None
+) -> Dict[str, np.ndarray]:
+    """
+    matriz_conteos + puntuar_corpus. Conviene guardar la matriz si se va a
+    volver a puntuar con otros parámetros.
+    """
+    return puntuar_corpus(*matriz_conteos(textos), parametros=parametros)
+
+
+def resultado_documento(puntuacion: Mapping[str, np.ndarray], i: int) -> Dict[str, Any]:
+    """
+    Fila `i` de puntuar_corpus en el formato de evaluar_todo (más el ICI
+    ponderado).
+    """
+    return {
+        "criterios": {c: int(v) for c, v in zip(CRITERIOS, puntuacion["criterios"][i])},
+        "ICI_sin_penalizacion": float(puntuacion["ICI_sin_penalizacion"][i]),
+        "ICI_ajustado": float(puntuacion["ICI_ajustado"][i]),
+        "interpretacion": ESCALERA_INTERPRETACION[1][puntuacion["interpretacion"][i]],
+        "ICI_ponderado": float(puntuacion["ICI_ponderado"][i]),
+    }
+
+
+def repuntuar(
+    resultado: Mapping[str, Any], parametros: Optional[ParametrosPuntuacion] = None
+) -> Dict[str, Any]:
+    """
+    Criterios e ICI de un resultado de evaluar_todo (o un registro de
+    lote.py) recalculados con `parametros` a partir de sus conteos.
+    """
+    return resultado_documento(puntuar_corpus(*matriz_desde_resultados([resultado]), parametros), 0)
+
+
+# -------------------
+# Línea de comandos: re-puntuar un lote ya procesado
+# -------------------
+
+def leer_registros(ruta: str) -> List[Dict[str, Any]]:
+    """
+    Registros con conteos de una salida de lote.py (vale la última línea de
+    cada archivo; se omiten los errores y las líneas incompletas).
+    """
+    registros: Dict[str, Dict[str, Any]] = {}
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                continue
+            if isinstance(registro, dict) and "archivo" in registro:
+                registros[registro["archivo"]] = registro
+    return [r for r in registros.values() if "conteos" in r]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Vuelve a puntuar los registros de lote.py sin analizar los textos."
+    )
+    parser.add_argument("registros", help="salida JSONL de lote.py")
+    parser.add_argument("--parametros", help="JSON de ParametrosPuntuacion (p. ej. exportado de la app)")
+    parser.add_argument("--salida", help="CSV de puntajes (por defecto, a la salida estándar)")
+    args = parser.parse_args(argv)
+
+    parametros = None
+    if args.parametros:
+        with open(args.parametros, encoding="utf-8") as f:
+            parametros = ParametrosPuntuacion.desde_dict(json.load(f))
+    registros = leer_registros(args.registros)
+
+    t0 = time.perf_counter()
+    puntuacion = puntuar_corpus(*matriz_desde_resultados(registros), parametros)
+    segundos = time.perf_counter() - t0
+
+    columnas = ("ICI_sin_penalizacion", "ICI_ajustado", "ICI_ponderado")
+    salida = open(args.salida, "w", encoding="utf-8", newline="") if args.salida else sys.stdout
+    try:
+        escritor = csv.writer(salida)
+        escritor.writerow(("archivo",) + CRITERIOS + columnas)
+        for i, registro in enumerate(registros):
+            escritor.writerow(
+                [registro["archivo"]]
+                + puntuacion["criterios"][i].tolist()
+                + [float(puntuacion[c][i]) for c in columnas]
+            )
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    print(f"{len(registros)} documentos puntuados en {segundos * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
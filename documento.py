@@ -0,0 +1,202 @@
+# documento.py
+"""
+Sentencia analizada: el texto con sus etapas de preprocesamiento (segmentación
+en párrafos, etiquetas, texto normalizado y coincidencias de los criterios
+C1–C12) calculadas una sola vez y solo cuando alguien las pide.
+
+    documento = DocumentoAnalizado(texto)
+    resultados = evaluar_todo(documento)
+    incong = analizar_incongruencias(documento, resultados)
+    informe = generar_informe(documento, resultados, incong)
+
+El texto normalizado se arma párrafo a párrafo (es idéntico a
+normalizar_texto(texto)), de modo que cada coincidencia de los criterios se
+puede ubicar en el mismo número de párrafo que usan los hallazgos de
+incongruencias.
+
+`acotar(secciones)` devuelve el documento reducido a algunas secciones (ver
+secciones.py), con la numeración de párrafos original.
+"""
+
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from cache import huella
+from escaner import Coincidencia
+from evaluador import ESCANER_CRITERIOS, normalizar_texto
+from incongruencias import AlmacenParrafos
+from perfil import Perfil
+from secciones import SECCIONES, detectar_secciones, normalizar_secciones, tramos_secciones
+
+
+class DocumentoAnalizado:
+    """
+    Texto de una sentencia con su análisis perezoso. evaluar_todo,
+    analizar_incongruencias y generar_informe lo aceptan en lugar del texto y
+    reutilizan lo que ya esté calculado.
+    """
+
+    def __init__(self, texto: str):
+        self.texto = texto or ""
+        self._etiquetado = False
+        # Solo en los documentos que devuelve acotar(): secciones, párrafos y
+        # caracteres analizados frente a los del documento completo.
+        self.ambito: Optional[Dict[str, Any]] = None
+        self._acotados: Dict[Tuple[str, ...], "DocumentoAnalizado"] = {}
+
+    @cached_property
+    def huella(self) -> str:
+        if self.ambito is None:
+            return huella(self.texto)
+        # Un documento acotado se distingue de un texto con los mismos
+        # párrafos por su numeración, que aparece en los hallazgos.
+        numeros = ",".join(map(str, self.almacen.numeros.tolist()))
+        return huella(f"{self.texto}\0{numeros}")
+
+    @cached_property
+    def almacen(self) -> AlmacenParrafos:
+        """
+        Párrafos del texto (misma numeración que segmentar_parrafos), aún sin
+        etiquetar.
+        """
+        return AlmacenParrafos.segmentar(self.texto)
+
+    def etiquetado(self, usar_memo: bool = True) -> AlmacenParrafos:
+        """
+        El almacén con las ETIQUETAS calculadas (la primera vez que se pide).
+        """
+        if not self._etiquetado:
+            self.almacen.etiquetar(usar_memo=usar_memo)
+            self._etiquetado = True
+        return self.almacen
+
+    @cached_property
+    def _normalizacion(self) -> Tuple[str, np.ndarray]:
+        almacen = self.almacen
+        partes = [normalizar_texto(almacen.texto(i)) for i in range(len(almacen))]
+        # Cada párrafo empieza tras el anterior y el espacio que los une.
+        largos = np.fromiter((len(p) + 1 for p in partes), dtype=np.int64, count=len(partes))
+        inicios = np.cumsum(largos) - largos
+        return " ".join(partes), inicios
+
+    @property
+    def normalizado(self) -> str:
+        """
+        Igual a normalizar_texto(texto): minúsculas y espacios simples.
+        """
+        return self._normalizacion[0]
+
+    @cached_property
+    def huella_normalizado(self) -> str:
+        return huella(self.normalizado)
+
+    @cached_property
+    def coincidencias(self) -> List[Coincidencia]:
+        """
+        Coincidencias de PATRONES_CRITERIOS en el texto normalizado, en una
+        sola pasada: (grupo, índice del patrón, inicio, fin).
+        """
+        return ESCANER_CRITERIOS.ubicar(self.normalizado)
+
+    @cached_property
+    def conteos_criterios(self) -> Dict[str, List[int]]:
+        """
+        Conteos por patrón, como evaluador.contar_criterios(normalizado).
+        """
+        return ESCANER_CRITERIOS.contar_ubicadas(self.coincidencias)
+
+    def parrafo_de(self, posicion: int) -> int:
+        """
+        Número de párrafo (el de los hallazgos) de una posición del texto
+        normalizado.
+        """
+        inicios = self._normalizacion[1]
+        i = int(np.searchsorted(inicios, posicion, side="right")) - 1
+        return int(self.almacen.numeros[max(i, 0)])
+
+    @cached_property
+    def secciones(self) -> np.ndarray:
+        """
+        Índice en secciones.SECCIONES de cada párrafo del almacén.
+        """
+        return detectar_secciones(self.almacen)
+
+    @cached_property
+    def tramos(self) -> List[Dict[str, Any]]:
+        """
+        Tramos de párrafos consecutivos de una misma sección.
+        """
+        return tramos_secciones(self.almacen, self.secciones)
+
+    def acotar(self, secciones: Iterable[str]) -> "DocumentoAnalizado":
+        """
+        Documento con solo los párrafos de `secciones`, numerados como en el
+        original (y con sus etiquetas, si ya estaban calculadas). Si no se
+        reconoce ningún encabezado, se analiza el documento completo. Su
+        `ambito` resume lo que quedó fuera.
+        """
+        pedidas = normalizar_secciones(secciones)
+        acotado = self._acotados.get(pedidas)
+        if acotado is not None:
+            return acotado
+
+        almacen = self.almacen
+        detectadas = bool(self.secciones.any())
+        if detectadas:
+            codigos = [SECCIONES.index(s) for s in pedidas]
+            indices = np.flatnonzero(np.isin(self.secciones, codigos))
+        else:
+            indices = np.arange(len(almacen))
+        parcial = almacen.subconjunto(indices)
+        largos = almacen.fines - almacen.inicios
+
+        acotado = DocumentoAnalizado(
+            "\n\n".join(parcial.texto(i) for i in range(len(parcial)))
+        )
+        acotado.almacen = parcial
+        acotado._etiquetado = self._etiquetado
+        acotado.ambito = {
+            "secciones": list(pedidas),
+            "acotado": detectadas,
+            "parrafos": len(parcial),
+            "parrafos_totales": len(almacen),
+            "caracteres": int(largos[indices].sum()),
+            "caracteres_totales": int(largos.sum()),
+        }
+        self._acotados[pedidas] = acotado
+        return acotado
+
+    @cached_property
+    def parrafos_por_criterio(self) -> Dict[str, List[int]]:
+        """
+        Párrafos (en orden, sin repetir) donde aparece algún patrón de cada
+        criterio (C7 reúne C7_neg y C7_pos).
+        """
+        if not self.coincidencias:
+            return {}
+        inicios = self._normalizacion[1]
+        posiciones = np.fromiter((c[2] for c in self.coincidencias), dtype=np.int64)
+        indices = np.searchsorted(inicios, posiciones, side="right") - 1
+        numeros = self.almacen.numeros[indices].tolist()
+        por_criterio: Dict[str, Dict[int, None]] = {}
+        for (grupo, _, _, _), n in zip(self.coincidencias, numeros):
+            por_criterio.setdefault(grupo.split("_")[0], {})[n] = None
+        return {c: sorted(ns) for c, ns in por_criterio.items()}
+
+
+def acotar_documento(
+    texto, secciones: Iterable[str], perfil: Optional[Perfil] = None
+) -> DocumentoAnalizado:
+    """
+    El texto (o DocumentoAnalizado) reducido a `secciones`; con `perfil`, mide
+    la detección de secciones y registra el ámbito resultante.
+    """
+    documento = texto if isinstance(texto, DocumentoAnalizado) else DocumentoAnalizado(texto)
+    if perfil is None:
+        return documento.acotar(secciones)
+    with perfil.medir("acotar_secciones") as m:
+        acotado = documento.acotar(secciones)
+        m.datos.update(acotado.ambito, secciones=", ".join(acotado.ambito["secciones"]))
+    return acotado
@@ -0,0 +1,287 @@
+# escaner.py
+"""
+Motor de escaneo en una sola pasada para los patrones léxicos de los criterios.
+
+Los criterios C1–C12 de `evaluador.py` usan listas de expresiones del tipo
+`\\bpalabra\\b` o `\\bvarias palabras\\b` (con clases como `[oó]`). En lugar de
+recorrer el texto con `re.findall` una vez por patrón, este motor:
+
+- compila todas las listas una única vez en un índice "primera palabra → patrones";
+- recorre las palabras del texto una sola vez;
+- solo cuando la palabra coincide con el inicio de un patrón de varias palabras
+  verifica el resto con la expresión original (anclada en esa posición).
+
+Texto y patrones se llevan a su forma canónica (`canonico`: minúsculas con
+las tildes marcadas), así que el índice solo tiene las variantes de tilde que
+el patrón admite y las verificaciones no necesitan re.IGNORECASE. Los conteos por patrón
+son idénticos a los de `contar_patrones` sobre texto normalizado (minúsculas y
+espacios simples), incluida la regla de coincidencias no solapadas de
+`re.findall`. Los patrones que no encajan en ese formato simple se cuentan con
+`re.findall`, de modo que el resultado sigue siendo exacto.
+
+`AcumuladorConteos` permite el mismo conteo fragmento a fragmento (p. ej. página
+a página) sin reunir el texto completo en memoria.
+"""
+
+import itertools
+import re
+from typing import Dict, List, Optional, Tuple
+
+from canonico import canonizar, canonizar_patron, compilar_canonico
+
+# Coincidencia ubicada: (grupo, índice del patrón en el grupo, inicio, fin).
+Coincidencia = Tuple[str, int, int, int]
+
+
+_RE_PALABRA = re.compile(r"\w+")
+
+# Un patrón "simple": \b + palabras (letras o clases [..] de letras) separadas por
+# un espacio + \b.
+_RE_PATRON_SIMPLE = re.compile(
+    r"\\b((?:[^\W\d_]|\[[^\W\d_]+\])+(?: (?:[^\W\d_]|\[[^\W\d_]+\])+)*)\\b"
+)
+_RE_TROZO = re.compile(r"\[([^\]]+)\]|(.)")
+
+
+def _variantes_palabra(palabra: str) -> List[str]:
+    """
+    Expande una palabra con clases de caracteres (p. ej. 'declaraci[oó]n')
+    en todas sus variantes literales.
+    """
+    opciones = []
+    for clase, literal in _RE_TROZO.findall(palabra):
+        opciones.append(list(clase) if clase else [literal])
+    return ["".join(v) for v in itertools.product(*opciones)]
+
+
+def _analizar_patron(patron: str) -> Optional[Tuple[List[str], int]]:
+    """
+    Devuelve (variantes de la primera palabra, número de palabras) si el patrón
+    es simple; None si debe contarse con `re.findall`.
+    """
+    m = _RE_PATRON_SIMPLE.fullmatch(patron)
+    if not m:
+        return None
+    palabras = m.group(1).split(" ")
+    variantes = _variantes_palabra(palabras[0])
+    return variantes, len(palabras)
+
+
+def _plegar(texto: str) -> str:
+    return canonizar(texto or "")
+
+
+class EscanerPatrones:
+    """
+    Compila grupos de patrones una sola vez y cuenta todas sus coincidencias
+    recorriendo el texto en una única pasada.
+
+    `grupos` es un dict {nombre_grupo: [patrones]}; `contar` devuelve
+    {nombre_grupo: [conteo de cada patrón, en el mismo orden]}.
+    """
+
+    def __init__(self, grupos: Dict[str, List[str]]):
+        self.grupos = {g: list(ps) for g, ps in grupos.items()}
+        self._destinos: List[Tuple[str, int]] = []
+        self._indice: Dict[str, List[Tuple[int, Optional["re.Pattern"]]]] = {}
+        self._residuales: List[Tuple[int, "re.Pattern"]] = []
+        self._max_palabras = 1
+
+        for grupo, patrones in self.grupos.items():
+            for pos, patron in enumerate(patrones):
+                idx = len(self._destinos)
+                self._destinos.append((grupo, pos))
+                compilado = compilar_canonico(patron)
+                analisis = _analizar_patron(canonizar_patron(patron))
+                if analisis is None:
+                    self._residuales.append((idx, compilado))
+                    continue
+                variantes, n_palabras = analisis
+                self._max_palabras = max(self._max_palabras, n_palabras)
+                verificador = compilado if n_palabras > 1 else None
+                for v in variantes:
+                    self._indice.setdefault(v, []).append((idx, verificador))
+
+    def _escanear(
+        self,
+        texto: str,
+        conteos: List[int],
+        fin_ultimo: List[int],
+        reservar: int = 0,
+        posiciones: Optional[List[Tuple[int, int, int]]] = None,
+    ) -> int:
+        """
+        Suma a `conteos` las coincidencias de los patrones simples en `texto`
+        (ya plegado). Con `reservar` > 0 deja sin procesar las últimas palabras,
+        que aún podrían formar parte de un patrón multipalabra, y devuelve la
+        posición donde empiezan; sin reserva devuelve len(texto). Con
+        `posiciones` se agrega además (patrón, inicio, fin) de cada coincidencia.
+
+        `fin_ultimo` guarda el fin de la última coincidencia de cada patrón
+        multipalabra: igual que re.findall, no se cuentan coincidencias
+        solapadas del mismo patrón.
+        """
+        corte = len(texto)
+        palabras = _RE_PALABRA.finditer(texto)
+        if reservar:
+            palabras = list(palabras)
+            if len(palabras) <= reservar:
+                return palabras[0].start() if palabras else corte
+            corte = palabras[-reservar].start()
+            palabras = palabras[:-reservar]
+
+        indice = self._indice
+        for m in palabras:
+            candidatos = indice.get(m.group())
+            if not candidatos:
+                continue
+            for idx, verificador in candidatos:
+                if verificador is None:
+                    conteos[idx] += 1
+                    if posiciones is not None:
+                        posiciones.append((idx, m.start(), m.end()))
+                    continue
+                inicio = m.start()
+                if inicio < fin_ultimo[idx]:
+                    continue
+                r = verificador.match(texto, inicio)
+                if r:
+                    conteos[idx] += 1
+                    fin_ultimo[idx] = r.end()
+                    if posiciones is not None:
+                        posiciones.append((idx, inicio, r.end()))
+        return corte
+
+    def _agrupar(self, conteos: List[int]) -> Dict[str, List[int]]:
+        resultado = {g: [0] * len(ps) for g, ps in self.grupos.items()}
+        for idx, (grupo, pos) in enumerate(self._destinos):
+            resultado[grupo][pos] = conteos[idx]
+        return resultado
+
+    def contar(self, texto: str) -> Dict[str, List[int]]:
+        """
+        Cuenta las coincidencias de todos los patrones en una sola pasada.
+        Pensado para texto ya normalizado con `evaluador.normalizar_texto`.
+        """
+        conteos = [0] * len(self._destinos)
+        texto = _plegar(texto)
+        self._escanear(texto, conteos, [0] * len(self._destinos))
+        for idx, compilado in self._residuales:
+            conteos[idx] = len(compilado.findall(texto))
+        return self._agrupar(conteos)
+
+    def ubicar(self, texto: str) -> List[Coincidencia]:
+        """
+        Como `contar`, pero devuelve cada coincidencia con su posición en
+        `texto`, ordenadas por inicio. El texto debe estar ya en minúsculas
+        (normalizar_texto), para que las posiciones no cambien al plegarlo.
+        """
+        posiciones: List[Tuple[int, int, int]] = []
+        texto = _plegar(texto)
+        self._escanear(texto, [0] * len(self._destinos), [0] * len(self._destinos), posiciones=posiciones)
+        for idx, compilado in self._residuales:
+            posiciones.extend((idx, m.start(), m.end()) for m in compilado.finditer(texto))
+        posiciones.sort(key=lambda c: (c[1], c[0]))
+        return [(*self._destinos[idx], inicio, fin) for idx, inicio, fin in posiciones]
+
+    def contar_ubicadas(self, coincidencias: List[Coincidencia]) -> Dict[str, List[int]]:
+        """
+        Conteos por patrón (formato de `contar`) a partir de `ubicar`.
+        """
+        resultado = {g: [0] * len(ps) for g, ps in self.grupos.items()}
+        for grupo, pos, _, _ in coincidencias:
+            resultado[grupo][pos] += 1
+        return resultado
+
+    def acumulador(self, ubicar: bool = False) -> "AcumuladorConteos":
+        """
+        Devuelve un acumulador para contar el texto por fragmentos (y, con
+        `ubicar`, conservar la posición de cada coincidencia).
+        """
+        return AcumuladorConteos(self, ubicar)
+
+
+class AcumuladorConteos:
+    """
+    Conteo incremental con un EscanerPatrones: `agregar` recibe fragmentos ya
+    normalizados (p. ej. página a página) y `resultado` devuelve los mismos
+    conteos que `EscanerPatrones.contar` daría sobre los fragmentos unidos por
+    un espacio.
+
+    Solo se conserva entre fragmentos la cola de palabras que todavía podría
+    iniciar un patrón multipalabra. Si el escáner tuviera patrones no simples
+    (contados con re.findall), su texto sí se acumula completo.
+
+    Con `ubicar`, `coincidencias` devuelve además lo mismo que
+    `EscanerPatrones.ubicar` sobre los fragmentos unidos.
+    """
+
+    def __init__(self, escaner: EscanerPatrones, ubicar: bool = False):
+        self._escaner = escaner
+        n = len(escaner._destinos)
+        self._conteos = [0] * n
+        self._fin_ultimo = [0] * n
+        self._pendiente = ""
+        self._texto_residual: List[str] = []
+        self._ubicadas: Optional[List[Tuple[int, int, int]]] = [] if ubicar else None
+        # Posición del texto pendiente y largo total en el texto unido.
+        self._base = 0
+        self._largo = 0
+
+    def agregar(self, fragmento: str) -> None:
+        fragmento = _plegar(fragmento)
+        if not fragmento:
+            return
+        if self._escaner._residuales:
+            self._texto_residual.append(fragmento)
+
+        # Las posiciones de fin_ultimo son relativas al inicio del texto pendiente.
+        if self._pendiente:
+            texto = self._pendiente + " " + fragmento
+        else:
+            texto = fragmento
+            self._base = self._largo + 1 if self._largo else 0
+        self._largo += len(fragmento) + (1 if self._largo else 0)
+        posiciones = [] if self._ubicadas is not None else None
+        corte = self._escaner._escanear(
+            texto, self._conteos, self._fin_ultimo,
+            reservar=self._escaner._max_palabras - 1, posiciones=posiciones,
+        )
+        if posiciones:
+            self._ubicadas.extend((idx, self._base + i, self._base + f) for idx, i, f in posiciones)
+        self._pendiente = texto[corte:]
+        self._base += corte
+        self._fin_ultimo = [max(0, f - corte) for f in self._fin_ultimo]
+
+    def resultado(self) -> Dict[str, List[int]]:
+        """
+        Conteos de todo lo agregado hasta ahora (se puede llamar en cualquier
+        momento; no altera el estado del acumulador).
+        """
+        conteos = list(self._conteos)
+        self._escaner._escanear(self._pendiente, conteos, list(self._fin_ultimo))
+        if self._texto_residual:
+            texto = " ".join(self._texto_residual)
+            for idx, compilado in self._escaner._residuales:
+                conteos[idx] = len(compilado.findall(texto))
+        return self._escaner._agrupar(conteos)
+
+    def coincidencias(self) -> List[Coincidencia]:
+        """
+        Coincidencias de todo lo agregado, con su posición en los fragmentos
+        unidos por un espacio (requiere ubicar=True; no altera el estado).
+        """
+        if self._ubicadas is None:
+            raise ValueError("El acumulador no se creó con ubicar=True")
+        posiciones = list(self._ubicadas)
+        pendientes: List[Tuple[int, int, int]] = []
+        self._escaner._escanear(
+            self._pendiente, [0] * len(self._conteos), list(self._fin_ultimo), posiciones=pendientes
+        )
+        posiciones.extend((idx, self._base + i, self._base + f) for idx, i, f in pendientes)
+        if self._texto_residual:
+            texto = " ".join(self._texto_residual)
+            for idx, compilado in self._escaner._residuales:
+                posiciones.extend((idx, m.start(), m.end()) for m in compilado.finditer(texto))
+        posiciones.sort(key=lambda c: (c[1], c[0]))
+        return [(*self._escaner._destinos[idx], inicio, fin) for idx, inicio, fin in posiciones]
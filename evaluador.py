@@ -1,5 +1,17 @@
+import copy
 import re
-from typing import Dict, Any
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Optional, Tuple, Union
+
+from cache import CacheLRU, huella, huella_funcion
+from canonico import canonizar, compilar_canonico, huella_canonico
+from config import CACHE_RESULTADOS_MAX_ENTRADAS, PESOS_CRITERIOS, VENTANA_CONTRADICCION_C7
+from escaner import Coincidencia, EscanerPatrones
+from perfil import Perfil
+from proximidad import IndicePosicional, contar_cercanos
+
+if TYPE_CHECKING:
+    from documento import DocumentoAnalizado
 
 
 # ============================================================
@@ -20,16 +32,29 @@ def normalizar_texto(texto: str) -> str:
 def contar_patrones(texto: str, patrones) -> int:
     """
     Cuenta cuántas veces aparecen uno o varios patrones (palabras o expresiones regulares).
-    `patrones` puede ser una lista de strings o un solo string.
+    `patrones` puede ser una lista de strings o un solo string. La búsqueda
+    no distingue mayúsculas ni tildes (ver canonico).
     """
     if isinstance(patrones, str):
         patrones = [patrones]
+    texto = canonizar(texto)
     total = 0
     for p in patrones:
-        total += len(re.findall(p, texto, flags=re.IGNORECASE))
+        total += len(compilar_canonico(p).findall(texto))
     return total
 
 
+def aplicar_escalera(valor: float, escalera: Tuple[Tuple[float, ...], Tuple[Any, ...]]) -> Any:
+    """
+    Escalera de umbrales (umbrales crecientes, puntajes), con un puntaje más
+    que umbrales: por debajo del primer umbral, puntajes[0]; desde umbrales[i]
+    (inclusive), puntajes[i + 1]. Equivale a np.digitize(valor, umbrales)
+    como índice en los puntajes (ver corpus.py).
+    """
+    umbrales, puntajes = escalera
+    return puntajes[bisect_right(umbrales, valor)]
+
+
 # ============================================================
 # EVALUACIÓN POR CRITERIOS (C1–C12)
 # ------------------------------------------------------------
@@ -38,27 +63,50 @@ def contar_patrones(texto: str, patrones) -> int:
 # afinarlos juntos con tu metodología exacta.
 # ============================================================
 
+PATRONES_C1 = [
+    r"\bindicio\b",
+    r"\bhecho indiciario\b",
+    r"\bhecho base\b",
+    r"\bhechos base\b",
+]
+
+ESCALERA_C1 = ((1, 2, 4, 8), (20, 40, 60, 80, 100))
+
+
+def puntuar_C1(n: int) -> int:
+    """
+    Escalera de umbrales de C1 según el número de coincidencias.
+    """
+    return aplicar_escalera(n, ESCALERA_C1)
+
+
 def evaluar_C1(texto: str) -> int:
     """
     C1: Existencia y claridad de INDICIOS / HECHOS BASE.
     Evalúa si el texto usa lenguaje propio de prueba indiciaria.
     """
-    n = contar_patrones(texto, [
-        r"\bindicio\b",
-        r"\bhecho indiciario\b",
-        r"\bhecho base\b",
-        r"\bhechos base\b"
-    ])
-    if n >= 8:
-        return 100
-    elif n >= 4:
-        return 80
-    elif n >= 2:
-        return 60
-    elif n >= 1:
-        return 40
-    else:
-        return 20
+    return puntuar_C1(contar_patrones(texto, PATRONES_C1))
+
+
+PATRONES_C2 = [
+    r"\bacta\b",
+    r"\bpericia\b",
+    r"\bdeclaraci[oó]n\b",
+    r"\btestigo\b",
+    r"\binforme pericial\b",
+    r"\bata\b",
+    r"\bfojas\b",
+    r"\bfolio\b",
+]
+
+ESCALERA_C2 = ((1, 3, 6, 10), (20, 40, 60, 80, 100))
+
+
+def puntuar_C2(n: int) -> int:
+    """
+    Escalera de umbrales de C2 según el número de coincidencias.
+    """
+    return aplicar_escalera(n, ESCALERA_C2)
 
 
 def evaluar_C2(texto: str) -> int:
@@ -66,26 +114,26 @@ def evaluar_C2(texto: str) -> int:
     C2: Individualización de las FUENTES PROBATORIAS de cada indicio.
     Busca referencias explícitas a actas, pericias, declaraciones, etc.
     """
-    n = contar_patrones(texto, [
-        r"\bacta\b",
-        r"\bpericia\b",
-        r"\bdeclaraci[oó]n\b",
-        r"\btestigo\b",
-        r"\binforme pericial\b",
-        r"\bata\b",
-        r"\bfojas\b",
-        r"\bfolio\b",
-    ])
-    if n >= 10:
-        return 100
-    elif n >= 6:
-        return 80
-    elif n >= 3:
-        return 60
-    elif n >= 1:
-        return 40
-    else:
-        return 20
+    return puntuar_C2(contar_patrones(texto, PATRONES_C2))
+
+
+PATRONES_C3 = [
+    r"\bpor lo tanto\b",
+    r"\ben consecuencia\b",
+    r"\bse infiere\b",
+    r"\bse concluye\b",
+    r"\bde ello se desprende\b",
+    r"\bpor consiguiente\b",
+]
+
+ESCALERA_C3 = ((1, 2, 4, 8), (20, 40, 60, 80, 100))
+
+
+def puntuar_C3(n: int) -> int:
+    """
+    Escalera de umbrales de C3 según el número de coincidencias.
+    """
+    return aplicar_escalera(n, ESCALERA_C3)
 
 
 def evaluar_C3(texto: str) -> int:
@@ -93,24 +141,25 @@ def evaluar_C3(texto: str) -> int:
     C3: Conexión lógica entre HECHOS BASE y HECHOS CONSECUENCIA.
     Busca expresiones típicas de inferencia causal.
     """
-    n = contar_patrones(texto, [
-        r"\bpor lo tanto\b",
-        r"\ben consecuencia\b",
-        r"\bse infiere\b",
-        r"\bse concluye\b",
-        r"\bde ello se desprende\b",
-        r"\bpor consiguiente\b",
-    ])
-    if n >= 8:
-        return 100
-    elif n >= 4:
-        return 80
-    elif n >= 2:
-        return 60
-    elif n >= 1:
-        return 40
-    else:
-        return 20
+    return puntuar_C3(contar_patrones(texto, PATRONES_C3))
+
+
+PATRONES_C4 = [
+    r"\bconjunto de indicios\b",
+    r"\bpluralidad de indicios\b",
+    r"\bvarios indicios\b",
+    r"\bindicios convergentes\b",
+    r"\bconvergencia de indicios\b",
+]
+
+ESCALERA_C4 = ((1, 2, 3, 5), (20, 40, 60, 80, 100))
+
+
+def puntuar_C4(n: int) -> int:
+    """
+    Escalera de umbrales de C4 según el número de coincidencias.
+    """
+    return aplicar_escalera(n, ESCALERA_C4)
 
 
 def evaluar_C4(texto: str) -> int:
@@ -118,23 +167,26 @@ def evaluar_C4(texto: str) -> int:
     C4: Pluralidad, convergencia y PERSISTENCIA de indicios.
     Busca referencias a 'conjunto de indicios', 'pluralidad', etc.
     """
-    n = contar_patrones(texto, [
-        r"\bconjunto de indicios\b",
-        r"\bpluralidad de indicios\b",
-        r"\bvarios indicios\b",
-        r"\bindicios convergentes\b",
-        r"\bconvergencia de indicios\b",
-    ])
-    if n >= 5:
-        return 100
-    elif n >= 3:
-        return 80
-    elif n >= 2:
-        return 60
-    elif n >= 1:
-        return 40
-    else:
-        return 20
+    return puntuar_C4(contar_patrones(texto, PATRONES_C4))
+
+
+PATRONES_C5 = [
+    r"\bhip[oó]tesis alternativa\b",
+    r"\bversion de descargo\b",
+    r"\bexplicaci[oó]n alternativa\b",
+    r"\bposible explicaci[oó]n\b",
+    r"\bno se descarta\b",
+    r"\bpodr[ií]a explicarse\b",
+]
+
+ESCALERA_C5 = ((1, 2, 3, 5), (10, 40, 60, 80, 100))
+
+
+def puntuar_C5(n: int) -> int:
+    """
+    Escalera de umbrales de C5 según el número de coincidencias.
+    """
+    return aplicar_escalera(n, ESCALERA_C5)
 
 
 def evaluar_C5(texto: str) -> int:
@@ -143,68 +195,57 @@ def evaluar_C5(texto: str) -> int:
     Este criterio es clave: suele ser bajo cuando la sentencia no discute
     seriamente la versión de descargo.
     """
-    n = contar_patrones(texto, [
-        r"\bhip[oó]tesis alternativa\b",
-        r"\bversion de descargo\b",
-        r"\bexplicaci[oó]n alternativa\b",
-        r"\bposible explicaci[oó]n\b",
-        r"\bno se descarta\b",
-        r"\bpodr[ií]a explicarse\b",
-    ])
-    if n >= 5:
-        return 100
-    elif n >= 3:
-        return 80
-    elif n >= 2:
-        return 60
-    elif n >= 1:
-        return 40
-    else:
-        return 10  # C5 muy sensible: si no hay nada, puntaje casi nulo
+    return puntuar_C5(contar_patrones(texto, PATRONES_C5))
+
+
+PATRONES_C6 = [
+    r"\bpresunci[oó]n de inocencia\b",
+    r"\bm[aá]s all[aá] de toda duda razonable\b",
+    r"\best[aá]ndar probatorio\b",
+    r"\bcarga de la prueba\b",
+]
+
+ESCALERA_C6 = ((1, 2, 3, 5), (20, 40, 60, 80, 100))
+
+
+def puntuar_C6(n: int) -> int:
+    """
+    Escalera de umbrales de C6 según el número de coincidencias.
+    """
+    return aplicar_escalera(n, ESCALERA_C6)
 
 
 def evaluar_C6(texto: str) -> int:
     """
     C6: Respeto de la PRESUNCIÓN DE INOCENCIA y estándares de prueba.
     """
-    n = contar_patrones(texto, [
-        r"\bpresunci[oó]n de inocencia\b",
-        r"\bm[aá]s all[aá] de toda duda razonable\b",
-        r"\best[aá]ndar probatorio\b",
-        r"\bcarga de la prueba\b",
-    ])
-    if n >= 5:
-        return 100
-    elif n >= 3:
-        return 80
-    elif n >= 2:
-        return 60
-    elif n >= 1:
-        return 40
-    else:
-        return 20
+    return puntuar_C6(contar_patrones(texto, PATRONES_C6))
+
 
+PATRONES_C7_NEG = [
+    r"\bno se ha acreditado\b",
+    r"\bno se prob[oó]\b",
+    r"\bno existe prueba\b",
+]
 
-def evaluar_C7(texto: str) -> int:
+PATRONES_C7_POS = [
+    r"\bse encuentra plenamente probado\b",
+    r"\bqueda acreditado\b",
+    r"\bprueba suficiente\b",
+]
+
+
+def puntuar_C7(neg: int, pos: int, cercanos: Optional[int] = None) -> int:
+    """
+    Escalera de C7 a partir de las expresiones negativas y positivas encontradas.
+    Con `cercanos` (expresiones negativas con una positiva dentro de la
+    ventana, ver contradicciones_C7) la posible contradicción exige además
+    que alguna pareja esté próxima.
     """
-    C7: Coherencia global del razonamiento (ausencia de contradicciones internas).
-    Heurística: penalizamos la coexistencia de expresiones contradictorias
-    tipo 'no se ha acreditado' / 'se encuentra plenamente probado'.
-    """
-    neg = contar_patrones(texto, [
-        r"\bno se ha acreditado\b",
-        r"\bno se prob[oó]\b",
-        r"\bno existe prueba\b",
-    ])
-    pos = contar_patrones(texto, [
-        r"\bse encuentra plenamente probado\b",
-        r"\bqueda acreditado\b",
-        r"\bprueba suficiente\b",
-    ])
     # Si hay mucho de ambos, asumimos posible incoherencia
     if pos == 0 and neg == 0:
         return 40
-    if pos > 0 and neg > 0 and abs(pos - neg) <= 2:
+    if pos > 0 and neg > 0 and abs(pos - neg) <= 2 and (cercanos is None or cercanos > 0):
         return 30  # posible contradicción
     if pos >= 3 and neg == 0:
         return 90
@@ -216,125 +257,303 @@ def evaluar_C7(texto: str) -> int:
     return 50
 
 
+def contradicciones_C7(coincidencias: List[Coincidencia], ventana: int) -> int:
+    """
+    Expresiones negativas de C7 que tienen una positiva a `ventana`
+    caracteres o menos, a partir de coincidencias ubicadas (grupo, índice,
+    inicio, fin) como las de ESCANER_CRITERIOS.ubicar.
+    """
+    indice = IndicePosicional()
+    for grupo, _, inicio, _ in coincidencias:
+        if grupo in ("C7_neg", "C7_pos"):
+            indice.agregar(grupo, inicio)
+    return indice.contar_cercanos("C7_neg", "C7_pos", ventana)
+
+
+def evaluar_C7(texto: str, ventana: Optional[int] = None) -> int:
+    """
+    C7: Coherencia global del razonamiento (ausencia de contradicciones internas).
+    Heurística: penalizamos la coexistencia de expresiones contradictorias
+    tipo 'no se ha acreditado' / 'se encuentra plenamente probado' (con
+    `ventana`, solo si aparecen a esa distancia o menos).
+    """
+    neg = contar_patrones(texto, PATRONES_C7_NEG)
+    pos = contar_patrones(texto, PATRONES_C7_POS)
+    cercanos = None
+    if ventana is not None:
+        coincidencias = _escaner_criterio("C7").ubicar(normalizar_texto(texto))
+        cercanos = contradicciones_C7(coincidencias, ventana)
+    return puntuar_C7(neg, pos, cercanos)
+
+
+PATRONES_C8 = [
+    r"\bfecha\b",
+    r"\blugar\b",
+    r"\bhecho imputado\b",
+    r"\bocurri[oó]\b",
+    r"\baconteci[oó]\b",
+    r"\brelato f[aá]ctico\b",
+]
+
+ESCALERA_C8 = ((1, 2, 4, 8), (30, 40, 60, 80, 100))
+
+
+def puntuar_C8(n: int) -> int:
+    """
+    Escalera de umbrales de C8 según el número de coincidencias.
+    """
+    return aplicar_escalera(n, ESCALERA_C8)
+
+
 def evaluar_C8(texto: str) -> int:
     """
     C8: Claridad en la descripción del HECHO IMPUTADO y su marco fáctico.
     """
-    n = contar_patrones(texto, [
-        r"\bfecha\b",
-        r"\blugar\b",
-        r"\bhecho imputado\b",
-        r"\bocurri[oó]\b",
-        r"\baconteci[oó]\b",
-        r"\brelato f[aá]ctico\b",
-    ])
-    if n >= 8:
-        return 100
-    elif n >= 4:
-        return 80
-    elif n >= 2:
-        return 60
-    elif n >= 1:
-        return 40
-    else:
-        return 30
+    return puntuar_C8(contar_patrones(texto, PATRONES_C8))
+
+
+PATRONES_C9 = [
+    r"\bfunci[oó]n\b",
+    r"\brol\b",
+    r"\bparticipaci[oó]n\b",
+    r"\baporte\b",
+    r"\bintervenci[oó]n\b",
+]
+
+ESCALERA_C9 = ((1, 2, 3, 6), (30, 40, 60, 80, 100))
+
+
+def puntuar_C9(n: int) -> int:
+    """
+    Escalera de umbrales de C9 según el número de coincidencias.
+    """
+    return aplicar_escalera(n, ESCALERA_C9)
 
 
 def evaluar_C9(texto: str) -> int:
     """
     C9: Individualización del aporte del acusado (rol funcional).
     """
-    n = contar_patrones(texto, [
-        r"\bfunci[oó]n\b",
-        r"\brol\b",
-        r"\bparticipaci[oó]n\b",
-        r"\baporte\b",
-        r"\bintervenci[oó]n\b",
-    ])
-    if n >= 6:
-        return 100
-    elif n >= 3:
-        return 80
-    elif n >= 2:
-        return 60
-    elif n >= 1:
-        return 40
-    else:
-        return 30
+    return puntuar_C9(contar_patrones(texto, PATRONES_C9))
+
+
+PATRONES_C10 = [
+    r"\bprueba de descargo\b",
+    r"\btestigo de descargo\b",
+    r"\bse valor[oó] la versi[oó]n del acusado\b",
+    r"\bprueba ofrecida por la defensa\b",
+]
+
+ESCALERA_C10 = ((1, 2, 4), (25, 60, 80, 100))
+
+
+def puntuar_C10(n: int) -> int:
+    """
+    Escalera de umbrales de C10 según el número de coincidencias.
+    """
+    return aplicar_escalera(n, ESCALERA_C10)
 
 
 def evaluar_C10(texto: str) -> int:
     """
     C10: Tratamiento de la prueba de descargo (testigos de defensa, documentos, etc.).
     """
-    n = contar_patrones(texto, [
-        r"\bprueba de descargo\b",
-        r"\btestigo de descargo\b",
-        r"\bse valor[oó] la versi[oó]n del acusado\b",
-        r"\bprueba ofrecida por la defensa\b",
-    ])
-    if n >= 4:
-        return 100
-    elif n >= 2:
-        return 80
-    elif n >= 1:
-        return 60
-    else:
-        return 25
+    return puntuar_C10(contar_patrones(texto, PATRONES_C10))
+
+
+PATRONES_C11 = [
+    r"\bt[ií]pico\b",
+    r"\btipicidad\b",
+    r"\bencuadra en el tipo penal\b",
+    r"\belementos del tipo penal\b",
+    r"\badecuaci[oó]n t[ií]pica\b",
+]
+
+ESCALERA_C11 = ((1, 2, 3, 5), (30, 40, 60, 80, 100))
+
+
+def puntuar_C11(n: int) -> int:
+    """
+    Escalera de umbrales de C11 según el número de coincidencias.
+    """
+    return aplicar_escalera(n, ESCALERA_C11)
 
 
 def evaluar_C11(texto: str) -> int:
     """
     C11: Claridad en la motivación sobre la TIPICIDAD (subsunción).
     """
-    n = contar_patrones(texto, [
-        r"\bt[ií]pico\b",
-        r"\btipicidad\b",
-        r"\bencuadra en el tipo penal\b",
-        r"\belementos del tipo penal\b",
-        r"\badecuaci[oó]n t[ií]pica\b",
-    ])
-    if n >= 5:
-        return 100
-    elif n >= 3:
-        return 80
-    elif n >= 2:
-        return 60
-    elif n >= 1:
-        return 40
-    else:
-        return 30
+    return puntuar_C11(contar_patrones(texto, PATRONES_C11))
+
+
+PATRONES_C12 = [
+    r"\bpena\b",
+    r"\bproporcionalidad\b",
+    r"\bculpabilidad\b",
+    r"\bgravedad del hecho\b",
+    r"\bdeterminaci[oó]n judicial de la pena\b",
+    r"\bcircunstancias atenuantes\b",
+    r"\bcircunstancias agravantes\b",
+]
+
+ESCALERA_C12 = ((1, 2, 4, 7), (30, 40, 60, 80, 100))
+
+
+def puntuar_C12(n: int) -> int:
+    """
+    Escalera de umbrales de C12 según el número de coincidencias.
+    """
+    return aplicar_escalera(n, ESCALERA_C12)
 
 
 def evaluar_C12(texto: str) -> int:
     """
     C12: Claridad en la motivación de la PENA (proporcionalidad, culpabilidad, etc.).
     """
-    n = contar_patrones(texto, [
-        r"\bpena\b",
-        r"\bproporcionalidad\b",
-        r"\bculpabilidad\b",
-        r"\bgravedad del hecho\b",
-        r"\bdeterminaci[oó]n judicial de la pena\b",
-        r"\bcircunstancias atenuantes\b",
-        r"\bcircunstancias agravantes\b",
-    ])
-    if n >= 7:
-        return 100
-    elif n >= 4:
-        return 80
-    elif n >= 2:
-        return 60
-    elif n >= 1:
-        return 40
-    else:
-        return 30
+    return puntuar_C12(contar_patrones(texto, PATRONES_C12))
+
+
+# ============================================================
+# ESCANEO EN UNA SOLA PASADA (C1–C12)
+# ------------------------------------------------------------
+# Todos los patrones anteriores se compilan una sola vez en un
+# único escáner; evaluar_todo recorre el texto una vez y aplica
+# las mismas escaleras de umbrales puntuar_C*.
+# ============================================================
+
+PATRONES_CRITERIOS: Dict[str, List[str]] = {
+    "C1": PATRONES_C1,
+    "C2": PATRONES_C2,
+    "C3": PATRONES_C3,
+    "C4": PATRONES_C4,
+    "C5": PATRONES_C5,
+    "C6": PATRONES_C6,
+    "C7_neg": PATRONES_C7_NEG,
+    "C7_pos": PATRONES_C7_POS,
+    "C8": PATRONES_C8,
+    "C9": PATRONES_C9,
+    "C10": PATRONES_C10,
+    "C11": PATRONES_C11,
+    "C12": PATRONES_C12,
+}
+
+ESCANER_CRITERIOS = EscanerPatrones(PATRONES_CRITERIOS)
+
+# Escaleras de los criterios que dependen de un solo conteo (todos salvo C7).
+ESCALERAS_CRITERIOS: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {
+    "C1": ESCALERA_C1,
+    "C2": ESCALERA_C2,
+    "C3": ESCALERA_C3,
+    "C4": ESCALERA_C4,
+    "C5": ESCALERA_C5,
+    "C6": ESCALERA_C6,
+    "C8": ESCALERA_C8,
+    "C9": ESCALERA_C9,
+    "C10": ESCALERA_C10,
+    "C11": ESCALERA_C11,
+    "C12": ESCALERA_C12,
+}
+
+
+def contar_criterios(texto: str) -> Dict[str, List[int]]:
+    """
+    Devuelve los conteos por patrón de cada grupo de PATRONES_CRITERIOS
+    (texto ya normalizado), recorriendo el texto una sola vez.
+    """
+    return ESCANER_CRITERIOS.contar(texto)
+
+
+def _escanear_criterios(
+    texto: str, documento: Optional["DocumentoAnalizado"] = None
+) -> Tuple[Dict[str, List[int]], Optional[int]]:
+    """
+    Conteos por patrón del texto normalizado (o del documento) y, si está
+    configurada VENTANA_CONTRADICCION_C7, las contradicciones próximas de C7,
+    que salen de la misma pasada del escáner.
+    """
+    ventana = VENTANA_CONTRADICCION_C7
+    if documento is not None:
+        if ventana is None:
+            return documento.conteos_criterios, None
+        return documento.conteos_criterios, contradicciones_C7(documento.coincidencias, ventana)
+    if ventana is None:
+        return contar_criterios(texto), None
+    coincidencias = ESCANER_CRITERIOS.ubicar(texto)
+    return (
+        ESCANER_CRITERIOS.contar_ubicadas(coincidencias),
+        contradicciones_C7(coincidencias, ventana),
+    )
+
+
+def puntuar_criterios(
+    conteos: Dict[str, List[int]], cercanos_C7: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Aplica las escaleras de umbrales de C1–C12 a los conteos por patrón
+    (`cercanos_C7`: ver puntuar_C7).
+    """
+    n = {grupo: sum(valores) for grupo, valores in conteos.items()}
+    return {
+        "C1": puntuar_C1(n["C1"]),
+        "C2": puntuar_C2(n["C2"]),
+        "C3": puntuar_C3(n["C3"]),
+        "C4": puntuar_C4(n["C4"]),
+        "C5": puntuar_C5(n["C5"]),
+        "C6": puntuar_C6(n["C6"]),
+        "C7": puntuar_C7(n["C7_neg"], n["C7_pos"], cercanos_C7),
+        "C8": puntuar_C8(n["C8"]),
+        "C9": puntuar_C9(n["C9"]),
+        "C10": puntuar_C10(n["C10"]),
+        "C11": puntuar_C11(n["C11"]),
+        "C12": puntuar_C12(n["C12"]),
+    }
+
+
+def adjuntar_conteos(
+    resultado: Dict[str, Any], conteos: Dict[str, List[int]], cercanos_C7: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Agrega al resultado los conteos por patrón de los que salen sus criterios
+    ("conteos", y "cercanos_C7" si hay ventana de C7), para volver a puntuarlo
+    con otros umbrales o pesos sin escanear el texto (ver corpus.py).
+    """
+    resultado["conteos"] = {grupo: list(valores) for grupo, valores in conteos.items()}
+    if cercanos_C7 is not None:
+        resultado["cercanos_C7"] = cercanos_C7
+    return resultado
 
 
 # ============================================================
 # CÁLCULO DEL ICI GLOBAL E INTERPRETACIÓN
 # ============================================================
 
+# Interpretación según el ICI ajustado.
+ESCALERA_INTERPRETACION = (
+    (50, 60, 70, 80),
+    (
+        "Riesgo MUY ALTO: la coherencia indiciaria es deficiente o casi "
+        "inexistente, especialmente en hipótesis alternativas y "
+        "coherencia global. Se sugiere un análisis profundo y replanteo "
+        "de la decisión judicial.",
+        "Riesgo ALTO: la coherencia indiciaria es frágil; se recomiendan "
+        "observaciones críticas y eventualmente un recurso.",
+        "Riesgo MEDIO: el razonamiento presenta debilidades relevantes, "
+        "especialmente en la valoración de algunas fuentes o en la "
+        "articulación de los indicios.",
+        "Riesgo MEDIO-BAJO: existen algunos puntos discutibles, pero la "
+        "estructura indiciaria parece relativamente consistente.",
+        "Riesgo BAJO: la coherencia indiciaria es globalmente sólida, "
+        "aunque siempre debe contrastarse con una revisión cualitativa.",
+    ),
+)
+
+
+# Penalización del ICI ajustado: un C5 por debajo de UMBRAL_PENALIZACION_C5
+# resta hasta PENALIZACION_MAXIMA_C5 puntos, en proporción a lo que le falta.
+UMBRAL_PENALIZACION_C5 = 70
+PENALIZACION_MAXIMA_C5 = 20
+
+
 def calcular_ici(criterios: Dict[str, int]) -> Dict[str, Any]:
     """
     A partir del diccionario de criterios (C1–C12) calcula:
@@ -350,45 +569,17 @@ def calcular_ici(criterios: Dict[str, int]) -> Dict[str, Any]:
 
     # Penalización por mal tratamiento de hipótesis alternativas (C5)
     c5 = criterios.get("C5", 50)
-    # Cuanto más bajo C5, mayor la penalización (hasta 20 puntos)
-    penalizacion_c5 = max(0, (70 - c5) / 70 * 20)
+    # Cuanto más bajo C5, mayor la penalización (hasta PENALIZACION_MAXIMA_C5 puntos)
+    penalizacion_c5 = max(
+        0, (UMBRAL_PENALIZACION_C5 - c5) / UMBRAL_PENALIZACION_C5 * PENALIZACION_MAXIMA_C5
+    )
     ici_aj = max(0.0, ici_sin - penalizacion_c5)
 
-    # Interpretación
-    if ici_aj >= 80:
-        interpretacion = (
-            "Riesgo BAJO: la coherencia indiciaria es globalmente sólida, "
-            "aunque siempre debe contrastarse con una revisión cualitativa."
-        )
-    elif ici_aj >= 70:
-        interpretacion = (
-            "Riesgo MEDIO-BAJO: existen algunos puntos discutibles, pero la "
-            "estructura indiciaria parece relativamente consistente."
-        )
-    elif ici_aj >= 60:
-        interpretacion = (
-            "Riesgo MEDIO: el razonamiento presenta debilidades relevantes, "
-            "especialmente en la valoración de algunas fuentes o en la "
-            "articulación de los indicios."
-        )
-    elif ici_aj >= 50:
-        interpretacion = (
-            "Riesgo ALTO: la coherencia indiciaria es frágil; se recomiendan "
-            "observaciones críticas y eventualmente un recurso."
-        )
-    else:
-        interpretacion = (
-            "Riesgo MUY ALTO: la coherencia indiciaria es deficiente o casi "
-            "inexistente, especialmente en hipótesis alternativas y "
-            "coherencia global. Se sugiere un análisis profundo y replanteo "
-            "de la decisión judicial."
-        )
-
     return {
         "criterios": criterios,
         "ICI_sin_penalizacion": round(ici_sin, 2),
         "ICI_ajustado": round(ici_aj, 2),
-        "interpretacion": interpretacion,
+        "interpretacion": aplicar_escalera(ici_aj, ESCALERA_INTERPRETACION),
     }
 
 
@@ -396,27 +587,183 @@ def calcular_ici(criterios: Dict[str, int]) -> Dict[str, Any]:
 # FUNCIÓN PRINCIPAL PARA LA APP: evaluar_todo
 # ============================================================
 
-def evaluar_todo(texto: str) -> Dict[str, Any]:
+# Resultados ya calculados, por (hash del texto normalizado, huella_evaluador()).
+CACHE_RESULTADOS = CacheLRU(CACHE_RESULTADOS_MAX_ENTRADAS)
+
+
+def huella_evaluador() -> str:
+    """
+    Huella de versión de todo lo que determina el resultado de evaluar_todo:
+    patrones, escaleras de umbrales, cálculo del ICI, PESOS_CRITERIOS y la
+    ventana de contradicción de C7.
+    Cualquier cambio en ellos produce otra huella, y con ella otra clave de caché.
+    """
+    partes = [
+        repr(PATRONES_CRITERIOS),
+        repr(ESCALERAS_CRITERIOS),
+        repr(ESCALERA_INTERPRETACION),
+        repr((UMBRAL_PENALIZACION_C5, PENALIZACION_MAXIMA_C5)),
+        repr(sorted(PESOS_CRITERIOS.items())),
+        repr(VENTANA_CONTRADICCION_C7),
+        huella_canonico(),
+    ]
+    for funcion in (
+        normalizar_texto, aplicar_escalera,
+        _escanear_criterios, contradicciones_C7, contar_cercanos,
+        puntuar_C1, puntuar_C2, puntuar_C3, puntuar_C4, puntuar_C5, puntuar_C6,
+        puntuar_C7, puntuar_C8, puntuar_C9, puntuar_C10, puntuar_C11, puntuar_C12,
+        puntuar_criterios,
+        calcular_ici,
+    ):
+        partes.append(huella_funcion(funcion))
+    return huella("\n".join(partes))
+
+
+# Escáneres de un solo criterio, para el desglose del modo perfilado.
+_ESCANERES_CRITERIO: Dict[str, EscanerPatrones] = {}
+
+
+def _escaner_criterio(criterio: str) -> EscanerPatrones:
+    if criterio not in _ESCANERES_CRITERIO:
+        grupos = {
+            g: ps for g, ps in PATRONES_CRITERIOS.items() if g.split("_")[0] == criterio
+        }
+        _ESCANERES_CRITERIO[criterio] = EscanerPatrones(grupos)
+    return _ESCANERES_CRITERIO[criterio]
+
+
+def _evaluar_perfilado(
+    texto: str, perfil: Perfil, documento: Optional["DocumentoAnalizado"] = None
+) -> Dict[str, Any]:
+    """
+    evaluar_todo midiendo cada etapa. Además del escaneo real (una sola
+    pasada), cuenta cada criterio con su propio escáner para desglosar el
+    costo de sus patrones (evaluar_C1 ... evaluar_C12); los conteos son los
+    mismos, así que el resultado no cambia.
+
+    Con `documento` (DocumentoAnalizado) se usan su normalización y su
+    escaneo, que no se repiten si ya estaban hechos.
+    """
+    with perfil.medir("evaluar_todo") as total:
+        with perfil.medir("normalizar_texto") as m:
+            texto = documento.normalizado if documento is not None else normalizar_texto(texto)
+            m.datos["caracteres"] = len(texto)
+        with perfil.medir("escaneo C1-C12 (una pasada)") as m:
+            conteos, cercanos_C7 = _escanear_criterios(texto, documento)
+            m.datos["coincidencias"] = sum(sum(v) for v in conteos.values())
+
+        por_criterio = {}
+        for criterio in dict.fromkeys(g.split("_")[0] for g in PATRONES_CRITERIOS):
+            escaner = _escaner_criterio(criterio)
+            with perfil.medir(f"evaluar_{criterio}") as m:
+                conteos_criterio = escaner.contar(texto)
+                m.datos["coincidencias"] = sum(sum(v) for v in conteos_criterio.values())
+            por_criterio[criterio] = m
+
+        with perfil.medir("puntuar_criterios"):
+            criterios = puntuar_criterios(conteos, cercanos_C7)
+        for criterio, m in por_criterio.items():
+            m.datos["puntaje"] = criterios[criterio]
+
+        with perfil.medir("calcular_ici"):
+            resultado = adjuntar_conteos(calcular_ici(criterios), conteos, cercanos_C7)
+        total.datos["ICI_ajustado"] = resultado.get("ICI_ajustado")
+    return resultado
+
+
+def evaluar_todo(
+    texto: Union[str, "DocumentoAnalizado"],
+    usar_cache: bool = True,
+    perfil: Optional[Perfil] = None,
+    secciones: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
     """
     Punto de entrada que usa la app de Streamlit.
-    Recibe el texto completo de la sentencia y devuelve
-    el paquete de resultados (criterios + ICI + interpretación).
-    """
-    texto = normalizar_texto(texto)
-
-    criterios = {
-        "C1": evaluar_C1(texto),
-        "C2": evaluar_C2(texto),
-        "C3": evaluar_C3(texto),
-        "C4": evaluar_C4(texto),
-        "C5": evaluar_C5(texto),
-        "C6": evaluar_C6(texto),
-        "C7": evaluar_C7(texto),
-        "C8": evaluar_C8(texto),
-        "C9": evaluar_C9(texto),
-        "C10": evaluar_C10(texto),
-        "C11": evaluar_C11(texto),
-        "C12": evaluar_C12(texto),
-    }
+    Recibe el texto completo de la sentencia (o un documento.DocumentoAnalizado,
+    cuya normalización y escaneo se reutilizan) y devuelve
+    el paquete de resultados (criterios + ICI + interpretación), con los
+    conteos por patrón de los que salen (ver adjuntar_conteos).
+
+    Con usar_cache=True el resultado se memoriza en CACHE_RESULTADOS, de modo
+    que volver a analizar el mismo texto (o uno que solo difiere en mayúsculas
+    o espacios) no repite el escaneo.
+
+    Con `perfil` (ver perfil.Perfil) se registran tiempos y memoria por etapa
+    y por criterio; en ese modo no se usa la caché, para medir el costo real.
+
+    Con `secciones` (nombres de secciones.SECCIONES) solo se evalúan los
+    párrafos de esas secciones, y el resultado incluye su "ambito" (párrafos y
+    caracteres analizados frente al total).
+    """
+    # Import diferido: documento importa este módulo.
+    from documento import DocumentoAnalizado, acotar_documento
+
+    if secciones is not None:
+        texto = acotar_documento(texto, secciones, perfil)
+    documento = texto if isinstance(texto, DocumentoAnalizado) else None
+    if perfil is not None:
+        resultado = _evaluar_perfilado(texto, perfil, documento)
+    else:
+        resultado = _evaluar_con_cache(texto, usar_cache, documento)
+    if documento is not None and documento.ambito is not None:
+        resultado["ambito"] = dict(documento.ambito)
+    return resultado
+
+
+def _evaluar_con_cache(
+    texto: str, usar_cache: bool, documento: Optional["DocumentoAnalizado"] = None
+) -> Dict[str, Any]:
+    if documento is not None:
+        clave = (documento.huella_normalizado, huella_evaluador())
+    else:
+        texto = normalizar_texto(texto)
+        clave = (huella(texto), huella_evaluador())
+    if usar_cache:
+        guardado = CACHE_RESULTADOS.obtener(clave)
+        if guardado is not None:
+            return copy.deepcopy(guardado)
+
+    conteos, cercanos_C7 = _escanear_criterios(texto, documento)
+    criterios = puntuar_criterios(conteos, cercanos_C7)
+    resultado = adjuntar_conteos(calcular_ici(criterios), conteos, cercanos_C7)
+
+    if usar_cache:
+        CACHE_RESULTADOS.guardar(clave, copy.deepcopy(resultado))
+    return resultado
+
 
-    return calcular_ici(criterios)
+class EvaluacionIncremental:
+    """
+    Evaluación C1–C12 alimentada por fragmentos (p. ej. las páginas que va
+    entregando extractores.iterar_paginas_pdf), sin reunir el texto completo.
+    `resultado()` devuelve lo mismo que evaluar_todo sobre los fragmentos
+    unidos, y puede consultarse en cualquier momento.
+    """
+
+    def __init__(self):
+        self._acumulador = ESCANER_CRITERIOS.acumulador(
+            ubicar=VENTANA_CONTRADICCION_C7 is not None
+        )
+
+    def agregar(self, fragmento: str) -> None:
+        self._acumulador.agregar(normalizar_texto(fragmento))
+
+    def resultado(self) -> Dict[str, Any]:
+        cercanos_C7 = None
+        if VENTANA_CONTRADICCION_C7 is not None:
+            cercanos_C7 = contradicciones_C7(
+                self._acumulador.coincidencias(), VENTANA_CONTRADICCION_C7
+            )
+        conteos = self._acumulador.resultado()
+        criterios = puntuar_criterios(conteos, cercanos_C7)
+        return adjuntar_conteos(calcular_ici(criterios), conteos, cercanos_C7)
+
+
+def evaluar_fragmentos(fragmentos: Iterable[str]) -> Dict[str, Any]:
+    """
+    Igual que evaluar_todo, pero consumiendo el texto por fragmentos.
+    """
+    evaluacion = EvaluacionIncremental()
+    for fragmento in fragmentos:
+        evaluacion.agregar(fragmento)
+    return evaluacion.resultado()
@@ -1,8 +1,52 @@
+import multiprocessing
+import os
 import re
-from typing import Optional
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from io import BytesIO
+from typing import Callable, Iterator, List, Optional, Set, Tuple
+from xml.etree import ElementTree
 
+import docx
 import pdfplumber
 from docx import Document
+from pdfminer.pdfdevice import PDFTextDevice
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFPageInterpreter
+from pdfplumber.utils.text import LIGATURES
+
+from cache import CacheTextos, huella
+from config import (
+    CACHE_EXTRACCION_DIR,
+    CACHE_EXTRACCION_MAX_BYTES_DISCO,
+    CACHE_EXTRACCION_MAX_ENTRADAS,
+    LONGITUD_MEDIA_PALABRA_PDF,
+    MOTOR_PDF,
+    MOTOR_WORD,
+    PAGINAS_MINIMAS_PARALELO,
+    PROCESOS_EXTRACCION_PDF,
+)
+from segmentador import estructurar_pagina
+
+# Avance de una extracción: avance(páginas leídas, páginas totales). Puede
+# lanzar una excepción para interrumpirla (ver trabajos.TrabajoAnalisis).
+Avance = Callable[[int, int], None]
+# Páginas recién leídas de un PDF, en orden y sin las vacías: unir todas las
+# entregas con una línea en blanco da el texto de leer_pdf.
+Paginas = Callable[[List[str]], None]
+
+# Versión de la lógica de extracción: forma parte de la clave de la caché, así
+# que basta con subirla cuando cambie el texto que producen leer_pdf/leer_word.
+VERSION_EXTRACTOR = "4"
+
+CACHE_EXTRACCION = CacheTextos(
+    max_entradas=CACHE_EXTRACCION_MAX_ENTRADAS,
+    directorio=CACHE_EXTRACCION_DIR,
+    max_bytes_disco=CACHE_EXTRACCION_MAX_BYTES_DISCO,
+)
 
 
 def limpiar_texto(texto: Optional[str]) -> str:
@@ -19,27 +63,542 @@ def limpiar_texto(texto: Optional[str]) -> str:
     return texto.strip()
 
 
-def leer_pdf(archivo) -> str:
+# -------------------
+# PDF
+# -------------------
+
+MOTORES_PDF = ("auto", "rapido", "completo")
+
+# Tolerancias (en puntos) con que pdfplumber agrupa caracteres en palabras y
+# líneas; el modo rápido usa las mismas.
+_TOLERANCIA_X = 3
+_TOLERANCIA_Y = 3
+
+
+def _extraer_pagina(pagina) -> str:
+    try:
+        return pagina.extract_text() or ""
+    except Exception:
+        return ""
+
+
+class _DispositivoTexto(PDFTextDevice):
+    """
+    Dispositivo de pdfminer que solo anota, por cada glifo, su posición y su
+    texto en el orden del flujo de contenido, sin construir los objetos de
+    layout (LTChar) ni los dicts de caracteres de pdfplumber, que son la
+    mayor parte del coste de extract_text().
+    """
+
+    def __init__(self, rsrcmgr):
+        super().__init__(rsrcmgr)
+        self.glifos: List[Tuple[float, float, float, str]] = []
+        self.girado = False
+
+    def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate) -> float:
+        a, b, c, d, e, f = matrix
+        if b or c or a <= 0 or d <= 0:
+            self.girado = True
+        try:
+            texto = font.to_unichr(cid)
+        except PDFUnicodeNotDefined:
+            texto = self.handle_undefined_char(font, cid)
+        # Como extract_text (expand_ligatures): "ﬁ" → "fi", etc.
+        texto = LIGATURES.get(texto, texto)
+        adv = font.char_width(cid) * fontsize * scaling
+        # (x inicial, x final, línea base, texto) en coordenadas de la página.
+        self.glifos.append((e, e + adv * a, f + rise * d, texto))
+        return adv
+
+    def handle_undefined_char(self, font, cid: int) -> str:
+        return f"(cid:{cid})"
+
+
+def _texto_rapido(pagina) -> Tuple[str, Optional[str]]:
+    """
+    Modo rápido: reconstruye el texto de la página directamente del flujo de
+    caracteres, en el orden en que se dibujan. Un cambio de línea base abre
+    línea y un hueco mayor que la tolerancia de pdfplumber separa palabras.
+
+    Devuelve (texto, motivo): motivo es None si la página pasa el control de
+    calidad, o la razón por la que conviene leerla con el modo completo:
+    texto girado o vertical, un flujo que no va de arriba abajo y de
+    izquierda a derecha (columnas, pies dibujados antes que el cuerpo) o una
+    longitud media de palabra fuera de config.LONGITUD_MEDIA_PALABRA_PDF
+    (espacios perdidos o letras sueltas).
+    """
+    dispositivo = _DispositivoTexto(pagina.pdf.rsrcmgr)
+    try:
+        PDFPageInterpreter(pagina.pdf.rsrcmgr, dispositivo).process_page(pagina.page_obj)
+    except Exception:
+        return "", "error del intérprete"
+    motivo = "texto girado" if dispositivo.girado else None
+
+    lineas: List[str] = []
+    actual: List[str] = []
+    base = x_fin = None
+    for x0, x1, y, texto in dispositivo.glifos:
+        if base is None or abs(y - base) > _TOLERANCIA_Y:
+            if base is not None and y > base:
+                motivo = motivo or "orden del flujo"
+            if actual:
+                lineas.append("".join(actual).strip())
+            actual = []
+            base = y
+        elif x0 < x_fin - _TOLERANCIA_X:
+            motivo = motivo or "orden del flujo"
+        if texto.isspace() or (actual and x0 > x_fin + _TOLERANCIA_X):
+            if actual and actual[-1] != " ":
+                actual.append(" ")
+        if not texto.isspace():
+            actual.append(texto)
+        x_fin = x1
+    if actual:
+        lineas.append("".join(actual).strip())
+    texto = "\n".join(linea for linea in lineas if linea)
+
+    palabras = texto.split()
+    if palabras and motivo is None:
+        minimo, maximo = LONGITUD_MEDIA_PALABRA_PDF
+        if not minimo <= sum(map(len, palabras)) / len(palabras) <= maximo:
+            motivo = "longitud de palabra"
+    return texto, motivo
+
+
+def _leer_pagina(pagina, motor: str) -> Tuple[str, str]:
+    """
+    (texto, modo) de una página: modo "rapido" o "completo" según el motor y
+    el control de calidad de _texto_rapido.
     """
-    Lee un PDF (subido vía Streamlit) y devuelve todo el texto concatenado.
-    No se limita a las primeras páginas.
+    if motor != "completo":
+        texto, motivo = _texto_rapido(pagina)
+        if motivo is None or motor == "rapido":
+            return texto, "rapido"
+    return _extraer_pagina(pagina), "completo"
+
+
+def _liberar_pagina(pagina) -> None:
+    """
+    Descarta los objetos de layout que pdfplumber guarda en caché en cada
+    página mientras viva `pdf.pages`.
+    """
+    cerrar = getattr(pagina, "close", None) or getattr(pagina, "flush_cache", None)
+    if cerrar is not None:
+        cerrar()
+
+
+def _recorrer_paginas(
+    pdf, inicio: int = 0, fin: Optional[int] = None, motor: str = "completo"
+) -> Iterator[Tuple[int, str, str]]:
+    """
+    (número, texto, modo) de cada página, con los párrafos ya reconstruidos
+    por segmentador.estructurar_pagina.
+    """
+    for numero, pagina in enumerate(pdf.pages[inicio:fin], start=inicio + 1):
+        texto, modo = _leer_pagina(pagina, motor)
+        contenido = estructurar_pagina(texto)
+        _liberar_pagina(pagina)
+        yield numero, contenido, modo
+
+
+def _extraer_rango_pdf(ruta: str, inicio: int, fin: int, motor: str) -> List[Tuple[str, str]]:
+    """
+    Tarea de cada proceso: abre el PDF por su cuenta y extrae las páginas
+    [inicio, fin) en orden, como (texto, modo) (cadena vacía si una página no
+    tiene texto).
+    """
+    with pdfplumber.open(ruta) as pdf:
+        return [(contenido, modo) for _, contenido, modo in _recorrer_paginas(pdf, inicio, fin, motor)]
+
+
+@contextmanager
+def _ruta_en_disco(archivo) -> Iterator[str]:
+    """
+    Devuelve una ruta que los procesos puedan abrir: la del propio archivo si
+    ya es una ruta, o una copia temporal si es un archivo subido en memoria.
+    """
+    if isinstance(archivo, (str, os.PathLike)):
+        yield os.fspath(archivo)
+        return
+    archivo.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(archivo.read())
+    try:
+        yield tmp.name
+    finally:
+        os.unlink(tmp.name)
+
+
+def _leer_pdf_paralelo(
+    archivo,
+    n_paginas: int,
+    procesos: int,
+    motor: str,
+    avance: Optional[Avance] = None,
+    paginas: Optional[Paginas] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Reparte las páginas en tramos contiguos entre un pool de procesos y
+    devuelve (texto, modo) de cada página en el orden original. `paginas` y
+    `avance` se llaman a medida que llegan los tramos, en orden.
+    """
+    n_tramos = min(n_paginas, procesos * 2)
+    tam = -(-n_paginas // n_tramos)
+    tramos = [(i, min(i + tam, n_paginas)) for i in range(0, n_paginas, tam)]
+
+    with _ruta_en_disco(archivo) as ruta:
+        with ProcessPoolExecutor(
+            max_workers=min(procesos, len(tramos)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            resultados = pool.map(
+                _extraer_rango_pdf,
+                [ruta] * len(tramos),
+                [inicio for inicio, _ in tramos],
+                [fin for _, fin in tramos],
+                [motor] * len(tramos),
+            )
+            contenidos: List[Tuple[str, str]] = []
+            for tramo in resultados:
+                contenidos.extend(tramo)
+                try:
+                    if paginas is not None:
+                        paginas([c for c, _ in tramo if c])
+                    if avance is not None:
+                        avance(len(contenidos), n_paginas)
+                except BaseException:
+                    # Extracción interrumpida: no se esperan los tramos pendientes.
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+            return contenidos
+
+
+def leer_pdf(
+    archivo,
+    procesos: Optional[int] = None,
+    avance: Optional[Avance] = None,
+    motor: Optional[str] = None,
+    modos: Optional[List[str]] = None,
+    paginas: Optional[Paginas] = None,
+) -> str:
+    """
+    Lee un PDF (subido vía Streamlit o por ruta) y devuelve todo el texto concatenado.
+    No se limita a las primeras páginas. Los párrafos de cada página (ver
+    segmentador.estructurar_pagina) y las páginas quedan separados por una
+    línea en blanco.
+
+    - procesos: número de procesos para extraer en paralelo (por defecto
+      config.PROCESOS_EXTRACCION_PDF; 1 = secuencial, 0 = todos los núcleos).
+      Los documentos con menos de config.PAGINAS_MINIMAS_PARALELO páginas se
+      leen siempre de forma secuencial. El resultado es idéntico en ambos modos.
+    - avance: se llama con (páginas leídas, páginas totales) tras cada página
+      (o cada tramo, en paralelo).
+    - motor: "auto" (por defecto, config.MOTOR_PDF) lee cada página con el
+      modo rápido y recurre al completo (extract_text de pdfplumber) si no
+      pasa el control de calidad (ver _texto_rapido); "rapido" y "completo"
+      fuerzan uno u otro.
+    - modos: si se pasa una lista, recibe el modo usado en cada página
+      ("rapido" o "completo"), en orden.
+    - paginas: recibe los textos no vacíos de las páginas a medida que se
+      leen (uno por página, o un tramo entero en paralelo), antes de `avance`;
+      permite analizar el documento mientras se sigue extrayendo.
     """
+    motor = motor or MOTOR_PDF
+    if motor not in MOTORES_PDF:
+        raise ValueError(f"Motor de PDF desconocido: {motor!r} (opciones: {MOTORES_PDF})")
+    if procesos is None:
+        procesos = PROCESOS_EXTRACCION_PDF
+    if procesos <= 0:
+        procesos = os.cpu_count() or 1
+
     texto_total = []
     with pdfplumber.open(archivo) as pdf:
-        for pagina in pdf.pages:
-            try:
-                contenido = pagina.extract_text() or ""
-            except Exception:
-                contenido = ""
-            if contenido:
-                texto_total.append(contenido)
-    return "\n\n".join(texto_total)
+        n_paginas = len(pdf.pages)
+        if procesos == 1 or n_paginas < PAGINAS_MINIMAS_PARALELO:
+            for numero, contenido, modo in _recorrer_paginas(pdf, motor=motor):
+                if contenido:
+                    texto_total.append(contenido)
+                if modos is not None:
+                    modos.append(modo)
+                if paginas is not None and contenido:
+                    paginas([contenido])
+                if avance is not None:
+                    avance(numero, n_paginas)
+            return "\n\n".join(texto_total)
+
+    entregadas = repetidas = 0
+
+    def entregar(textos: List[str]) -> None:
+        # Tras volver al modo secuencial no se repiten las páginas ya entregadas.
+        nonlocal entregadas, repetidas
+        quitar = min(repetidas, len(textos))
+        textos, repetidas = textos[quitar:], repetidas - quitar
+        entregadas += len(textos)
+        if textos:
+            paginas(textos)
+
+    try:
+        contenidos = _leer_pdf_paralelo(
+            archivo, n_paginas, procesos, motor, avance, entregar if paginas else None
+        )
+    except (OSError, BrokenProcessPool):
+        # Entornos sin permisos para crear procesos: volvemos al modo secuencial.
+        if hasattr(archivo, "seek"):
+            archivo.seek(0)
+        repetidas = entregadas
+        return leer_pdf(
+            archivo, procesos=1, avance=avance, motor=motor, modos=modos,
+            paginas=entregar if paginas else None,
+        )
+    if modos is not None:
+        modos.extend(modo for _, modo in contenidos)
+    return "\n\n".join(c for c, _ in contenidos if c)
 
 
-def leer_word(archivo) -> str:
+def iterar_paginas_pdf(archivo, motor: Optional[str] = None) -> Iterator[Tuple[int, str]]:
     """
-    Lee un archivo .docx y concatena el texto de todos los párrafos.
+    Recorre el PDF página a página y va entregando (número de página, texto),
+    con cadena vacía si la página no tiene texto. Cada página libera su caché
+    de layout en cuanto se ha leído, de modo que la memoria no crece con el
+    número de páginas.
+
+    Unir los textos no vacíos con una línea en blanco da exactamente
+    leer_pdf(archivo, motor=motor).
     """
+    with pdfplumber.open(archivo) as pdf:
+        for numero, contenido, _ in _recorrer_paginas(pdf, motor=motor or MOTOR_PDF):
+            yield numero, contenido
+
+
+# -------------------
+# Word
+# -------------------
+
+MOTORES_WORD = ("xml", "python-docx")
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_P, _R, _T, _TAB, _PTAB, _BR, _CR = (_W + e for e in ("p", "r", "t", "tab", "ptab", "br", "cr"))
+_GUION_DURO = _W + "noBreakHyphen"
+_TIPO = _W + "type"
+# Copia VML de los cuadros de texto (mc:AlternateContent): se omite para no
+# leer dos veces el mismo cuadro.
+_ALTERNATIVA = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+# Bloques ya leídos cuyo contenedor se vacía al cerrarlos.
+_BLOQUES = {_P, _W + "tbl", _W + "tr"}
+
+_PARTE_WORD = re.compile(r"word/(header|footer)(\d*)\.xml")
+
+
+def _partes_word(nombres: List[str]) -> List[str]:
+    """
+    Partes del .docx en orden de lectura: encabezados, cuerpo, notas al pie,
+    notas finales y pies de página.
+    """
+    extra = {"header": [], "footer": []}
+    for nombre in nombres:
+        m = _PARTE_WORD.fullmatch(nombre)
+        if m:
+            extra[m.group(1)].append((int(m.group(2) or 0), nombre))
+    return (
+        [nombre for _, nombre in sorted(extra["header"])]
+        + ["word/document.xml"]
+        + [n for n in ("word/footnotes.xml", "word/endnotes.xml") if n in nombres]
+        + [nombre for _, nombre in sorted(extra["footer"])]
+    )
+
+
+def _parrafos_parte_xml(xml) -> Iterator[Optional[str]]:
+    """
+    Recorre una parte WordprocessingML con un parser incremental y entrega el
+    texto de cada w:p al cerrarse (None si está vacío), en orden de documento:
+    las celdas de tabla y los cuadros de texto salen como párrafos propios.
+
+    El texto de cada párrafo sigue las mismas reglas que python-docx
+    (w:t, tabuladores, saltos de línea y guiones duros de cada w:r), pero
+    incluye también las inserciones con control de cambios. Cada bloque ya
+    leído se descarta del árbol, así que la memoria no crece con el documento.
+    """
+    pila: List[ElementTree.Element] = []
+    abiertos: List[List[str]] = []
+    omitir = 0
+    for evento, elem in ElementTree.iterparse(xml, events=("start", "end")):
+        etiqueta = elem.tag
+        if evento == "start":
+            pila.append(elem)
+            if etiqueta == _ALTERNATIVA:
+                omitir += 1
+            elif etiqueta == _P and not omitir:
+                abiertos.append([])
+            continue
+
+        pila.pop()
+        if etiqueta == _ALTERNATIVA:
+            omitir -= 1
+        elif omitir or not abiertos:
+            pass
+        elif etiqueta == _P:
+            texto = "".join(abiertos.pop())
+            yield texto if texto.strip() else None
+        elif pila[-1].tag == _R:
+            if etiqueta == _T:
+                abiertos[-1].append(elem.text or "")
+            elif etiqueta in (_TAB, _PTAB):
+                abiertos[-1].append("\t")
+            elif etiqueta == _CR or (
+                etiqueta == _BR and elem.get(_TIPO, "textWrapping") == "textWrapping"
+            ):
+                abiertos[-1].append("\n")
+            elif etiqueta == _GUION_DURO:
+                abiertos[-1].append("-")
+        if etiqueta in _BLOQUES and pila:
+            pila[-1].clear()
+
+
+def _iterar_parrafos_xml(archivo) -> Iterator[Tuple[int, str]]:
+    try:
+        zf = zipfile.ZipFile(archivo)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"No es un archivo .docx válido: {e}") from e
+    with zf:
+        nombres = zf.namelist()
+        if "word/document.xml" not in nombres:
+            raise ValueError("No es un archivo .docx válido: falta word/document.xml")
+        numero = 0
+        # Los encabezados y pies suelen repetirse entre secciones: cada texto
+        # se entrega una sola vez.
+        repetidos: Set[str] = set()
+        for parte in _partes_word(nombres):
+            margen = not parte.startswith(("word/document", "word/footnotes", "word/endnotes"))
+            with zf.open(parte) as xml:
+                for texto in _parrafos_parte_xml(xml):
+                    numero += 1
+                    if texto is None:
+                        continue
+                    if margen:
+                        if texto in repetidos:
+                            continue
+                        repetidos.add(texto)
+                    yield numero, texto
+
+
+def _iterar_parrafos_docx(archivo) -> Iterator[Tuple[int, str]]:
     doc = Document(archivo)
-    partes = [p.text for p in doc.paragraphs if p.text.strip()]
-    return "\n\n".join(partes)
+    for numero, p in enumerate(doc.paragraphs, start=1):
+        if p.text.strip():
+            yield numero, p.text
+
+
+def iterar_parrafos_word(archivo, motor: Optional[str] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Recorre los párrafos con texto de un .docx y entrega (número de párrafo, texto).
+
+    - motor: "xml" (por defecto, config.MOTOR_WORD) lee en streaming
+      word/document.xml y además tablas, cuadros de texto, notas, encabezados
+      y pies, con memoria constante; "python-docx" carga el documento entero
+      y solo entrega los párrafos del cuerpo.
+    """
+    motor = motor or MOTOR_WORD
+    if motor == "xml":
+        return _iterar_parrafos_xml(archivo)
+    if motor == "python-docx":
+        return _iterar_parrafos_docx(archivo)
+    raise ValueError(f"Motor de Word desconocido: {motor!r} (opciones: {MOTORES_WORD})")
+
+
+def leer_word(archivo, motor: Optional[str] = None) -> str:
+    """
+    Lee un archivo .docx y concatena el texto de todos los párrafos (ver
+    iterar_parrafos_word).
+    """
+    return "\n\n".join(texto for _, texto in iterar_parrafos_word(archivo, motor))
+
+
+# -------------------
+# Extracción con caché por contenido
+# -------------------
+
+def _tipo_documento(nombre: str) -> str:
+    nombre = nombre.lower()
+    if nombre.endswith(".pdf"):
+        return "pdf"
+    if nombre.endswith(".docx") or nombre.endswith(".doc"):
+        return "word"
+    raise ValueError(f"Formato no reconocido: {nombre!r}")
+
+
+def _leer_bytes(archivo) -> bytes:
+    if isinstance(archivo, (str, os.PathLike)):
+        with open(archivo, "rb") as f:
+            return f.read()
+    if hasattr(archivo, "getvalue"):
+        return archivo.getvalue()
+    archivo.seek(0)
+    return archivo.read()
+
+
+def clave_extraccion(datos: bytes, tipo: str) -> str:
+    """
+    Clave de la caché: tipo + versión del extractor y del motor (librería) + hash del archivo.
+    """
+    if tipo == "word" and MOTOR_WORD == "xml":
+        motor = "xml"
+    else:
+        libreria = pdfplumber if tipo == "pdf" else docx
+        motor = f"{libreria.__name__}-{getattr(libreria, '__version__', '?')}"
+        if tipo == "pdf" and MOTOR_PDF != "completo":
+            motor = f"{MOTOR_PDF}/{motor}"
+    version = f"{VERSION_EXTRACTOR}/{motor}"
+    return f"{tipo}:{version}:{huella(datos)}"
+
+
+def extraer_texto(
+    archivo,
+    nombre: Optional[str] = None,
+    procesos: Optional[int] = None,
+    avance: Optional[Avance] = None,
+    modos: Optional[List[str]] = None,
+    paginas: Optional[Paginas] = None,
+) -> str:
+    """
+    Extrae el texto de un PDF o Word (ruta o archivo subido) según su extensión.
+
+    El resultado se guarda en CACHE_EXTRACCION con una clave derivada del
+    contenido, de modo que volver a subir el mismo archivo, o cualquier rerun
+    de Streamlit sobre él, devuelve el texto sin volver a extraerlo.
+
+    `procesos` se pasa a leer_pdf (p. ej. 1 cuando ya se llama desde un pool).
+    `avance` recibe (páginas leídas, páginas totales) mientras se extrae un
+    PDF; un Word cuenta como una sola página. No se llama si el texto sale de
+    la caché. `modos`, si se pasa una lista, recibe el modo de extracción de
+    cada página de un PDF (ver leer_pdf); se guarda en la caché junto al texto.
+    `paginas` recibe los textos de las páginas de un PDF según se leen (ver
+    leer_pdf); tampoco se llama si el texto sale de la caché.
+    """
+    if nombre is None:
+        nombre = archivo if isinstance(archivo, (str, os.PathLike)) else getattr(archivo, "name", "")
+    tipo = _tipo_documento(os.fspath(nombre))
+    datos = _leer_bytes(archivo)
+    clave = clave_extraccion(datos, tipo)
+
+    texto = CACHE_EXTRACCION.obtener(clave)
+    if tipo == "pdf" and modos is not None and texto is not None:
+        guardados = CACHE_EXTRACCION.obtener(clave + ":modos")
+        if guardados is None:
+            texto = None
+        else:
+            modos.extend(guardados.split(",") if guardados else [])
+    if texto is None:
+        if tipo == "pdf":
+            leidos: List[str] = []
+            texto = leer_pdf(
+                BytesIO(datos), procesos=procesos, avance=avance, modos=leidos, paginas=paginas
+            )
+            CACHE_EXTRACCION.guardar(clave + ":modos", ",".join(leidos))
+            if modos is not None:
+                modos.extend(leidos)
+        else:
+            texto = leer_word(BytesIO(datos))
+            if avance is not None:
+                avance(1, 1)
+        CACHE_EXTRACCION.guardar(clave, texto)
+    return texto
@@ -8,19 +8,37 @@ Incluye:
 - REGLAS 1 a 9 sobre método indiciario.
 """
 
+import copy
 import re
-from typing import List, Dict, Any
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from cache import CacheLRU, huella, huella_funcion
+from canonico import canonizar, huella_canonico, patron_canonico, plegar_tildes
+from config import CACHE_RESULTADOS_MAX_ENTRADAS, MEMO_PARRAFOS_MAX_ENTRADAS
+from perfil import Perfil
+from proximidad import IndicePosicional, pares_cercanos
+
+if TYPE_CHECKING:
+    from documento import DocumentoAnalizado
 
 
 # -------------------
 # 1. Segmentación y utilidades
 # -------------------
 
+_SEPARADOR_PARRAFOS = re.compile(r"\n\s*\n")
+
+
 def segmentar_parrafos(texto: str) -> List[Dict[str, Any]]:
     """
     Divide el texto en "párrafos" usando doble salto de línea.
     """
-    bloques = re.split(r"\n\s*\n", texto)
+    bloques = _SEPARADOR_PARRAFOS.split(texto)
     parrafos = []
     for i, bloque in enumerate(bloques, start=1):
         limpio = bloque.strip()
@@ -128,721 +146,1643 @@ PATRON_EVAL_FUERTE_INDICIO = re.compile(
 )
 
 
+# ---------- REGLA 3 – Consistencia externa entre indicios ----------
+
+PATRON_CONTRADICCION_INDICIOS = re.compile(
+    r"(no coincide con|contradice|incompatible con|no guarda relaci[oó]n|"
+    r"no se relaciona|resulta incompatible|es inconsistente con|se opone a|discrepa)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_CONEXION = re.compile(
+    r"(relaci[oó]n l[oó]gica|conexi[oó]n|v[ií]nculo|enlace|coherencia externa|armoniza)",
+    flags=re.IGNORECASE,
+)
+
+# ---------- REGLA 4 – Saltos lógicos típicos ----------
+
+PATRON_PRESENCIA = re.compile(
+    r"(por el solo hecho de encontrarse|por el solo hecho de estar|basta la presencia|por estar en el lugar)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_CONOCIMIENTO_R4 = re.compile(
+    r"(deb[ií]a conocer|sab[ií]a|no pod[ií]a ignorar|ten[ií]a conocimiento)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_CARGO = re.compile(
+    r"(por su calidad de|en su condici[oó]n de|en su calidad de|por su cargo de)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_RESPONSAB = re.compile(
+    r"(es responsable|dirig[ií]a|orden[oó]|autoriz[oó]|dispuso|ten[ií]a dominio del hecho)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_CONCLUSION_FUERTE = re.compile(
+    r"(es evidente que|resulta evidente que|no cabe duda de que|"
+    r"resulta incuestionable que|es indudable que)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_REFERENCIA_PRUEBA = re.compile(
+    r"(prueba|pruebas|indicio|indicios|hecho indiciario|hechos indiciarios|"
+    r"pericia|perito|informe pericial|informe t[eé]cnico|"
+    r"testigo|testigos|declaraci[oó]n|declaraciones|acta|actas|informe)",
+    flags=re.IGNORECASE,
+)
+
+# ---------- REGLA 5 – Uso indebido de testimoniales ----------
+
+PATRON_TESTIMONIO = re.compile(
+    r"(testigo|declaraci[oó]n|manifestaci[oó]n|versi[oó]n del imputado)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_FUERZA_INDEBIDA = re.compile(
+    r"(indicio contundente|prueba concluyente|prueba determinante|"
+    r"prueba inequ[ií]voca|permite tener por acreditado|"
+    r"demuestra claramente|acredita fehacientemente)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_AUTORIA = re.compile(
+    r"(particip[oó]|coordin[oó]|dirigi[oó]|orden[oó]|autoriz[oó]|"
+    r"ten[ií]a dominio del hecho|responsable del hecho)",
+    flags=re.IGNORECASE,
+)
+
+# ---------- REGLA 6 – Cadena inferencial incompleta ----------
+
+PATRON_CONCLUSION = re.compile(
+    r"(por tanto|por ende|en consecuencia|por consiguiente|"
+    r"se concluye que|queda acreditado que|resulta acreditado que|"
+    r"resulta probado que|se tiene por probado que)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_SUSTENTO = re.compile(
+    r"(prueba|pruebas|indicio|indicios|hecho indiciario|hechos indiciarios|"
+    r"pericia|perito|acta|informe|testigo|declaraci[oó]n|documento)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_CAUSALIDAD = re.compile(
+    r"(lo cual demuestra que|esto demuestra que|ello demuestra que|"
+    r"lo que prueba que|esto evidencia que|ello evidencia que|"
+    r"lo que acredita que)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_AUTORIA_COORD = re.compile(
+    r"(coordin[oó]|dirigi[oó]|organiz[oó]|autoriz[oó]|"
+    r"dispuso|control[oó]|ten[ií]a dominio del hecho)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_CONOCIMIENTO = re.compile(
+    r"(sab[ií]a que|ten[ií]a conocimiento de|no pod[ií]a ignorar|"
+    r"deb[ií]a conocer|pleno conocimiento de)",
+    flags=re.IGNORECASE,
+)
+
+# ---------- REGLA 7 – Valoración contraria al contenido de la prueba ----------
+
+PATRON_MEDIO_PROBATORIO = re.compile(
+    r"(declaraci[oó]n de|declar[oó] que|manifiest[oó] que|seg[uú]n el acta|"
+    r"seg[uú]n consta en el acta|acta policial|acta fiscal|informe pericial|"
+    r"informe t[eé]cnico|pericia oficial|pericia practicada|seg[uú]n el informe)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_CONTENIDO_NEGATIVO = re.compile(
+    r"(no recuerda|no reconoci[oó]|no vio|no observ[oó]|no estuvo presente|"
+    r"no le consta|no puede precisar|no puede afirmar|no se aprecia|"
+    r"no se advierte|no se demuestra|no se acredita)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_CONCLUSION_FUERTE_PRUEBA = re.compile(
+    r"(de lo que se desprende que|de ello se desprende que|lo que demuestra que|"
+    r"lo que acredita que|ello demuestra que|ello acredita que|"
+    r"permite tener por acreditado que|confirma que|"
+    r"demuestra claramente que|acredita de manera concluyente que)",
+    flags=re.IGNORECASE,
+)
+
+# ---------- REGLA 8 – Hipótesis alternativas mal tratadas ----------
+
+PATRON_ALT_EXISTENCIA = re.compile(
+    r"(otras versiones|otras explicaciones|otras hipótesis|"
+    r"hip[oó]tesis alternativa|versi[oó]n alternativa|"
+    r"coartada|explicaci[oó]n del imputado|"
+    r"otra posible explicaci[oó]n)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_NO_DESCARTA_ALT2 = re.compile(
+    r"(no se descartan|no puede descartarse|no puede excluirse|"
+    r"no se ha descartado|no excluye la versi[oó]n del imputado)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_UNICA_CONCLUSION = re.compile(
+    r"(única explicaci[oó]n posible|única explicaci[oó]n razonable|"
+    r"única conclusi[oó]n posible|única hip[oó]tesis plausible|"
+    r"único camino l[oó]gico|conclusi[oó]n inevitable)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_DESCARTAR_SIN_EXP = re.compile(
+    r"(no es cre[ií]ble|no resulta razonable|no convence al juzgador|"
+    r"no es atendible|resulta inveros[ií]mil|no tiene asidero)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_ANALISIS_ALT = re.compile(
+    r"(analiza la versi[oó]n alternativa|contrasta la hip[oó]tesis|"
+    r"examina la explicaci[oó]n del imputado|"
+    r"eval[uú]a la versi[oó]n alternativa)",
+    flags=re.IGNORECASE,
+)
+
+# ---------- REGLA 9 – Máximas de experiencia y sana crítica ----------
+
+PATRON_MAX_EXP = re.compile(
+    r"(m[aá]ximas de la experiencia|reglas de experiencia|"
+    r"reglas de la experiencia com[uú]n|m[aá]ximas de experiencia com[uú]n)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_SANA_CRITICA = re.compile(
+    r"(sana cr[ií]tica|reglas de la sana cr[ií]tica|"
+    r"principios de la sana cr[ií]tica)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_GENERALIZACION = re.compile(
+    r"(lo normal es que|lo habitual es que|"
+    r"es de experiencia com[uú]n que|"
+    r"es de conocimiento general que|"
+    r"suele ocurrir que|es l[oó]gico pensar que|"
+    r"es natural que)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_ESTEREOTIPO = re.compile(
+    r"(quien nada debe nada teme|nadie inocente huye|"
+    r"quien huye es porque algo teme|"
+    r"todo narcotraficante|todo delincuente|"
+    r"ninguna persona honesta|ning[uú]n inocente)",
+    flags=re.IGNORECASE,
+)
+
+PATRON_SUSTENTO_EXP = re.compile(
+    r"(prueba|pruebas|indicio|indicios|hecho indiciario|hechos indiciarios|"
+    r"pericia|perito|informe pericial|informe t[eé]cnico|"
+    r"estudio estad[ií]stico|estad[ií]sticas|datos emp[ií]ricos|"
+    r"acta|actas|documento|documentaci[oó]n)",
+    flags=re.IGNORECASE,
+)
+
+# Predicados con nombre que las reglas por párrafo pueden pedir, además de las
+# etiquetas calculadas en etiquetar_parrafos().
+PREDICADOS = {
+    "contradiccion_indicios": PATRON_CONTRADICCION_INDICIOS,
+    "presencia": PATRON_PRESENCIA,
+    "conocimiento_r4": PATRON_CONOCIMIENTO_R4,
+    "cargo": PATRON_CARGO,
+    "responsab": PATRON_RESPONSAB,
+    "conclusion_fuerte": PATRON_CONCLUSION_FUERTE,
+    "referencia_prueba": PATRON_REFERENCIA_PRUEBA,
+    "testimonio": PATRON_TESTIMONIO,
+    "fuerza_indebida": PATRON_FUERZA_INDEBIDA,
+    "autoria": PATRON_AUTORIA,
+    "conclusion": PATRON_CONCLUSION,
+    "sustento": PATRON_SUSTENTO,
+    "causalidad": PATRON_CAUSALIDAD,
+    "autoria_coord": PATRON_AUTORIA_COORD,
+    "conocimiento": PATRON_CONOCIMIENTO,
+    "medio_probatorio": PATRON_MEDIO_PROBATORIO,
+    "contenido_negativo": PATRON_CONTENIDO_NEGATIVO,
+    "conclusion_fuerte_prueba": PATRON_CONCLUSION_FUERTE_PRUEBA,
+    "alt_existencia": PATRON_ALT_EXISTENCIA,
+    "no_descarta_alt2": PATRON_NO_DESCARTA_ALT2,
+    "unica_conclusion": PATRON_UNICA_CONCLUSION,
+    "descartar_sin_exp": PATRON_DESCARTAR_SIN_EXP,
+    "analisis_alt": PATRON_ANALISIS_ALT,
+    "max_exp": PATRON_MAX_EXP,
+    "sana_critica": PATRON_SANA_CRITICA,
+    "generalizacion": PATRON_GENERALIZACION,
+    "estereotipo": PATRON_ESTEREOTIPO,
+    "sustento_exp": PATRON_SUSTENTO_EXP,
+}
+
+
 # -------------------
 # 3. Etiquetado de párrafos
 # -------------------
 
-def etiquetar_parrafos(parrafos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+# Etiquetas que se calculan para cada párrafo (nombre → patrón).
+ETIQUETAS = {
+    "duda": PATRON_DUDA,
+    "certeza": PATRON_CERTEZA,
+    "no_descarta_alt": PATRON_NO_DESCARTA_ALT,
+    "unica_explicacion": PATRON_UNICA_EXPLICACION,
+    "sospecha_simple": PATRON_SOSPECHA_SIMPLE,
+    "sospecha_grave": PATRON_SOSPECHA_GRAVE,
+    # Método indiciario:
+    "tiene_indicio": PATRON_INDICIO,
+    "fuente_fuerte": PATRON_FUENTE_FUERTE,
+    "fuente_debil": PATRON_FUENTE_DEBIL,
+    # Evaluación del indicio:
+    "eval_ind_debil": PATRON_EVAL_DEBIL_INDICIO,
+    "eval_ind_fuerte": PATRON_EVAL_FUERTE_INDICIO,
+}
+
+# Anclas de los patrones costosos (DOTALL con ventana .{0,80}): grupos de
+# literales canónicos sin tildes (ver canonico.plegar_tildes) tales que toda
+# coincidencia contiene al menos uno de cada grupo. Si a un párrafo le falta
+# algún grupo, el patrón no se ejecuta.
+ANCLAS = {
+    "eval_ind_debil": (
+        ("indicio", "prueba", "elemento"),
+        ("concluyente", "determinante", "suficiente", "es debil", "escaso valor",
+         "poca fuerza acreditativa", "no permite afirmar", "solo sugiere",
+         "aporta poco", "limitado alcance probatorio"),
+    ),
+    "eval_ind_fuerte": (
+        ("indicio", "prueba", "elemento"),
+        ("contundente", "concluyente", "determinante", "es rotundo", "inequivoco",
+         "de singular fuerza acreditativa", "permite afirmar sin duda",
+         "permite tener por"),
+    ),
+}
+
+
+class _BusquedaParrafo:
+    """
+    Búsquedas de patrones con nombre (ETIQUETAS o PREDICADOS) sobre el texto
+    canónico de un párrafo: cada una se hace a lo sumo una vez, solo cuando
+    alguien la pide, y se omite si el párrafo no contiene sus ANCLAS.
+    """
+
+    __slots__ = ("canonico", "plegado", "resueltos")
+
+    def __init__(self, texto: str):
+        self.canonico = canonizar(texto)
+        self.plegado: Optional[str] = None
+        self.resueltos: Dict[str, bool] = {}
+
+    def _anclado(self, nombre: str) -> bool:
+        grupos = ANCLAS.get(nombre)
+        if not grupos:
+            return True
+        if self.plegado is None:
+            self.plegado = plegar_tildes(self.canonico)
+        return all(any(l in self.plegado for l in grupo) for grupo in grupos)
+
+    def cumple(self, nombre: str, patron: "re.Pattern") -> bool:
+        valor = self.resueltos.get(nombre)
+        if valor is None:
+            valor = self._anclado(nombre) and patron_canonico(patron).search(self.canonico) is not None
+            self.resueltos[nombre] = valor
+        return valor
+
+
+# Etiquetas ya calculadas, por (hash del párrafo, huella_etiquetas()).
+MEMO_ETIQUETAS = CacheLRU(MEMO_PARRAFOS_MAX_ENTRADAS)
+
+
+def huella_etiquetas() -> str:
+    return huella(
+        "\n".join(f"{n}={p.pattern!r}/{p.flags}/{ANCLAS.get(n)!r}" for n, p in ETIQUETAS.items())
+        + huella_funcion(_BusquedaParrafo._anclado)
+        + huella_funcion(_BusquedaParrafo.cumple)
+        + huella_canonico()
+    )
+
+
+# Bit de cada etiqueta en la máscara de un párrafo.
+BITS_ETIQUETAS = {nombre: 1 << i for i, nombre in enumerate(ETIQUETAS)}
+
+
+def _mascara_etiquetas(texto: str, version: Optional[str] = None) -> int:
+    """
+    Máscara de bits de las ETIQUETAS presentes en `texto`. Con `version`
+    (huella_etiquetas()) se consulta y alimenta MEMO_ETIQUETAS.
+    """
+    if version is not None:
+        clave = (huella(texto), version)
+        mascara = MEMO_ETIQUETAS.obtener(clave)
+        if mascara is not None:
+            return mascara
+    mascara = 0
+    busqueda = _BusquedaParrafo(texto)
+    for nombre, patron in ETIQUETAS.items():
+        if busqueda.cumple(nombre, patron):
+            mascara |= BITS_ETIQUETAS[nombre]
+    if version is not None:
+        MEMO_ETIQUETAS.guardar(clave, mascara)
+    return mascara
+
+
+def etiquetar_parrafos(parrafos: List[Dict[str, Any]], usar_memo: bool = True) -> List[Dict[str, Any]]:
+    """
+    Calcula las ETIQUETAS de cada párrafo. Con usar_memo, las etiquetas se
+    memorizan por hash del contenido del párrafo, así que al volver a analizar
+    un texto corregido solo se etiquetan los párrafos nuevos o modificados.
+    """
+    version = huella_etiquetas() if usar_memo else None
     etiquetados = []
     for p in parrafos:
         t = p["texto"]
-        etiquetados.append(
-            {
-                "n": p["n"],
-                "texto": t,
-                "duda": bool(PATRON_DUDA.search(t)),
-                "certeza": bool(PATRON_CERTEZA.search(t)),
-                "no_descarta_alt": bool(PATRON_NO_DESCARTA_ALT.search(t)),
-                "unica_explicacion": bool(PATRON_UNICA_EXPLICACION.search(t)),
-                "sospecha_simple": bool(PATRON_SOSPECHA_SIMPLE.search(t)),
-                "sospecha_grave": bool(PATRON_SOSPECHA_GRAVE.search(t)),
-                # Método indiciario:
-                "tiene_indicio": bool(PATRON_INDICIO.search(t)),
-                "fuente_fuerte": bool(PATRON_FUENTE_FUERTE.search(t)),
-                "fuente_debil": bool(PATRON_FUENTE_DEBIL.search(t)),
-                # Evaluación del indicio:
-                "eval_ind_debil": bool(PATRON_EVAL_DEBIL_INDICIO.search(t)),
-                "eval_ind_fuerte": bool(PATRON_EVAL_FUERTE_INDICIO.search(t)),
-            }
-        )
+        mascara = _mascara_etiquetas(t, version)
+        etiquetado = {"n": p["n"], "texto": t}
+        etiquetado.update((nombre, bool(mascara & bit)) for nombre, bit in BITS_ETIQUETAS.items())
+        etiquetados.append(etiquetado)
     return etiquetados
 
 
+class AlmacenParrafos:
+    """
+    Párrafos etiquetados en forma compacta, pensada para sentencias de decenas
+    de miles de párrafos: el texto queda en un único buffer y de cada párrafo
+    se guardan solo sus offsets, su número y una máscara de bits con sus
+    ETIQUETAS (ver BITS_ETIQUETAS), en arrays de NumPy. Los subconjuntos por
+    etiqueta y las coincidencias (duda y certeza, evaluación débil y fuerte…)
+    se resuelven con operaciones vectoriales sobre las máscaras.
+
+    `parrafo(i)` devuelve una vista de solo lectura con la forma de los dicts
+    de etiquetar_parrafos ({"n", "texto", etiqueta: bool}).
+    """
+
+    def __init__(self, buffer: str, inicios, fines, numeros, mascaras=None):
+        self.buffer = buffer
+        self.inicios = np.asarray(inicios, dtype=np.int64)
+        self.fines = np.asarray(fines, dtype=np.int64)
+        self.numeros = np.asarray(numeros, dtype=np.int64)
+        if mascaras is None:
+            mascaras = np.zeros(len(self.inicios), dtype=np.uint32)
+        self.mascaras = np.asarray(mascaras, dtype=np.uint32)
+
+    @classmethod
+    def segmentar(cls, texto: str) -> "AlmacenParrafos":
+        """
+        Misma segmentación y numeración que segmentar_parrafos, sin copiar el
+        texto de los párrafos. Las máscaras quedan en 0 hasta etiquetar().
+        """
+        inicios: List[int] = []
+        fines: List[int] = []
+        numeros: List[int] = []
+        cortes = [(m.start(), m.end()) for m in _SEPARADOR_PARRAFOS.finditer(texto)]
+        cortes.append((len(texto), len(texto)))
+        inicio = 0
+        for n, (fin, siguiente) in enumerate(cortes, start=1):
+            bloque = texto[inicio:fin]
+            izquierda = len(bloque) - len(bloque.lstrip())
+            derecha = len(bloque.rstrip())
+            if derecha > izquierda:
+                inicios.append(inicio + izquierda)
+                fines.append(inicio + derecha)
+                numeros.append(n)
+            inicio = siguiente
+        return cls(texto, inicios, fines, numeros)
+
+    @classmethod
+    def desde_texto(cls, texto: str, usar_memo: bool = True) -> "AlmacenParrafos":
+        return cls.segmentar(texto).etiquetar(usar_memo)
+
+    @classmethod
+    def desde_parrafos(cls, parrafos: List[Dict[str, Any]]) -> "AlmacenParrafos":
+        """
+        Convierte la salida de etiquetar_parrafos (lista de dicts) en almacén.
+        """
+        textos = [p["texto"] for p in parrafos]
+        largos = np.fromiter((len(t) for t in textos), dtype=np.int64, count=len(textos))
+        fines = np.cumsum(largos)
+        mascaras = [
+            sum(bit for nombre, bit in BITS_ETIQUETAS.items() if p.get(nombre)) for p in parrafos
+        ]
+        return cls("".join(textos), fines - largos, fines, [p["n"] for p in parrafos], mascaras)
+
+    def etiquetar(self, usar_memo: bool = True) -> "AlmacenParrafos":
+        """
+        Calcula la máscara de ETIQUETAS de cada párrafo (con MEMO_ETIQUETAS si
+        usar_memo) y devuelve el propio almacén.
+        """
+        version = huella_etiquetas() if usar_memo else None
+        self.mascaras = np.fromiter(
+            (_mascara_etiquetas(self.texto(i), version) for i in range(len(self))),
+            dtype=np.uint32,
+            count=len(self),
+        )
+        return self
+
+    def __len__(self) -> int:
+        return len(self.inicios)
+
+    def texto(self, i: int) -> str:
+        return self.buffer[self.inicios[i]:self.fines[i]]
+
+    def parrafo(self, i: int) -> "_VistaParrafo":
+        return _VistaParrafo(self, int(i))
+
+    def seleccionar(self, requiere: int = 0, excluye: int = 0, alguno: Tuple[int, ...] = ()) -> np.ndarray:
+        """
+        Índices (en orden) de los párrafos con todos los bits de `requiere`,
+        ninguno de `excluye` y al menos uno de cada máscara de `alguno`.
+        """
+        m = self.mascaras
+        filtro = (m & requiere) == requiere
+        if excluye:
+            filtro &= (m & excluye) == 0
+        for bits in alguno:
+            filtro &= (m & bits) != 0
+        return np.flatnonzero(filtro)
+
+    def contar(self, etiqueta: str) -> int:
+        return int(np.count_nonzero(self.mascaras & BITS_ETIQUETAS[etiqueta]))
+
+    def subconjunto(self, indices) -> "AlmacenParrafos":
+        """
+        Almacén con solo los párrafos de `indices` (en orden), que conservan su
+        número y su máscara. Comparte el buffer, sin copiar texto.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        return AlmacenParrafos(
+            self.buffer,
+            self.inicios[indices],
+            self.fines[indices],
+            self.numeros[indices],
+            self.mascaras[indices],
+        )
+
+
+class _VistaParrafo(Mapping):
+    """
+    Párrafo de un AlmacenParrafos visto como dict {"n", "texto", etiquetas}.
+    """
+
+    __slots__ = ("_almacen", "_i", "_texto")
+
+    def __init__(self, almacen: AlmacenParrafos, i: int):
+        self._almacen = almacen
+        self._i = i
+        self._texto: Optional[str] = None
+
+    def __getitem__(self, clave: str) -> Any:
+        if clave == "texto":
+            if self._texto is None:
+                self._texto = self._almacen.texto(self._i)
+            return self._texto
+        if clave == "n":
+            return int(self._almacen.numeros[self._i])
+        return bool(self._almacen.mascaras[self._i] & BITS_ETIQUETAS[clave])
+
+    def __contains__(self, clave: object) -> bool:
+        return clave in ("n", "texto") or clave in BITS_ETIQUETAS
+
+    def __iter__(self) -> Iterator[str]:
+        yield "n"
+        yield "texto"
+        yield from BITS_ETIQUETAS
+
+    def __len__(self) -> int:
+        return 2 + len(BITS_ETIQUETAS)
+
+
 # -------------------
-# 4. Reglas de incongruencia
+# 4. Registro de reglas de incongruencia
 # -------------------
+#
+# Cada regla se declara una sola vez (al importar el módulo) con:
+# - id y familia ("general", "R1" … "R9"), para poder activarla o excluirla;
+# - alcance: "parrafo" (predicados sobre un párrafo), "pares" (párrafos con
+#   etiquetas opuestas) o "global" (condición sobre el documento completo);
+# - la plantilla del hallazgo (tipo + detalle).
+#
+# Las reglas por párrafo con el mismo `bloque` se aplican párrafo a párrafo,
+# en el orden declarado, igual que los antiguos bucles de cada REGLA.
+
+Condicion = Union[str, Tuple[str, ...]]
+
+MAX_PARES = 3
+# Párrafos que se citan cuando no hay ninguna referencia a indicios (regla 1.1)
+PARRAFOS_MUESTRA = 3
+# Patrones que las reglas globales buscan sobre el texto completo
+PATRONES_TEXTO_GLOBAL = (PATRON_CONJUNTO, PATRON_CONEXION)
+
+
+@dataclass(frozen=True)
+class Regla:
+    id: str
+    familia: str
+    alcance: str
+    tipo: str
+    detalle: str
+    # alcance "parrafo": predicados (etiquetas o PREDICADOS); una tupla = "alguno de"
+    requiere: Tuple[Condicion, ...] = ()
+    excluye: Tuple[Condicion, ...] = ()
+    bloque: str = ""
+    # alcance "pares": etiquetas de cada lado y si deben ser párrafos distintos
+    pares: Tuple[str, str] = ("", "")
+    distintos: bool = False
+    # alcance "global": devuelve los párrafos del hallazgo o None
+    seleccionar: Optional[Callable[[Any], Optional[List[Dict[str, Any]]]]] = None
+    max_extractos: Optional[int] = None
+
+
+class _Contexto:
+    """
+    Datos compartidos por las reglas en una ejecución sobre un AlmacenParrafos:
+    subconjuntos por etiqueta (selección vectorial sobre las máscaras) y texto
+    global, ambos calculados solo si alguna regla los pide.
 
-def detectar_incongruencias(parrafos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    resultados: List[Dict[str, Any]] = []
+    `indice` ubica por número de párrafo los párrafos de cada etiqueta, en el
+    mismo orden que con(etiqueta), para las reglas de pares.
 
-    texto_global = " ".join(p["texto"] for p in parrafos)
+    _ContextoIncremental ofrece la misma interfaz (con, total, primeros,
+    en_texto_global, indice) sin conservar los párrafos completos.
+    """
 
-    con_duda = [p for p in parrafos if p["duda"]]
-    con_certeza = [p for p in parrafos if p["certeza"]]
-    con_no_descarta = [p for p in parrafos if p["no_descarta_alt"]]
-    con_unica = [p for p in parrafos if p["unica_explicacion"]]
-    con_sospecha_simple = [p for p in parrafos if p["sospecha_simple"]]
-    con_sospecha_grave = [p for p in parrafos if p["sospecha_grave"]]
-    con_indicio = [p for p in parrafos if p["tiene_indicio"]]
-    con_eval_debil = [p for p in parrafos if p["eval_ind_debil"]]
-    con_eval_fuerte = [p for p in parrafos if p["eval_ind_fuerte"]]
+    def __init__(self, almacen: AlmacenParrafos):
+        self.almacen = almacen
+        self._subconjuntos: Dict[str, List[Mapping]] = {}
+        self._texto_global: Optional[str] = None
+        self.indice = IndicePosicional(
+            lambda etiqueta: almacen.numeros[almacen.seleccionar(BITS_ETIQUETAS[etiqueta])].tolist()
+        )
 
-    # --------------------------------------------------
-    # 4.0 Reglas generales (duda vs certeza, sospecha)
-    # --------------------------------------------------
+    @property
+    def total(self) -> int:
+        return len(self.almacen)
+
+    def primeros(self, k: int) -> List[Mapping]:
+        return [self.almacen.parrafo(i) for i in range(min(k, len(self.almacen)))]
+
+    def con(self, etiqueta: str) -> List[Mapping]:
+        if etiqueta not in self._subconjuntos:
+            indices = self.almacen.seleccionar(BITS_ETIQUETAS[etiqueta])
+            self._subconjuntos[etiqueta] = [self.almacen.parrafo(i) for i in indices]
+        return self._subconjuntos[etiqueta]
 
-    # 4.0.1 Contradicción duda vs certeza
-    if con_duda and con_certeza:
-        max_pares = 3
-        count = 0
-        for pd in con_duda:
-            for pc in con_certeza:
-                if count >= max_pares:
-                    break
-                resultados.append(
-                    {
-                        "tipo": "Contradicción duda vs certeza",
-                        "parrafos": [pd["n"], pc["n"]],
-                        "detalle": (
-                            "En un párrafo se afirma insuficiencia probatoria y en otro certeza plena, "
-                            "sin justificar la transición."
-                        ),
-                        "extractos": [
-                            recortar_texto(pd["texto"]),
-                            recortar_texto(pc["texto"]),
-                        ],
-                    }
-                )
-                count += 1
-            if count >= max_pares:
-                break
-
-    # 4.0.2 Incongruencia en hipótesis alternativas
-    if con_no_descarta and con_unica:
-        max_pares = 3
-        count = 0
-        for pa in con_no_descarta:
-            for pu in con_unica:
-                if count >= max_pares:
-                    break
-                resultados.append(
-                    {
-                        "tipo": "Incongruencia en hipótesis alternativas",
-                        "parrafos": [pa["n"], pu["n"]],
-                        "detalle": (
-                            "Se afirma que no se descartan hipótesis alternativas, "
-                            "pero a la vez se sostiene que existe una única explicación."
-                        ),
-                        "extractos": [
-                            recortar_texto(pa["texto"]),
-                            recortar_texto(pu["texto"]),
-                        ],
-                    }
-                )
-                count += 1
-            if count >= max_pares:
-                break
-
-    # 4.0.3 Referencia a sospecha simple
-    if con_sospecha_simple:
-        for ps in con_sospecha_simple:
-            resultados.append(
-                {
-                    "tipo": "Referencia a 'sospecha simple' o equivalente",
-                    "parrafos": [ps["n"]],
-                    "detalle": (
-                        "Se menciona 'sospecha simple' o equivalente; debe verificarse su compatibilidad "
-                        "con el estándar exigido en la resolución (p. ej., prisión preventiva)."
-                    ),
-                    "extractos": [recortar_texto(ps["texto"])],
-                }
+    def en_texto_global(self, patron: "re.Pattern") -> bool:
+        if self._texto_global is None:
+            self._texto_global = canonizar(
+                " ".join(self.almacen.texto(i) for i in range(len(self.almacen)))
             )
+        return bool(patron_canonico(patron).search(self._texto_global))
 
-    # 4.0.4 Tensión entre sospecha simple y grave
-    if con_sospecha_simple and con_sospecha_grave:
-        resultados.append(
-            {
-                "tipo": "Tensión entre 'sospecha simple' y 'sospecha grave'",
-                "parrafos": [p["n"] for p in con_sospecha_simple + con_sospecha_grave],
-                "detalle": (
-                    "En distintos párrafos se menciona tanto 'sospecha simple' "
-                    "como 'sospecha grave', lo que exige clarificación del estándar aplicado."
-                ),
-                "extractos": [
-                    recortar_texto(p["texto"]) for p in con_sospecha_simple + con_sospecha_grave
-                ],
-            }
-        )
 
-    # ============================================================
-    #  REGLA 1 – Pluralidad y convergencia de indicios
-    # ============================================================
+def _cumple(p: Mapping, condicion: Condicion, busqueda: Optional[_BusquedaParrafo] = None) -> bool:
+    if isinstance(condicion, tuple):
+        return any(_cumple(p, c, busqueda) for c in condicion)
+    if condicion in p:
+        return bool(p[condicion])
+    if busqueda is None:
+        busqueda = _BusquedaParrafo(p["texto"])
+    return busqueda.cumple(condicion, PREDICADOS[condicion])
 
-    parrafos_con_indicio = con_indicio
-
-    # 1.1 Ausencia total de referencia a indicios
-    if len(parrafos_con_indicio) == 0 and parrafos:
-        resultados.append({
-            "tipo": "Ausencia de referencia explícita a indicios o hechos indiciarios",
-            "parrafos": [p["n"] for p in parrafos[:3]],
-            "detalle": (
-                "No se identifican menciones a indicios o hechos indiciarios, pese a tratarse "
-                "de una resolución que pretende utilizar razonamiento indiciario."
-            ),
-            "extractos": [recortar_texto(p["texto"]) for p in parrafos[:3]],
-        })
-
-    # 1.2 Indicio único débil
-    if len(parrafos_con_indicio) == 1:
-        unico = parrafos_con_indicio[0]
-        if unico["fuente_debil"] and not unico["fuente_fuerte"]:
-            resultados.append({
-                "tipo": "Indicio único sin singular fuerza acreditativa",
-                "parrafos": [unico["n"]],
-                "detalle": (
-                    "El único indicio identificado proviene de fuente testimonial débil y "
-                    "se presenta como suficiente, vulnerando el método indiciario."
-                ),
-                "extractos": [recortar_texto(unico["texto"])],
-            })
-
-    # 1.3 Pluralidad sin convergencia
-    if len(parrafos_con_indicio) >= 2:
-        hay_convergencia = bool(PATRON_CONJUNTO.search(texto_global))
-        if not hay_convergencia:
-            resultados.append({
-                "tipo": "Pluralidad de indicios sin explicación de convergencia/interrelación",
-                "parrafos": [p["n"] for p in parrafos_con_indicio],
-                "detalle": (
-                    "Existen varios indicios pero sin valoración conjunta o convergente."
-                ),
-                "extractos": [recortar_texto(p["texto"]) for p in parrafos_con_indicio[:4]],
-            })
 
-    # ============================================================
-    #  REGLA 2 – Consistencia interna del indicio
-    # ============================================================
+def _cumple_regla(
+    p: Mapping,
+    requiere: Tuple[Condicion, ...],
+    excluye: Tuple[Condicion, ...],
+    busqueda: _BusquedaParrafo,
+) -> bool:
+    """
+    all(requiere) y ninguna de excluye, mirando primero las condiciones ya
+    resueltas en el párrafo (por otra regla o paso): si alguna descarta la
+    regla, no se busca ningún patrón nuevo.
+    """
+    resueltos = busqueda.resueltos
+    for c in requiere:
+        if isinstance(c, str) and c in resueltos and not resueltos[c]:
+            return False
+    for c in excluye:
+        if isinstance(c, str) and resueltos.get(c):
+            return False
+    return all(_cumple(p, c, busqueda) for c in requiere) and not any(
+        _cumple(p, c, busqueda) for c in excluye
+    )
 
-    # 2.1 mismo párrafo: fuerte + débil
-    for p in parrafos:
-        if p["eval_ind_debil"] and p["eval_ind_fuerte"]:
-            resultados.append({
-                "tipo": "Valoración interna contradictoria del indicio (mismo párrafo)",
-                "parrafos": [p["n"]],
-                "detalle": (
-                    "En un mismo párrafo se califica un indicio como débil y fuerte a la vez."
-                ),
-                "extractos": [recortar_texto(p["texto"])],
-            })
-
-    # 2.2 entre párrafos distintos
-    if con_eval_debil and con_eval_fuerte:
-        max_pares = 3
-        count = 0
-        for pd in con_eval_debil:
-            for pf in con_eval_fuerte:
-                if pd["n"] == pf["n"]:
-                    continue
-                if count >= max_pares:
-                    break
-                resultados.append({
-                    "tipo": "Evaluación contradictoria del indicio (párrafos distintos)",
-                    "parrafos": [pd["n"], pf["n"]],
-                    "detalle": (
-                        "En un párrafo se describe un indicio como débil y en otro como fuerte o concluyente."
-                    ),
-                    "extractos": [recortar_texto(pd["texto"]), recortar_texto(pf["texto"])],
-                })
-                count += 1
-            if count >= max_pares:
-                break
 
-    # ============================================================
-    #  REGLA 3 – Consistencia externa entre indicios
-    # ============================================================
+# --- Selectores de las reglas globales ---
 
-    PATRON_CONTRADICCION_INDICIOS = re.compile(
-        r"(no coincide con|contradice|incompatible con|no guarda relaci[oó]n|"
-        r"no se relaciona|resulta incompatible|es inconsistente con|se opone a|discrepa)",
-        flags=re.IGNORECASE,
-    )
+def _sel_tension_sospechas(ctx):
+    simples, graves = ctx.con("sospecha_simple"), ctx.con("sospecha_grave")
+    if simples and graves:
+        return simples + graves
+    return None
 
-    for p in parrafos_con_indicio:
-        if PATRON_CONTRADICCION_INDICIOS.search(p["texto"]):
-            resultados.append({
-                "tipo": "Contradicción explícita entre indicios",
-                "parrafos": [p["n"]],
-                "detalle": "Se explicita incompatibilidad entre indicios o hechos indiciarios.",
-                "extractos": [recortar_texto(p["texto"])],
-            })
-
-    patron_conexion = re.compile(
-        r"(relaci[oó]n l[oó]gica|conexi[oó]n|v[ií]nculo|enlace|coherencia externa|armoniza)",
-        flags=re.IGNORECASE,
-    )
 
-    if len(parrafos_con_indicio) >= 2 and not patron_conexion.search(texto_global):
-        resultados.append({
-            "tipo": "Falta de conexión entre indicios (consistencia externa)",
-            "parrafos": [p["n"] for p in parrafos_con_indicio],
-            "detalle": "Los indicios no aparecen conectados ni articulados entre sí.",
-            "extractos": [recortar_texto(p["texto"]) for p in parrafos_con_indicio[:4]],
-        })
+def _sel_ausencia_indicios(ctx):
+    if len(ctx.con("tiene_indicio")) == 0 and ctx.total:
+        return ctx.primeros(PARRAFOS_MUESTRA)
+    return None
 
-    # ============================================================
-    #  REGLA 4 – Saltos lógicos típicos
-    # ============================================================
 
-    patron_presencia = re.compile(
-        r"(por el solo hecho de encontrarse|por el solo hecho de estar|basta la presencia|por estar en el lugar)",
-        flags=re.IGNORECASE,
-    )
-    patron_conocimiento_r4 = re.compile(
-        r"(deb[ií]a conocer|sab[ií]a|no pod[ií]a ignorar|ten[ií]a conocimiento)",
-        flags=re.IGNORECASE,
-    )
+def _sel_indicio_unico_debil(ctx):
+    con_indicio = ctx.con("tiene_indicio")
+    if len(con_indicio) == 1:
+        unico = con_indicio[0]
+        if unico["fuente_debil"] and not unico["fuente_fuerte"]:
+            return [unico]
+    return None
 
-    for p in parrafos:
-        texto_p = p["texto"]
-        if patron_presencia.search(texto_p) and patron_conocimiento_r4.search(texto_p):
-            resultados.append({
-                "tipo": "Salto presencia física → conocimiento/participación",
-                "parrafos": [p["n"]],
-                "detalle": "Se infiere conocimiento o participación solo desde la presencia física.",
-                "extractos": [recortar_texto(texto_p)],
-            })
-
-    patron_cargo = re.compile(
-        r"(por su calidad de|en su condici[oó]n de|en su calidad de|por su cargo de)",
-        flags=re.IGNORECASE,
-    )
-    patron_responsab = re.compile(
-        r"(es responsable|dirig[ií]a|orden[oó]|autoriz[oó]|dispuso|ten[ií]a dominio del hecho)",
-        flags=re.IGNORECASE,
-    )
 
-    for p in parrafos:
-        texto_p = p["texto"]
-        if patron_cargo.search(texto_p) and patron_responsab.search(texto_p):
-            resultados.append({
-                "tipo": "Salto de cargo/jerarquía → autoría/responsabilidad penal",
-                "parrafos": [p["n"]],
-                "detalle": "Se deduce autoría o responsabilidad penal solo por el cargo.",
-                "extractos": [recortar_texto(texto_p)],
-            })
-
-    patron_conclusion_fuerte = re.compile(
-        r"(es evidente que|resulta evidente que|no cabe duda de que|"
-        r"resulta incuestionable que|es indudable que)",
-        flags=re.IGNORECASE,
-    )
-    patron_referencia_prueba = re.compile(
-        r"(prueba|pruebas|indicio|indicios|hecho indiciario|hechos indiciarios|"
-        r"pericia|perito|informe pericial|informe t[eé]cnico|"
-        r"testigo|testigos|declaraci[oó]n|declaraciones|acta|actas|informe)",
-        flags=re.IGNORECASE,
-    )
+def _sel_pluralidad_sin_convergencia(ctx):
+    con_indicio = ctx.con("tiene_indicio")
+    if len(con_indicio) >= 2 and not ctx.en_texto_global(PATRON_CONJUNTO):
+        return con_indicio
+    return None
 
-    for p in parrafos:
-        texto_p = p["texto"]
-        if patron_conclusion_fuerte.search(texto_p) and not patron_referencia_prueba.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "Conclusión categórica sin referencia explícita a prueba/indicios",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se formulan conclusiones categóricas sin mencionar pruebas o indicios de soporte."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
 
-    # ============================================================
-    #  REGLA 5 – Uso indebido de testimoniales
-    # ============================================================
+def _sel_falta_conexion(ctx):
+    con_indicio = ctx.con("tiene_indicio")
+    if len(con_indicio) >= 2 and not ctx.en_texto_global(PATRON_CONEXION):
+        return con_indicio
+    return None
 
-    patron_testimonio = re.compile(
-        r"(testigo|declaraci[oó]n|manifestaci[oó]n|versi[oó]n del imputado)",
-        flags=re.IGNORECASE,
-    )
-    patron_fuerza_indebida = re.compile(
-        r"(indicio contundente|prueba concluyente|prueba determinante|"
-        r"prueba inequ[ií]voca|permite tener por acreditado|"
-        r"demuestra claramente|acredita fehacientemente)",
-        flags=re.IGNORECASE,
-    )
 
-    for p in parrafos:
-        texto_p = p["texto"]
-        if patron_testimonio.search(texto_p) and patron_fuerza_indebida.search(texto_p):
-            resultados.append({
-                "tipo": "Uso indebido de testimonial como indicio fuerte",
-                "parrafos": [p["n"]],
-                "detalle": (
-                    "Una fuente testimonial es presentada como prueba concluyente o contundente."
-                ),
-                "extractos": [recortar_texto(texto_p)],
-            })
-
-    patron_autoria = re.compile(
-        r"(particip[oó]|coordin[oó]|dirigi[oó]|orden[oó]|autoriz[oó]|"
-        r"ten[ií]a dominio del hecho|responsable del hecho)",
-        flags=re.IGNORECASE,
-    )
+def _sel_unico_testimonial_fuerte(ctx):
+    con_indicio = ctx.con("tiene_indicio")
+    if len(con_indicio) == 1:
+        unico = con_indicio[0]
+        if unico["fuente_debil"] and _cumple(unico, "fuerza_indebida"):
+            return [unico]
+    return None
 
-    for p in parrafos:
-        texto_p = p["texto"]
-        if patron_testimonio.search(texto_p) and patron_autoria.search(texto_p):
-            resultados.append({
-                "tipo": "Salto testimonial → autoría/responsabilidad",
-                "parrafos": [p["n"]],
-                "detalle": (
-                    "Una declaración testimonial se utiliza para afirmar participación o autoría "
-                    "sin puente indiciario objetivo."
-                ),
-                "extractos": [recortar_texto(texto_p)],
-            })
-
-    if len(parrafos_con_indicio) == 1:
-        unico = parrafos_con_indicio[0]
-        if unico["fuente_debil"] and patron_fuerza_indebida.search(unico["texto"]):
-            resultados.append(
-                {
-                    "tipo": "Indicio único testimonial tratado como prueba fuerte",
-                    "parrafos": [unico["n"]],
-                    "detalle": (
-                        "El único indicio, de fuente testimonial, es tratado como prueba contundente."
-                    ),
-                    "extractos": [recortar_texto(unico["texto"])],
-                }
-            )
 
+REGISTRO_REGLAS: List[Regla] = [
+    # --------------------------------------------------
+    # 4.0 Reglas generales (duda vs certeza, sospecha)
+    # --------------------------------------------------
+    Regla(
+        id="4.0.1", familia="general", alcance="pares",
+        tipo="Contradicción duda vs certeza",
+        detalle=(
+            "En un párrafo se afirma insuficiencia probatoria y en otro certeza plena, "
+            "sin justificar la transición."
+        ),
+        pares=("duda", "certeza"),
+        distintos=True,
+    ),
+    Regla(
+        id="4.0.2", familia="general", alcance="pares",
+        tipo="Incongruencia en hipótesis alternativas",
+        detalle=(
+            "Se afirma que no se descartan hipótesis alternativas, "
+            "pero a la vez se sostiene que existe una única explicación."
+        ),
+        pares=("no_descarta_alt", "unica_explicacion"),
+        distintos=True,
+    ),
+    Regla(
+        id="4.0.3", familia="general", alcance="parrafo",
+        tipo="Referencia a 'sospecha simple' o equivalente",
+        detalle=(
+            "Se menciona 'sospecha simple' o equivalente; debe verificarse su compatibilidad "
+            "con el estándar exigido en la resolución (p. ej., prisión preventiva)."
+        ),
+        requiere=("sospecha_simple",),
+    ),
+    Regla(
+        id="4.0.4", familia="general", alcance="global",
+        tipo="Tensión entre 'sospecha simple' y 'sospecha grave'",
+        detalle=(
+            "En distintos párrafos se menciona tanto 'sospecha simple' "
+            "como 'sospecha grave', lo que exige clarificación del estándar aplicado."
+        ),
+        seleccionar=_sel_tension_sospechas,
+    ),
+    Regla(
+        id="4.0.5", familia="general", alcance="parrafo",
+        tipo="Contradicción duda vs certeza (mismo párrafo)",
+        detalle=(
+            "En un mismo párrafo se afirma insuficiencia probatoria y certeza plena, "
+            "sin justificar la transición."
+        ),
+        requiere=("duda", "certeza"),
+    ),
+    Regla(
+        id="4.0.6", familia="general", alcance="parrafo",
+        tipo="Incongruencia en hipótesis alternativas (mismo párrafo)",
+        detalle=(
+            "En un mismo párrafo se afirma que no se descartan hipótesis alternativas "
+            "y que existe una única explicación."
+        ),
+        requiere=("no_descarta_alt", "unica_explicacion"),
+    ),
+    # ============================================================
+    #  REGLA 1 – Pluralidad y convergencia de indicios
+    # ============================================================
+    Regla(
+        id="1.1", familia="R1", alcance="global",
+        tipo="Ausencia de referencia explícita a indicios o hechos indiciarios",
+        detalle=(
+            "No se identifican menciones a indicios o hechos indiciarios, pese a tratarse "
+            "de una resolución que pretende utilizar razonamiento indiciario."
+        ),
+        seleccionar=_sel_ausencia_indicios,
+    ),
+    Regla(
+        id="1.2", familia="R1", alcance="global",
+        tipo="Indicio único sin singular fuerza acreditativa",
+        detalle=(
+            "El único indicio identificado proviene de fuente testimonial débil y "
+            "se presenta como suficiente, vulnerando el método indiciario."
+        ),
+        seleccionar=_sel_indicio_unico_debil,
+    ),
+    Regla(
+        id="1.3", familia="R1", alcance="global",
+        tipo="Pluralidad de indicios sin explicación de convergencia/interrelación",
+        detalle="Existen varios indicios pero sin valoración conjunta o convergente.",
+        seleccionar=_sel_pluralidad_sin_convergencia,
+        max_extractos=4,
+    ),
+    # ============================================================
+    #  REGLA 2 – Consistencia interna del indicio
+    # ============================================================
+    Regla(
+        id="2.1", familia="R2", alcance="parrafo",
+        tipo="Valoración interna contradictoria del indicio (mismo párrafo)",
+        detalle="En un mismo párrafo se califica un indicio como débil y fuerte a la vez.",
+        requiere=("eval_ind_debil", "eval_ind_fuerte"),
+    ),
+    Regla(
+        id="2.2", familia="R2", alcance="pares",
+        tipo="Evaluación contradictoria del indicio (párrafos distintos)",
+        detalle=(
+            "En un párrafo se describe un indicio como débil y en otro como fuerte o concluyente."
+        ),
+        pares=("eval_ind_debil", "eval_ind_fuerte"),
+        distintos=True,
+    ),
+    # ============================================================
+    #  REGLA 3 – Consistencia externa entre indicios
+    # ============================================================
+    Regla(
+        id="3.1", familia="R3", alcance="parrafo",
+        tipo="Contradicción explícita entre indicios",
+        detalle="Se explicita incompatibilidad entre indicios o hechos indiciarios.",
+        requiere=("tiene_indicio", "contradiccion_indicios"),
+    ),
+    Regla(
+        id="3.2", familia="R3", alcance="global",
+        tipo="Falta de conexión entre indicios (consistencia externa)",
+        detalle="Los indicios no aparecen conectados ni articulados entre sí.",
+        seleccionar=_sel_falta_conexion,
+        max_extractos=4,
+    ),
+    # ============================================================
+    #  REGLA 4 – Saltos lógicos típicos
+    # ============================================================
+    Regla(
+        id="4.1", familia="R4", alcance="parrafo",
+        tipo="Salto presencia física → conocimiento/participación",
+        detalle="Se infiere conocimiento o participación solo desde la presencia física.",
+        requiere=("presencia", "conocimiento_r4"),
+    ),
+    Regla(
+        id="4.2", familia="R4", alcance="parrafo",
+        tipo="Salto de cargo/jerarquía → autoría/responsabilidad penal",
+        detalle="Se deduce autoría o responsabilidad penal solo por el cargo.",
+        requiere=("cargo", "responsab"),
+    ),
+    Regla(
+        id="4.3", familia="R4", alcance="parrafo",
+        tipo="Conclusión categórica sin referencia explícita a prueba/indicios",
+        detalle=(
+            "Se formulan conclusiones categóricas sin mencionar pruebas o indicios de soporte."
+        ),
+        requiere=("conclusion_fuerte",),
+        excluye=("referencia_prueba",),
+    ),
+    # ============================================================
+    #  REGLA 5 – Uso indebido de testimoniales
+    # ============================================================
+    Regla(
+        id="5.1", familia="R5", alcance="parrafo",
+        tipo="Uso indebido de testimonial como indicio fuerte",
+        detalle=(
+            "Una fuente testimonial es presentada como prueba concluyente o contundente."
+        ),
+        requiere=("testimonio", "fuerza_indebida"),
+    ),
+    Regla(
+        id="5.2", familia="R5", alcance="parrafo",
+        tipo="Salto testimonial → autoría/responsabilidad",
+        detalle=(
+            "Una declaración testimonial se utiliza para afirmar participación o autoría "
+            "sin puente indiciario objetivo."
+        ),
+        requiere=("testimonio", "autoria"),
+    ),
+    Regla(
+        id="5.3", familia="R5", alcance="global",
+        tipo="Indicio único testimonial tratado como prueba fuerte",
+        detalle=(
+            "El único indicio, de fuente testimonial, es tratado como prueba contundente."
+        ),
+        seleccionar=_sel_unico_testimonial_fuerte,
+    ),
     # ============================================================
     #  REGLA 6 – Cadena inferencial incompleta
     # ============================================================
+    Regla(
+        id="6.1", familia="R6", alcance="parrafo", bloque="R6a",
+        tipo="Conclusión sin sustento indiciario previo",
+        detalle=(
+            "Se formula una conclusión fuerte sin integrar pruebas o indicios en el propio razonamiento."
+        ),
+        requiere=("conclusion",),
+        excluye=("sustento",),
+    ),
+    Regla(
+        id="6.2", familia="R6", alcance="parrafo", bloque="R6a",
+        tipo="Afirmación causal sin explicación del vínculo (salto lógico)",
+        detalle=(
+            "Se afirma que algo 'demuestra' o 'evidencia' un hecho sin explicitar "
+            "el vínculo entre los hechos y la conclusión."
+        ),
+        requiere=("causalidad",),
+        excluye=("sustento",),
+    ),
+    Regla(
+        id="6.3", familia="R6", alcance="parrafo", bloque="R6b",
+        tipo="Afirmación de coordinación/autoría sin sustento indiciario",
+        detalle=(
+            "Se afirma coordinación, dirección u organización sin integrar indicios concretos."
+        ),
+        requiere=("autoria_coord",),
+        excluye=("sustento",),
+    ),
+    Regla(
+        id="6.4", familia="R6", alcance="parrafo", bloque="R6b",
+        tipo="Afirmación de conocimiento sin sustento probatorio",
+        detalle=(
+            "Se afirma que el imputado 'sabía' o 'debía conocer' sin identificar el indicio que lo acredita."
+        ),
+        requiere=("conocimiento",),
+        excluye=("sustento",),
+    ),
+    # ============================================================
+    #  REGLA 7 – Valoración contraria al contenido expreso de la prueba
+    # ============================================================
+    Regla(
+        id="7.1", familia="R7", alcance="parrafo",
+        tipo="Valoración contraria al contenido expreso del medio probatorio (mismo párrafo)",
+        detalle=(
+            "Se presenta un medio probatorio como demostrativo cuando el propio texto "
+            "reconoce que su contenido es negativo o dubitativo."
+        ),
+        requiere=("medio_probatorio", "contenido_negativo", "conclusion_fuerte_prueba"),
+    ),
+    # ============================================================
+    #  REGLA 8 – Hipótesis alternativas mal tratadas
+    # ============================================================
+    Regla(
+        id="8.1", familia="R8", alcance="parrafo", bloque="R8",
+        tipo="Incongruencia: reconoce alternativas pero afirma única explicación",
+        detalle=(
+            "Se reconocen hipótesis alternativas pero se mantiene una 'única explicación' como definitiva."
+        ),
+        requiere=("alt_existencia", "unica_conclusion"),
+    ),
+    Regla(
+        id="8.2", familia="R8", alcance="parrafo", bloque="R8",
+        tipo="No se descartan alternativas pero se afirma conclusión única",
+        detalle=(
+            "Se admite que no se descartan otras hipótesis y aun así se afirma una única conclusión."
+        ),
+        requiere=("no_descarta_alt2", "unica_conclusion"),
+    ),
+    Regla(
+        id="8.3", familia="R8", alcance="parrafo", bloque="R8",
+        tipo="Mención de hipótesis alternativas sin análisis",
+        detalle=(
+            "Se mencionan explicaciones alternativas sin analizarlas ni contrastarlas."
+        ),
+        requiere=("alt_existencia",),
+        excluye=("analisis_alt",),
+    ),
+    Regla(
+        id="8.4", familia="R8", alcance="parrafo", bloque="R8",
+        tipo="Descarte injustificado de hipótesis alternativa",
+        detalle=(
+            "Se descarta una versión alternativa con fórmulas vacías ('no es creíble', etc.) "
+            "sin justificación probatoria."
+        ),
+        requiere=("alt_existencia", "descartar_sin_exp"),
+    ),
+    Regla(
+        id="8.5", familia="R8", alcance="parrafo", bloque="R8",
+        tipo="Conclusión única sin contrastar hipótesis alternativas",
+        detalle=(
+            "Se sostiene una 'única explicación' sin referencia a posibles hipótesis alternativas."
+        ),
+        requiere=("unica_conclusion",),
+        excluye=("alt_existencia",),
+    ),
+    # ============================================================
+    #  REGLA 9 – Máximas de experiencia y sana crítica mal aplicadas
+    # ============================================================
+    Regla(
+        id="9.1", familia="R9", alcance="parrafo", bloque="R9",
+        tipo="Invocación abstracta de máximas de experiencia/sana crítica sin explicación",
+        detalle=(
+            "Se invocan genéricamente máximas de experiencia o sana crítica sin explicarlas "
+            "ni vincularlas con datos empíricos ni pruebas."
+        ),
+        requiere=(("max_exp", "sana_critica"),),
+        excluye=("sustento_exp",),
+    ),
+    Regla(
+        id="9.2", familia="R9", alcance="parrafo", bloque="R9",
+        tipo="Generalización empírica sin sustento probatorio",
+        detalle=(
+            "Se usan fórmulas como 'lo normal es que', 'es de experiencia común que', "
+            "sin apoyo en datos empíricos o pruebas específicas."
+        ),
+        requiere=("generalizacion",),
+        excluye=("sustento_exp",),
+    ),
+    Regla(
+        id="9.3", familia="R9", alcance="parrafo", bloque="R9",
+        tipo="Uso de máximas de experiencia estereotipadas/prejuiciosas",
+        detalle=(
+            "Se utilizan estereotipos ('quien nada debe nada teme', etc.) como si fueran "
+            "verdaderas máximas de experiencia."
+        ),
+        requiere=("estereotipo",),
+    ),
+]
+
+FAMILIAS_REGLAS = tuple(dict.fromkeys(r.familia for r in REGISTRO_REGLAS))
+
+
+def seleccionar_reglas(
+    reglas: Optional[Iterable[str]] = None,
+    excluir: Optional[Iterable[str]] = None,
+) -> List[Regla]:
+    """
+    Devuelve las reglas del registro a aplicar, en su orden.
 
-    patron_conclusion = re.compile(
-        r"(por tanto|por ende|en consecuencia|por consiguiente|"
-        r"se concluye que|queda acreditado que|resulta acreditado que|"
-        r"resulta probado que|se tiene por probado que)",
-        flags=re.IGNORECASE,
-    )
+    - reglas: ids ("4.0.1", "8.3", …) o familias ("general", "R1" … "R9") a
+      incluir; None = todas.
+    - excluir: ids o familias a omitir.
+    """
+    incluir = set(reglas) if reglas is not None else None
+    omitir = set(excluir or ())
+    conocidos = {r.id for r in REGISTRO_REGLAS} | set(FAMILIAS_REGLAS)
+    desconocidos = ((incluir or set()) | omitir) - conocidos
+    if desconocidos:
+        raise ValueError(f"Reglas o familias desconocidas: {sorted(desconocidos)}")
+
+    seleccion = []
+    for r in REGISTRO_REGLAS:
+        if incluir is not None and r.id not in incluir and r.familia not in incluir:
+            continue
+        if r.id in omitir or r.familia in omitir:
+            continue
+        seleccion.append(r)
+    return seleccion
 
-    patron_sustento = re.compile(
-        r"(prueba|pruebas|indicio|indicios|hecho indiciario|hechos indiciarios|"
-        r"pericia|perito|acta|informe|testigo|declaraci[oó]n|documento)",
-        flags=re.IGNORECASE,
-    )
 
-    patron_causalidad = re.compile(
-        r"(lo cual demuestra que|esto demuestra que|ello demuestra que|"
-        r"lo que prueba que|esto evidencia que|ello evidencia que|"
-        r"lo que acredita que)",
-        flags=re.IGNORECASE,
-    )
+# -------------------
+# 5. Motor de reglas
+# -------------------
 
-    for p in parrafos:
-        texto_p = p["texto"]
-        if patron_conclusion.search(texto_p) and not patron_sustento.search(texto_p):
-            resultados.append({
-                "tipo": "Conclusión sin sustento indiciario previo",
-                "parrafos": [p["n"]],
-                "detalle": (
-                    "Se formula una conclusión fuerte sin integrar pruebas o indicios en el propio razonamiento."
-                ),
-                "extractos": [recortar_texto(texto_p)],
-            })
-
-        if patron_causalidad.search(texto_p) and not patron_sustento.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "Afirmación causal sin explicación del vínculo (salto lógico)",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se afirma que algo 'demuestra' o 'evidencia' un hecho sin explicitar "
-                        "el vínculo entre los hechos y la conclusión."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
+def _hallazgo(regla: Regla, parrafos: List[Dict[str, Any]], max_extractos: Optional[int] = None) -> Dict[str, Any]:
+    con_extracto = parrafos if max_extractos is None else parrafos[:max_extractos]
+    return {
+        "tipo": regla.tipo,
+        "parrafos": [p["n"] for p in parrafos],
+        "detalle": regla.detalle,
+        "extractos": [recortar_texto(p["texto"]) for p in con_extracto],
+    }
 
-    patron_autoria_coord = re.compile(
-        r"(coordin[oó]|dirigi[oó]|organiz[oó]|autoriz[oó]|"
-        r"dispuso|control[oó]|ten[ií]a dominio del hecho)",
-        flags=re.IGNORECASE,
-    )
 
-    patron_conocimiento = re.compile(
-        r"(sab[ií]a que|ten[ií]a conocimiento de|no pod[ií]a ignorar|"
-        r"deb[ií]a conocer|pleno conocimiento de)",
-        flags=re.IGNORECASE,
+def _aplicar_pares(regla: Regla, ctx) -> List[Dict[str, Any]]:
+    """
+    Hasta MAX_PARES hallazgos con los pares de párrafos opuestos más cercanos
+    entre sí (ver proximidad.pares_cercanos), del más cercano al más lejano.
+    """
+    izquierda, derecha = (ctx.con(e) for e in regla.pares)
+    if not (izquierda and derecha):
+        return []
+    pares = ctx.indice.pares_cercanos(*regla.pares, MAX_PARES, regla.distintos)
+    return [_hallazgo(regla, [izquierda[i], derecha[j]]) for i, j in pares]
+
+
+def _aplicar_reglas_parrafo(
+    reglas: List[Regla], p: Mapping, busqueda: Optional[_BusquedaParrafo] = None
+) -> List[Dict[str, Any]]:
+    if busqueda is None:
+        busqueda = _BusquedaParrafo(p["texto"])
+    hallazgos: List[Dict[str, Any]] = []
+    for regla in reglas:
+        if _cumple_regla(p, regla.requiere, regla.excluye, busqueda):
+            hallazgos.append(_hallazgo(regla, [p]))
+    return hallazgos
+
+
+@lru_cache(maxsize=None)
+def _filtro_regla(
+    regla: Regla,
+) -> Tuple[int, int, Tuple[int, ...], Tuple[Condicion, ...], Tuple[Condicion, ...]]:
+    """
+    Separa las condiciones de una regla por párrafo en las que dependen solo
+    de ETIQUETAS (bits a exigir, bits a excluir y grupos "alguno de") y el
+    resto, que requiere buscar un predicado en el texto.
+    """
+    requiere = excluye = 0
+    alguno: List[int] = []
+    resto_requiere: List[Condicion] = []
+    resto_excluye: List[Condicion] = []
+    for c in regla.requiere:
+        nombres = c if isinstance(c, tuple) else (c,)
+        if not all(n in BITS_ETIQUETAS for n in nombres):
+            resto_requiere.append(c)
+        elif isinstance(c, tuple):
+            alguno.append(sum(BITS_ETIQUETAS[n] for n in nombres))
+        else:
+            requiere |= BITS_ETIQUETAS[c]
+    for c in regla.excluye:
+        nombres = c if isinstance(c, tuple) else (c,)
+        if all(n in BITS_ETIQUETAS for n in nombres):
+            excluye |= sum(BITS_ETIQUETAS[n] for n in nombres)
+        else:
+            resto_excluye.append(c)
+    return requiere, excluye, tuple(alguno), tuple(resto_requiere), tuple(resto_excluye)
+
+
+def _aplicar_paso_almacen(
+    almacen: AlmacenParrafos,
+    reglas: List[Regla],
+    indices: Optional[np.ndarray] = None,
+    revisados: Optional[Dict[int, Tuple[Mapping, _BusquedaParrafo]]] = None,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Aplica un paso de reglas por párrafo a todo el almacén (o a `indices`) y
+    devuelve {índice de párrafo: hallazgos en el orden de las reglas}. Las
+    condiciones de etiquetas se resuelven a la vez para todos los párrafos con
+    las máscaras; solo los candidatos que quedan se revisan con predicados.
+
+    `revisados` ({índice: (vista, búsquedas)}) permite compartir entre pasos
+    los predicados ya buscados en cada párrafo.
+    """
+    if revisados is None:
+        revisados = {}
+    por_parrafo: Dict[int, List[Dict[str, Any]]] = {}
+    for regla in reglas:
+        requiere, excluye, alguno, resto_requiere, resto_excluye = _filtro_regla(regla)
+        candidatos = almacen.seleccionar(requiere, excluye, alguno)
+        if indices is not None:
+            candidatos = np.intersect1d(candidatos, indices, assume_unique=True)
+        for i in candidatos.tolist():
+            revisado = revisados.get(i)
+            if revisado is None:
+                p = almacen.parrafo(i)
+                revisado = revisados[i] = (p, _BusquedaParrafo(p["texto"]))
+            p, busqueda = revisado
+            if _cumple_regla(p, resto_requiere, resto_excluye, busqueda):
+                por_parrafo.setdefault(i, []).append(_hallazgo(regla, [p]))
+    return por_parrafo
+
+
+# Hallazgos de las reglas por párrafo, por (hash del párrafo, huella de los
+# pasos): una entrada por párrafo con (paso, tipo, detalle, extractos) de cada
+# hallazgo, sin el número de párrafo, que puede cambiar al editar el texto.
+MEMO_HALLAZGOS_PARRAFO = CacheLRU(MEMO_PARRAFOS_MAX_ENTRADAS)
+
+
+def _huella_pasos(pasos: List[List[Regla]]) -> str:
+    partes = [
+        huella_funcion(f)
+        for f in (
+            _cumple, _cumple_regla, _BusquedaParrafo.cumple, _BusquedaParrafo._anclado,
+            _hallazgo, recortar_texto,
+            _aplicar_reglas_parrafo, _filtro_regla.__wrapped__, _aplicar_paso_almacen,
+        )
+    ]
+    partes.append(repr(sorted(ANCLAS.items())))
+    partes.append(huella_canonico())
+    for reglas_paso in pasos:
+        partes.append(",".join(huella_regla(r) for r in reglas_paso))
+    return huella("\n".join(partes))
+
+
+def _plantillas(hallazgos_por_paso: Iterable[Tuple[int, Iterable[Dict[str, Any]]]]) -> tuple:
+    return tuple(
+        (k, h["tipo"], h["detalle"], tuple(h["extractos"]))
+        for k, hallazgos in hallazgos_por_paso
+        for h in hallazgos
     )
 
-    for p in parrafos:
-        texto_p = p["texto"]
-        if patron_autoria_coord.search(texto_p) and not patron_sustento.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "Afirmación de coordinación/autoría sin sustento indiciario",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se afirma coordinación, dirección u organización sin integrar indicios concretos."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
 
-        if patron_conocimiento.search(texto_p) and not patron_sustento.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "Afirmación de conocimiento sin sustento probatorio",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se afirma que el imputado 'sabía' o 'debía conocer' sin identificar el indicio que lo acredita."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
+def _desde_plantilla(n: int, tipo: str, detalle: str, extractos: tuple) -> Dict[str, Any]:
+    return {"tipo": tipo, "parrafos": [n], "detalle": detalle, "extractos": list(extractos)}
 
-    # ============================================================
-    #  REGLA 7 – Valoración contraria al contenido expreso de la prueba
-    # ============================================================
 
-    patron_medio_probatorio = re.compile(
-        r"(declaraci[oó]n de|declar[oó] que|manifiest[oó] que|seg[uú]n el acta|"
-        r"seg[uú]n consta en el acta|acta policial|acta fiscal|informe pericial|"
-        r"informe t[eé]cnico|pericia oficial|pericia practicada|seg[uú]n el informe)",
-        flags=re.IGNORECASE,
-    )
+def _hallazgos_parrafo(
+    pasos: List[List[Regla]],
+    p: Dict[str, Any],
+    version: Optional[str] = None,
+    huella_texto: Optional[str] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Hallazgos de cada paso por párrafo sobre un solo párrafo `p` (análisis
+    incremental). Si se indican `version` (huella de los pasos) y
+    `huella_texto`, se consulta y alimenta el memo.
+    """
+    if version is None:
+        busqueda = _BusquedaParrafo(p["texto"])
+        return [_aplicar_reglas_parrafo(reglas_paso, p, busqueda) for reglas_paso in pasos]
+    clave = (huella_texto, version)
+    plantillas = MEMO_HALLAZGOS_PARRAFO.obtener(clave)
+    if plantillas is None:
+        busqueda = _BusquedaParrafo(p["texto"])
+        hallazgos = [_aplicar_reglas_parrafo(reglas_paso, p, busqueda) for reglas_paso in pasos]
+        MEMO_HALLAZGOS_PARRAFO.guardar(clave, _plantillas(enumerate(hallazgos)))
+        return hallazgos
+    hallazgos = [[] for _ in pasos]
+    for k, tipo, detalle, extractos in plantillas:
+        hallazgos[k].append(_desde_plantilla(p["n"], tipo, detalle, extractos))
+    return hallazgos
+
+
+def _hallazgos_almacen(
+    almacen: AlmacenParrafos, pasos: List[List[Regla]], usar_memo: bool
+) -> List[Dict[int, List[Dict[str, Any]]]]:
+    """
+    Hallazgos de cada paso por párrafo sobre el almacén: {índice: hallazgos}
+    por paso. Con usar_memo solo se evalúan los párrafos que no están en
+    MEMO_HALLAZGOS_PARRAFO (nuevos o modificados).
+    """
+    revisados: Dict[int, Tuple[Mapping, _BusquedaParrafo]] = {}
+    if not usar_memo:
+        return [_aplicar_paso_almacen(almacen, reglas_paso, None, revisados) for reglas_paso in pasos]
+
+    version = _huella_pasos(pasos)
+    por_paso: List[Dict[int, List[Dict[str, Any]]]] = [{} for _ in pasos]
+    claves: Dict[int, Tuple[str, str]] = {}
+    for i in range(len(almacen)):
+        clave = (huella(almacen.texto(i)), version)
+        plantillas = MEMO_HALLAZGOS_PARRAFO.obtener(clave)
+        if plantillas is None:
+            claves[i] = clave
+            continue
+        n = int(almacen.numeros[i])
+        for k, tipo, detalle, extractos in plantillas:
+            por_paso[k].setdefault(i, []).append(_desde_plantilla(n, tipo, detalle, extractos))
+
+    if claves:
+        indices = None
+        if len(claves) < len(almacen):
+            indices = np.fromiter(claves, dtype=np.int64, count=len(claves))
+        calculados = [
+            _aplicar_paso_almacen(almacen, reglas_paso, indices, revisados) for reglas_paso in pasos
+        ]
+        for i, clave in claves.items():
+            MEMO_HALLAZGOS_PARRAFO.guardar(
+                clave, _plantillas((k, d.get(i, ())) for k, d in enumerate(calculados))
+            )
+        for k, d in enumerate(calculados):
+            por_paso[k].update(d)
+    return por_paso
 
-    patron_contenido_negativo = re.compile(
-        r"(no recuerda|no reconoci[oó]|no vio|no observ[oó]|no estuvo presente|"
-        r"no le consta|no puede precisar|no puede afirmar|no se aprecia|"
-        r"no se advierte|no se demuestra|no se acredita)",
-        flags=re.IGNORECASE,
-    )
 
-    patron_conclusion_fuerte_prueba = re.compile(
-        r"(de lo que se desprende que|de ello se desprende que|lo que demuestra que|"
-        r"lo que acredita que|ello demuestra que|ello acredita que|"
-        r"permite tener por acreditado que|confirma que|"
-        r"demuestra claramente que|acredita de manera concluyente que)",
-        flags=re.IGNORECASE,
-    )
+def _aplicar_regla_documento(regla: Regla, ctx) -> List[Dict[str, Any]]:
+    """
+    Aplica una regla de alcance "pares" o "global" sobre el contexto completo.
+    """
+    if regla.alcance == "pares":
+        return _aplicar_pares(regla, ctx)
+    seleccionados = regla.seleccionar(ctx)
+    if seleccionados is None:
+        return []
+    return [_hallazgo(regla, seleccionados, regla.max_extractos)]
 
-    for p in parrafos:
-        texto_p = p["texto"]
+
+def _planificar(seleccion: List[Regla]) -> List[Tuple[str, List[Regla]]]:
+    """
+    Convierte la selección de reglas en pasos ordenados: ("parrafo", [reglas
+    consecutivas del mismo bloque]) o (alcance, [regla]) para pares/globales.
+    """
+    pasos: List[Tuple[str, List[Regla]]] = []
+    for regla in seleccion:
         if (
-            patron_medio_probatorio.search(texto_p)
-            and patron_contenido_negativo.search(texto_p)
-            and patron_conclusion_fuerte_prueba.search(texto_p)
+            regla.alcance == "parrafo"
+            and regla.bloque
+            and pasos
+            and pasos[-1][0] == "parrafo"
+            and pasos[-1][1][-1].bloque == regla.bloque
         ):
-            resultados.append(
-                {
-                    "tipo": "Valoración contraria al contenido expreso del medio probatorio (mismo párrafo)",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se presenta un medio probatorio como demostrativo cuando el propio texto "
-                        "reconoce que su contenido es negativo o dubitativo."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
+            pasos[-1][1].append(regla)
+        else:
+            pasos.append((regla.alcance, [regla]))
+    return pasos
+
+
+def detectar_incongruencias(
+    parrafos: Union[List[Dict[str, Any]], AlmacenParrafos],
+    reglas: Optional[Iterable[str]] = None,
+    excluir: Optional[Iterable[str]] = None,
+    usar_memo: bool = True,
+    perfil: Optional[Perfil] = None,
+    avance: Optional[Callable[[int, int], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Aplica las reglas del registro (todas, o la selección indicada con
+    `reglas` / `excluir`, ver seleccionar_reglas) sobre párrafos etiquetados:
+    un AlmacenParrafos o la lista de dicts de etiquetar_parrafos.
 
-    # ============================================================
-    #  REGLA 8 – Hipótesis alternativas mal tratadas
-    # ============================================================
+    Con usar_memo, los hallazgos de las reglas por párrafo se memorizan por
+    hash del contenido del párrafo; las reglas de pares y globales se
+    recalculan siempre sobre el documento completo.
 
-    patron_alt_existencia = re.compile(
-        r"(otras versiones|otras explicaciones|otras hipótesis|"
-        r"hip[oó]tesis alternativa|versi[oó]n alternativa|"
-        r"coartada|explicaci[oó]n del imputado|"
-        r"otra posible explicaci[oó]n)",
-        flags=re.IGNORECASE,
-    )
+    Con `perfil` se mide cada paso del plan (bloque de reglas) por separado,
+    sin memo.
 
-    patron_no_descarta_alt2 = re.compile(
-        r"(no se descartan|no puede descartarse|no puede excluirse|"
-        r"no se ha descartado|no excluye la versi[oó]n del imputado)",
-        flags=re.IGNORECASE,
-    )
+    `avance` recibe (reglas evaluadas, reglas seleccionadas) a medida que se
+    completan los pasos del plan; puede lanzar una excepción para interrumpir.
+    """
+    if isinstance(parrafos, AlmacenParrafos):
+        almacen = parrafos
+    else:
+        almacen = AlmacenParrafos.desde_parrafos(parrafos)
+    resultados: List[Dict[str, Any]] = []
+    ctx = _Contexto(almacen)
+    seleccion = seleccionar_reglas(reglas, excluir)
+    plan = _planificar(seleccion)
+    hechas = 0
+
+    def avanzar(n: int) -> None:
+        nonlocal hechas
+        hechas += n
+        if avance is not None:
+            avance(hechas, len(seleccion))
+
+    if perfil is not None:
+        revisados: Dict[int, Tuple[Mapping, _BusquedaParrafo]] = {}
+        for alcance, reglas_paso in plan:
+            nombre = f"{reglas_paso[0].familia} [{', '.join(r.id for r in reglas_paso)}] ({alcance})"
+            with perfil.medir(nombre) as m:
+                if alcance == "parrafo":
+                    por_parrafo = _aplicar_paso_almacen(almacen, reglas_paso, None, revisados)
+                    nuevos = [h for i in sorted(por_parrafo) for h in por_parrafo[i]]
+                else:
+                    nuevos = _aplicar_regla_documento(reglas_paso[0], ctx)
+                m.datos["hallazgos"] = len(nuevos)
+            resultados.extend(nuevos)
+            avanzar(len(reglas_paso))
+        return resultados
+
+    # Las reglas por párrafo se resuelven (o se recuperan del memo) para todos
+    # los pasos a la vez; luego se emiten en el orden del plan, párrafo a párrafo.
+    pasos = [reglas_paso for alcance, reglas_paso in plan if alcance == "parrafo"]
+    por_paso = _hallazgos_almacen(almacen, pasos, usar_memo) if pasos else []
+    avanzar(sum(len(reglas_paso) for reglas_paso in pasos))
+
+    k = 0
+    for alcance, reglas_paso in plan:
+        if alcance == "parrafo":
+            por_parrafo = por_paso[k]
+            for i in sorted(por_parrafo):
+                resultados.extend(por_parrafo[i])
+            k += 1
+        else:
+            resultados.extend(_aplicar_regla_documento(reglas_paso[0], ctx))
+            avanzar(1)
 
-    patron_unica_conclusion = re.compile(
-        r"(única explicaci[oó]n posible|única explicaci[oó]n razonable|"
-        r"única conclusi[oó]n posible|única hip[oó]tesis plausible|"
-        r"único camino l[oó]gico|conclusi[oó]n inevitable)",
-        flags=re.IGNORECASE,
-    )
+    return resultados
 
-    patron_descartar_sin_exp = re.compile(
-        r"(no es cre[ií]ble|no resulta razonable|no convence al juzgador|"
-        r"no es atendible|resulta inveros[ií]mil|no tiene asidero)",
-        flags=re.IGNORECASE,
-    )
 
-    patron_analisis_alt = re.compile(
-        r"(analiza la versi[oó]n alternativa|contrasta la hip[oó]tesis|"
-        r"examina la explicaci[oó]n del imputado|"
-        r"eval[uú]a la versi[oó]n alternativa)",
-        flags=re.IGNORECASE,
-    )
+# -------------------
+# 6. Análisis incremental (por fragmentos)
+# -------------------
 
-    for p in parrafos:
-        texto_p = p["texto"]
-        if patron_alt_existencia.search(texto_p) and patron_unica_conclusion.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "Incongruencia: reconoce alternativas pero afirma única explicación",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se reconocen hipótesis alternativas pero se mantiene una 'única explicación' como definitiva."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
+# Caracteres del final del texto global que se conservan para detectar los
+# PATRONES_TEXTO_GLOBAL que crucen el límite entre dos párrafos.
+_LARGO_COLA_GLOBAL = 256
 
-        if patron_no_descarta_alt2.search(texto_p) and patron_unica_conclusion.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "No se descartan alternativas pero se afirma conclusión única",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se admite que no se descartan otras hipótesis y aun así se afirma una única conclusión."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
 
-        if patron_alt_existencia.search(texto_p) and not patron_analisis_alt.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "Mención de hipótesis alternativas sin análisis",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se mencionan explicaciones alternativas sin analizarlas ni contrastarlas."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
+class _ContextoIncremental:
+    """
+    Versión por fragmentos de _Contexto: conserva solo una ficha ligera
+    (número, extracto recortado y etiquetas) de los párrafos que alguna regla
+    de pares o global puede citar, y no el texto completo.
+    """
 
-        if patron_alt_existencia.search(texto_p) and patron_descartar_sin_exp.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "Descarte injustificado de hipótesis alternativa",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se descarta una versión alternativa con fórmulas vacías ('no es creíble', etc.) "
-                        "sin justificación probatoria."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
+    def __init__(self):
+        self.total = 0
+        self._primeros: List[Dict[str, Any]] = []
+        self._subconjuntos: Dict[str, List[Dict[str, Any]]] = {}
+        self._en_global = {patron: False for patron in PATRONES_TEXTO_GLOBAL}
+        self._cola = ""
+        self.indice = IndicePosicional()
+
+    def primeros(self, k: int) -> List[Dict[str, Any]]:
+        return self._primeros[:k]
 
-        if patron_unica_conclusion.search(texto_p) and not patron_alt_existencia.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "Conclusión única sin contrastar hipótesis alternativas",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se sostiene una 'única explicación' sin referencia a posibles hipótesis alternativas."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
+    def con(self, etiqueta: str) -> List[Dict[str, Any]]:
+        return self._subconjuntos.get(etiqueta, [])
+
+    def en_texto_global(self, patron: "re.Pattern") -> bool:
+        return self._en_global[patron]
+
+    def registrar(self, p: Dict[str, Any]) -> None:
+        texto = p["texto"]
+        ficha = dict(p, texto=recortar_texto(texto))
+        etiquetas = [k for k, v in p.items() if k not in ("n", "texto") and v]
+
+        if p.get("tiene_indicio") and not self._subconjuntos.get("tiene_indicio"):
+            # Reglas 1.2 / 5.3: solo importa si es el único párrafo con indicio.
+            ficha["fuerza_indebida"] = _BusquedaParrafo(texto).cumple(
+                "fuerza_indebida", PATRON_FUERZA_INDEBIDA
             )
 
-    # ============================================================
-    #  REGLA 9 – Máximas de experiencia y sana crítica mal aplicadas
-    # ============================================================
+        self.total += 1
+        if len(self._primeros) < PARRAFOS_MUESTRA:
+            self._primeros.append(ficha)
+        for etiqueta in etiquetas:
+            self._subconjuntos.setdefault(etiqueta, []).append(ficha)
+            self.indice.agregar(etiqueta, p["n"])
 
-    patron_max_exp = re.compile(
-        r"(m[aá]ximas de la experiencia|reglas de experiencia|"
-        r"reglas de la experiencia com[uú]n|m[aá]ximas de experiencia com[uú]n)",
-        flags=re.IGNORECASE,
-    )
+        canonico = canonizar(texto)
+        unido = self._cola + " " + canonico if self._cola else canonico
+        for patron, visto in self._en_global.items():
+            if not visto and patron_canonico(patron).search(unido):
+                self._en_global[patron] = True
+        self._cola = unido[-_LARGO_COLA_GLOBAL:]
 
-    patron_sana_critica = re.compile(
-        r"(sana cr[ií]tica|reglas de la sana cr[ií]tica|"
-        r"principios de la sana cr[ií]tica)",
-        flags=re.IGNORECASE,
-    )
 
-    patron_generalizacion = re.compile(
-        r"(lo normal es que|lo habitual es que|"
-        r"es de experiencia com[uú]n que|"
-        r"es de conocimiento general que|"
-        r"suele ocurrir que|es l[oó]gico pensar que|"
-        r"es natural que)",
-        flags=re.IGNORECASE,
-    )
+class AnalisisIncremental:
+    """
+    Detección de incongruencias alimentada por fragmentos de texto (p. ej. las
+    páginas de extractores.iterar_paginas_pdf), equivalente a
+    analizar_incongruencias sobre los fragmentos unidos por una línea en blanco.
 
-    patron_estereotipo = re.compile(
-        r"(quien nada debe nada teme|nadie inocente huye|"
-        r"quien huye es porque algo teme|"
-        r"todo narcotraficante|todo delincuente|"
-        r"ninguna persona honesta|ning[uú]n inocente)",
-        flags=re.IGNORECASE,
-    )
+    Cada párrafo se etiqueta y se somete a las reglas por párrafo en cuanto se
+    completa; las reglas de pares y globales se resuelven en `finalizar()`.
+    """
 
-    patron_sustento_exp = re.compile(
-        r"(prueba|pruebas|indicio|indicios|hecho indiciario|hechos indiciarios|"
-        r"pericia|perito|informe pericial|informe t[eé]cnico|"
-        r"estudio estad[ií]stico|estad[ií]sticas|datos emp[ií]ricos|"
-        r"acta|actas|documento|documentaci[oó]n)",
-        flags=re.IGNORECASE,
-    )
+    def __init__(
+        self,
+        reglas: Optional[Iterable[str]] = None,
+        excluir: Optional[Iterable[str]] = None,
+    ):
+        self._plan = _planificar(seleccionar_reglas(reglas, excluir))
+        self._pasos = [reglas_paso for alcance, reglas_paso in self._plan if alcance == "parrafo"]
+        self._version = _huella_pasos(self._pasos) if self._pasos else None
+        self._por_paso: List[List[Dict[str, Any]]] = [[] for _ in self._plan]
+        self._ctx = _ContextoIncremental()
+        self._pendiente = ""
+        self._iniciado = False
+        self._hay_contenido = False
+        self._n = 0
+
+    def agregar(self, fragmento: str) -> None:
+        # Un fragmento vacío también cuenta: aporta su separador de párrafo.
+        texto = self._pendiente + "\n\n" + fragmento if self._iniciado else fragmento
+        self._iniciado = True
+        self._hay_contenido = self._hay_contenido or bool(fragmento.strip())
+
+        separadores = list(_SEPARADOR_PARRAFOS.finditer(texto))
+        # Si tras el último separador solo hay espacios, aún puede alargarse.
+        if separadores and not texto[separadores[-1].end():].strip():
+            separadores.pop()
+        inicio = 0
+        for sep in separadores:
+            self._procesar_bloque(texto[inicio:sep.start()])
+            inicio = sep.end()
+        self._pendiente = texto[inicio:]
+
+    def _procesar_bloque(self, bloque: str) -> None:
+        self._n += 1
+        limpio = bloque.strip()
+        if not limpio:
+            return
+        p = etiquetar_parrafos([{"n": self._n, "texto": limpio}])[0]
+        if self._pasos:
+            hallazgos = iter(_hallazgos_parrafo(self._pasos, p, self._version, huella(limpio)))
+            for i, (alcance, _) in enumerate(self._plan):
+                if alcance == "parrafo":
+                    self._por_paso[i].extend(next(hallazgos))
+        self._ctx.registrar(p)
+
+    def provisional(self) -> List[Dict[str, Any]]:
+        """
+        Hallazgos de las reglas por párrafo sobre los párrafos ya completos,
+        en el orden del plan. Las reglas de pares y globales (p. ej. 1.3 o
+        las de 4.0.x) solo se resuelven en finalizar().
+        """
+        return [
+            hallazgo
+            for i, (alcance, _) in enumerate(self._plan)
+            if alcance == "parrafo"
+            for hallazgo in self._por_paso[i]
+        ]
+
+    def finalizar(self) -> List[Dict[str, Any]]:
+        if not self._hay_contenido:
+            return []
+        if self._iniciado:
+            self._procesar_bloque(self._pendiente)
+            self._pendiente = ""
+            self._iniciado = False
+
+        resultados: List[Dict[str, Any]] = []
+        for i, (alcance, reglas_paso) in enumerate(self._plan):
+            if alcance == "parrafo":
+                resultados.extend(self._por_paso[i])
+            else:
+                resultados.extend(_aplicar_regla_documento(reglas_paso[0], self._ctx))
+        return resultados
 
-    for p in parrafos:
-        texto_p = p["texto"]
-        if (patron_max_exp.search(texto_p) or patron_sana_critica.search(texto_p)) and not patron_sustento_exp.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "Invocación abstracta de máximas de experiencia/sana crítica sin explicación",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se invocan genéricamente máximas de experiencia o sana crítica sin explicarlas "
-                        "ni vincularlas con datos empíricos ni pruebas."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
 
-        if patron_generalizacion.search(texto_p) and not patron_sustento_exp.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "Generalización empírica sin sustento probatorio",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se usan fórmulas como 'lo normal es que', 'es de experiencia común que', "
-                        "sin apoyo en datos empíricos o pruebas específicas."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
+# -------------------
+# 7. Huellas de versión y caché de resultados
+# -------------------
 
-        if patron_estereotipo.search(texto_p):
-            resultados.append(
-                {
-                    "tipo": "Uso de máximas de experiencia estereotipadas/prejuiciosas",
-                    "parrafos": [p["n"]],
-                    "detalle": (
-                        "Se utilizan estereotipos ('quien nada debe nada teme', etc.) como si fueran "
-                        "verdaderas máximas de experiencia."
-                    ),
-                    "extractos": [recortar_texto(texto_p)],
-                }
-            )
+# Subir cuando cambie el motor (segmentación, formato de los hallazgos…) de
+# una forma que las huellas de código no capturen.
+VERSION_MOTOR = "1"
 
-    return resultados
+CACHE_RESULTADOS = CacheLRU(CACHE_RESULTADOS_MAX_ENTRADAS)
+
+
+def _patron_de(nombre: str) -> Optional["re.Pattern"]:
+    if nombre in ETIQUETAS:
+        return ETIQUETAS[nombre]
+    if nombre in PREDICADOS:
+        return PREDICADOS[nombre]
+    valor = globals().get(nombre)
+    return valor if isinstance(valor, re.Pattern) else None
+
+
+def _nombres_condiciones(condiciones: Tuple[Condicion, ...]) -> List[str]:
+    nombres: List[str] = []
+    for c in condiciones:
+        nombres.extend(c if isinstance(c, tuple) else (c,))
+    return nombres
+
+
+def huella_regla(regla: Regla) -> str:
+    """
+    Huella de una regla: su plantilla, sus condiciones y los patrones de las
+    etiquetas/predicados que usa; para las reglas globales, el código del
+    selector y los patrones a los que este se refiere.
+    """
+    nombres = _nombres_condiciones(regla.requiere) + _nombres_condiciones(regla.excluye)
+    nombres += [e for e in regla.pares if e]
+    partes = [
+        repr((regla.id, regla.familia, regla.alcance, regla.tipo, regla.detalle,
+              regla.requiere, regla.excluye, regla.bloque, regla.pares,
+              regla.distintos, regla.max_extractos)),
+    ]
+    if regla.seleccionar is not None:
+        codigo = regla.seleccionar.__code__
+        partes.append(huella_funcion(regla.seleccionar))
+        nombres += list(codigo.co_names)
+        nombres += [c for c in codigo.co_consts if isinstance(c, str)]
+    for nombre in nombres:
+        patron = _patron_de(nombre)
+        if patron is not None:
+            partes.append(f"{nombre}={patron.pattern!r}/{patron.flags}")
+    return huella("\n".join(partes))
+
+
+def huella_reglas(seleccion: List[Regla]) -> str:
+    """
+    Huella de una selección de reglas más el motor que las aplica. Cambiar una
+    regla solo altera la huella de las selecciones que la incluyen.
+    """
+    partes = [VERSION_MOTOR, repr((MAX_PARES, PARRAFOS_MUESTRA)), huella_canonico()]
+    for funcion in (
+        segmentar_parrafos, recortar_texto, etiquetar_parrafos, _cumple, _hallazgo,
+        _aplicar_pares, pares_cercanos, _aplicar_reglas_parrafo, _aplicar_regla_documento,
+        _planificar, detectar_incongruencias,
+    ):
+        partes.append(huella_funcion(funcion))
+    partes.extend(huella_regla(r) for r in seleccion)
+    return huella("\n".join(partes))
 
 
 # -------------------
-# 5. Función principal
+# 8. Función principal
 # -------------------
 
 from typing import Dict  # ya lo tienes arriba, si aparece dos veces no pasa nada, pero puedes omitirlo si quieres
 
-def analizar_incongruencias(texto: str, resultados: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+def analizar_incongruencias(
+    texto: Union[str, "DocumentoAnalizado"],
+    resultados: Dict[str, Any] = None,
+    reglas: Optional[Iterable[str]] = None,
+    excluir: Optional[Iterable[str]] = None,
+    usar_cache: bool = True,
+    perfil: Optional[Perfil] = None,
+    secciones: Optional[Iterable[str]] = None,
+    avance: Optional[Callable[[int, int], None]] = None,
+) -> List[Dict[str, Any]]:
     """
     Función principal llamada por la app de Streamlit.
 
-    - texto: sentencia completa (obligatorio)
+    - texto: sentencia completa (obligatorio), o un documento.DocumentoAnalizado
+      cuya segmentación y etiquetas se reutilizan
     - resultados: dict devuelto por evaluar_todo (opcional, por ahora no se usa)
-
-    Por ahora usamos únicamente el texto y aplicamos las REGLAS 1–9
-    ya implementadas en este módulo.
+    - reglas / excluir: ids o familias del registro a aplicar u omitir
+      (por defecto, todas las reglas generales y las REGLAS 1–9).
+    - usar_cache: memoriza el resultado por (hash del texto, huella de las
+      reglas seleccionadas) en CACHE_RESULTADOS y usa los memos por párrafo,
+      de modo que un texto corregido solo re-analiza los párrafos que cambian.
+    - perfil: perfil.Perfil donde registrar tiempos y memoria de la
+      segmentación, el etiquetado y cada bloque de reglas (sin caché ni memos).
+    - secciones: nombres de secciones.SECCIONES; si se indican, solo se
+      analizan los párrafos de esas secciones (con su numeración original) y
+      las reglas globales miran solo ese texto.
+    - avance: recibe (reglas evaluadas, reglas seleccionadas) durante la
+      detección (ver detectar_incongruencias); un resultado de la caché se
+      informa de una vez.
     """
+    # Import diferido: documento importa este módulo.
+    from documento import DocumentoAnalizado, acotar_documento
+
+    if secciones is not None and texto:
+        texto = acotar_documento(texto, secciones, perfil)
+    documento = texto if isinstance(texto, DocumentoAnalizado) else None
+    if documento is not None:
+        texto = documento.texto
     if not texto or not texto.strip():
         return []
-    parrafos = segmentar_parrafos(texto)
-    parrafos_etq = etiquetar_parrafos(parrafos)
-    return detectar_incongruencias(parrafos_etq)
+    if perfil is not None:
+        return _analizar_perfilado(texto, reglas, excluir, perfil, documento, avance)
+
+    seleccion = seleccionar_reglas(reglas, excluir)
+    clave = (documento.huella if documento is not None else huella(texto), huella_reglas(seleccion))
+    if usar_cache:
+        guardado = CACHE_RESULTADOS.obtener(clave)
+        if guardado is not None:
+            if avance is not None:
+                avance(len(seleccion), len(seleccion))
+            return copy.deepcopy(guardado)
+
+    if documento is not None:
+        almacen = documento.etiquetado(usar_memo=usar_cache)
+    else:
+        almacen = AlmacenParrafos.desde_texto(texto, usar_memo=usar_cache)
+    hallazgos = detectar_incongruencias(
+        almacen, reglas=reglas, excluir=excluir, usar_memo=usar_cache, avance=avance
+    )
+
+    if usar_cache:
+        CACHE_RESULTADOS.guardar(clave, copy.deepcopy(hallazgos))
+    return hallazgos
+
+
+def _analizar_perfilado(
+    texto: str,
+    reglas: Optional[Iterable[str]],
+    excluir: Optional[Iterable[str]],
+    perfil: Perfil,
+    documento: Optional["DocumentoAnalizado"] = None,
+    avance: Optional[Callable[[int, int], None]] = None,
+) -> List[Dict[str, Any]]:
+    with perfil.medir("analizar_incongruencias") as total:
+        with perfil.medir("segmentar_parrafos") as m:
+            almacen = documento.almacen if documento is not None else AlmacenParrafos.segmentar(texto)
+            m.datos["parrafos"] = len(almacen)
+        with perfil.medir("etiquetar_parrafos") as m:
+            if documento is not None:
+                documento.etiquetado(usar_memo=False)
+            else:
+                almacen.etiquetar(usar_memo=False)
+            m.datos.update({nombre: almacen.contar(nombre) for nombre in ETIQUETAS})
+        hallazgos = detectar_incongruencias(
+            almacen, reglas=reglas, excluir=excluir, usar_memo=False, perfil=perfil,
+            avance=avance,
+        )
+        total.datos["parrafos"] = len(almacen)
+        total.datos["hallazgos"] = len(hallazgos)
+    return hallazgos
+
+
+def analizar_incongruencias_fragmentos(
+    fragmentos: Iterable[str],
+    reglas: Optional[Iterable[str]] = None,
+    excluir: Optional[Iterable[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Igual que analizar_incongruencias, pero consumiendo el texto por fragmentos
+    (p. ej. página a página) sin reunirlo completo en memoria.
+    """
+    analisis = AnalisisIncremental(reglas=reglas, excluir=excluir)
+    for fragmento in fragmentos:
+        analisis.agregar(fragmento)
+    return analisis.finalizar()
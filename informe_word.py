@@ -1,5 +1,5 @@
 from io import BytesIO
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from docx import Document
 from docx.shared import Pt
 
@@ -22,22 +22,37 @@ def agregar_parrafo(doc, texto, size=11, bold=False):
     r.font.size = Pt(size)
 
 
-def agregar_tabla_criterios(doc, criterios: Dict[str, int]):
+def formatear_parrafos(numeros: List[int], maximo: int = 12) -> str:
+    if not numeros:
+        return "—"
+    texto = ", ".join(str(n) for n in numeros[:maximo])
+    if len(numeros) > maximo:
+        texto += f"… (+{len(numeros) - maximo})"
+    return texto
+
+
+def agregar_tabla_criterios(
+    doc, criterios: Dict[str, int], parrafos: Optional[Dict[str, List[int]]] = None
+):
     if not criterios:
         agregar_parrafo(doc, "No se encontraron criterios evaluados.")
         return
 
-    table = doc.add_table(rows=1, cols=2)
+    table = doc.add_table(rows=1, cols=2 if parrafos is None else 3)
     table.style = "Table Grid"
 
     hdr = table.rows[0].cells
     hdr[0].text = "Criterio"
     hdr[1].text = "Puntaje"
+    if parrafos is not None:
+        hdr[2].text = "Párrafos con expresiones del criterio"
 
     for k, v in criterios.items():
         row = table.add_row().cells
         row[0].text = k
         row[1].text = str(v)
+        if parrafos is not None:
+            row[2].text = formatear_parrafos(parrafos.get(k, []))
 
 
 def agregar_incongruencias(doc, incong):
@@ -61,7 +76,32 @@ def agregar_incongruencias(doc, incong):
 # FUNCIÓN PRINCIPAL
 # ============================
 
-def generar_informe(texto, resultados: Dict[str, Any], incong):
+def generar_informe(
+    texto,
+    resultados: Optional[Dict[str, Any]] = None,
+    incong=None,
+    modos_pdf: Optional[List[str]] = None,
+):
+    """
+    `texto` puede ser el texto de la sentencia o un documento.DocumentoAnalizado;
+    con este último, la tabla de criterios indica además en qué párrafos
+    aparecen sus expresiones. Si faltan `resultados` o `incong`, se calculan
+    sobre el mismo documento. `modos_pdf` es el modo de extracción de cada
+    página del PDF (ver extractores.leer_pdf), que se resume en la portada.
+    """
+    from documento import DocumentoAnalizado
+
+    documento = texto if isinstance(texto, DocumentoAnalizado) else None
+    if resultados is None or incong is None:
+        if documento is None:
+            documento = DocumentoAnalizado(texto)
+        if resultados is None:
+            from evaluador import evaluar_todo
+            resultados = evaluar_todo(documento)
+        if incong is None:
+            from incongruencias import analizar_incongruencias
+            incong = analizar_incongruencias(documento, resultados)
+
     doc = Document()
 
     # PORTADA
@@ -69,6 +109,30 @@ def generar_informe(texto, resultados: Dict[str, Any], incong):
     agregar_parrafo(doc, "Sistema de Auditoría Indiciaria – versión V5.")
     agregar_parrafo(doc, "")
     agregar_parrafo(doc, "Este informe resume el análisis automatizado realizado sobre la sentencia cargada.")
+    ambito = resultados.get("ambito") if isinstance(resultados, dict) else None
+    if ambito:
+        from secciones import NOMBRES_SECCIONES
+
+        if ambito["acotado"]:
+            nombres = ", ".join(NOMBRES_SECCIONES[s] for s in ambito["secciones"])
+            agregar_parrafo(
+                doc,
+                f"Análisis acotado a: {nombres} ({ambito['parrafos']} de "
+                f"{ambito['parrafos_totales']} párrafos).",
+            )
+        else:
+            agregar_parrafo(
+                doc,
+                "No se reconocieron las secciones de la sentencia; se analizó el texto completo.",
+            )
+    if modos_pdf:
+        completas = [n for n, modo in enumerate(modos_pdf, start=1) if modo == "completo"]
+        agregar_parrafo(
+            doc,
+            f"Extracción del PDF: {len(modos_pdf) - len(completas)} de {len(modos_pdf)} "
+            f"páginas en modo rápido"
+            + (f"; modo completo en las páginas {formatear_parrafos(completas)}." if completas else "."),
+        )
     doc.add_page_break()
 
     # RESUMEN ICI
@@ -95,7 +159,9 @@ def generar_informe(texto, resultados: Dict[str, Any], incong):
     doc.add_page_break()
     agregar_titulo(doc, "2. DETALLE DE CRITERIOS C1 – C12", size=14)
     agregar_parrafo(doc, "Puntajes asignados a cada criterio de coherencia indiciaria.")
-    agregar_tabla_criterios(doc, criterios)
+    agregar_tabla_criterios(
+        doc, criterios, documento.parrafos_por_criterio if documento is not None else None
+    )
 
     # SECCIÓN 3: INCONGRUENCIAS
     doc.add_page_break()
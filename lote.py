@@ -0,0 +1,298 @@
+# lote.py
+"""
+Procesamiento por lotes de un directorio de sentencias (PDF / Word), sin Streamlit.
+
+    python -m lote ARCHIVO_DE_SENTENCIAS/ --salida resultados.jsonl [--procesos 8]
+        [--secciones fundamentos valoracion]
+
+Cada documento se extrae y analiza (evaluar_todo + analizar_incongruencias) en
+un pool de procesos. Como hay varios documentos en curso a la vez, mientras
+unos procesos analizan otros ya van extrayendo los siguientes. El número de
+documentos en curso está acotado (config.PENDIENTES_POR_PROCESO_LOTE por
+proceso), así que la memoria no crece con el tamaño del archivo judicial.
+
+Por cada documento se agrega una línea JSON a la salida con `criterios`,
+`ICI_ajustado`, las incongruencias y los `conteos` por patrón (con ellos,
+`python -m corpus` vuelve a puntuar el lote con otros umbrales o pesos sin
+analizar de nuevo), o con `error` si falló (un error no detiene el lote). Si
+el proceso se interrumpe, volver a lanzar el mismo comando omite los
+documentos ya registrados y reintenta los que fallaron; si un documento
+aparece varias veces en la salida, vale su última línea.
+
+Con --secciones solo se analizan esas secciones de cada sentencia (ver
+secciones.py); el registro agrega su `ambito`, con el ahorro de tiempo
+estimado frente al texto completo.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import PENDIENTES_POR_PROCESO_LOTE, PROCESOS_LOTE
+
+EXTENSIONES = (".pdf", ".docx", ".doc")
+
+
+def buscar_documentos(directorio: str) -> List[str]:
+    """
+    Rutas (relativas a `directorio`, con '/') de los PDF y Word del árbol,
+    en orden estable.
+    """
+    encontrados = []
+    for raiz, carpetas, archivos in os.walk(directorio):
+        carpetas.sort()
+        for nombre in sorted(archivos):
+            if nombre.lower().endswith(EXTENSIONES) and not nombre.startswith("~$"):
+                relativa = os.path.relpath(os.path.join(raiz, nombre), directorio)
+                encontrados.append(relativa.replace(os.sep, "/"))
+    return encontrados
+
+
+def analizar_texto(texto: str, secciones: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    evaluar_todo + analizar_incongruencias sobre `texto` (solo `secciones`,
+    si se indican), en el formato de los registros del lote. También lo usa
+    servicio.py.
+    """
+    from documento import DocumentoAnalizado
+    from evaluador import evaluar_todo
+    from incongruencias import analizar_incongruencias
+    from secciones import estimar_ahorro
+
+    t0 = time.perf_counter()
+    documento = DocumentoAnalizado(texto)
+    resultados = evaluar_todo(documento, secciones=secciones)
+    incong = analizar_incongruencias(documento, resultados, secciones=secciones)
+    registro = {
+        "caracteres": len(texto),
+        "criterios": resultados["criterios"],
+        "ICI_sin_penalizacion": resultados["ICI_sin_penalizacion"],
+        "ICI_ajustado": resultados["ICI_ajustado"],
+        "interpretacion": resultados["interpretacion"],
+        "incongruencias": incong,
+        "conteos": resultados["conteos"],
+    }
+    if "cercanos_C7" in resultados:
+        registro["cercanos_C7"] = resultados["cercanos_C7"]
+    if "ambito" in resultados:
+        ambito = resultados["ambito"]
+        ahorro = estimar_ahorro(time.perf_counter() - t0, ambito)
+        ambito["segundos_ahorrados_estimados"] = None if ahorro is None else round(ahorro, 3)
+        registro["ambito"] = ambito
+    return registro
+
+
+def procesar_documento(
+    ruta: str, relativa: str, secciones: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """
+    Extrae y analiza un documento (solo `secciones`, si se indican). Se
+    ejecuta en los procesos del pool; los errores se devuelven como registro
+    en lugar de propagarse.
+    """
+    t0 = time.perf_counter()
+    try:
+        from extractores import extraer_texto
+
+        # Un solo proceso por PDF: el paralelismo ya lo da el pool del lote.
+        texto = extraer_texto(ruta, procesos=1)
+        registro = {"archivo": relativa, **analizar_texto(texto, secciones)}
+        registro["segundos"] = round(time.perf_counter() - t0, 3)
+        return registro
+    except Exception as e:
+        return {
+            "archivo": relativa,
+            "error": f"{type(e).__name__}: {e}",
+            "segundos": round(time.perf_counter() - t0, 3),
+        }
+
+
+def leer_procesados(salida: str, reintentar_errores: bool = True) -> Set[str]:
+    """
+    Documentos ya registrados en `salida` (según su última línea). Con
+    reintentar_errores, los que terminaron en error no cuentan como hechos.
+    Las líneas incompletas (interrupción a mitad de escritura) se ignoran.
+    """
+    estado: Dict[str, bool] = {}
+    if not os.path.exists(salida):
+        return set()
+    with open(salida, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                continue
+            if isinstance(registro, dict) and "archivo" in registro:
+                estado[registro["archivo"]] = "error" not in registro
+    return {a for a, ok in estado.items() if ok or not reintentar_errores}
+
+
+def _abrir_salida(salida: str):
+    """
+    Abre la salida para agregar líneas, cerrando antes una línea que una
+    interrupción haya dejado a medias.
+    """
+    incompleta = False
+    if os.path.exists(salida) and os.path.getsize(salida) > 0:
+        with open(salida, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            incompleta = f.read(1) != b"\n"
+    archivo = open(salida, "a", encoding="utf-8")
+    if incompleta:
+        archivo.write("\n")
+    return archivo
+
+
+def procesar_lote(
+    directorio: str,
+    salida: str,
+    procesos: Optional[int] = None,
+    reintentar_errores: bool = True,
+    informar: Callable[[str], None] = print,
+    secciones: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Procesa todos los documentos de `directorio` que aún no estén en `salida`
+    y devuelve un resumen (totales, errores, documentos por minuto).
+    """
+    if secciones is not None:
+        from secciones import normalizar_secciones
+
+        # Se valida antes de lanzar el pool, no en cada documento.
+        secciones = normalizar_secciones(secciones)
+    if procesos is None:
+        procesos = PROCESOS_LOTE
+    if procesos <= 0:
+        procesos = os.cpu_count() or 1
+    max_en_curso = procesos * max(1, PENDIENTES_POR_PROCESO_LOTE)
+
+    documentos = buscar_documentos(directorio)
+    hechos = leer_procesados(salida, reintentar_errores)
+    pendientes = deque(d for d in documentos if d not in hechos)
+    resumen: Dict[str, Any] = {
+        "documentos": len(documentos),
+        "omitidos": len(documentos) - len(pendientes),
+        "procesados": 0,
+        "errores": 0,
+    }
+    total = len(pendientes)
+    t0 = time.perf_counter()
+
+    # Documentos que estaban en curso cuando murió un proceso del pool: se
+    # reintentan de a uno para que el error quede solo en el que lo causó.
+    sospechosos: deque = deque()
+
+    with _abrir_salida(salida) as out:
+        while pendientes or sospechosos:
+            roto = False
+            with ProcessPoolExecutor(
+                max_workers=procesos, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                en_curso: Dict[Any, Tuple[str, bool]] = {}
+                while pendientes or sospechosos or en_curso:
+                    while not roto:
+                        aislado = bool(sospechosos)
+                        cola = sospechosos if aislado else pendientes
+                        limite = 1 if aislado else max_en_curso
+                        if not cola or len(en_curso) >= limite:
+                            break
+                        relativa = cola.popleft()
+                        try:
+                            futuro = pool.submit(
+                                procesar_documento,
+                                os.path.join(directorio, relativa),
+                                relativa,
+                                secciones,
+                            )
+                        except BrokenProcessPool:
+                            cola.appendleft(relativa)
+                            roto = True
+                            break
+                        en_curso[futuro] = (relativa, aislado)
+                    if not en_curso:
+                        break
+
+                    listos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                    for futuro in listos:
+                        relativa, aislado = en_curso.pop(futuro)
+                        try:
+                            registro = futuro.result()
+                        except BrokenProcessPool:
+                            roto = True
+                            if not aislado:
+                                sospechosos.append(relativa)
+                                continue
+                            registro = {
+                                "archivo": relativa,
+                                "error": "BrokenProcessPool: el proceso terminó inesperadamente",
+                            }
+                        out.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                        out.flush()
+
+                        resumen["procesados"] += 1
+                        if "error" in registro:
+                            resumen["errores"] += 1
+                            estado = f"ERROR {registro['error']}"
+                        else:
+                            estado = (
+                                f"ICI {registro['ICI_ajustado']} | "
+                                f"{len(registro['incongruencias'])} incongruencias"
+                            )
+                            ahorro = registro.get("ambito", {}).get("segundos_ahorrados_estimados")
+                            if ahorro is not None:
+                                estado += f" | ~{ahorro:.2f} s ahorrados"
+                        informar(f"[{resumen['procesados']}/{total}] {relativa}: {estado}")
+                    if roto and not en_curso:
+                        # Pool inservible (p. ej. un proceso murió por falta de
+                        # memoria): se sale del with y se crea otro.
+                        break
+
+    minutos = (time.perf_counter() - t0) / 60
+    resumen["minutos"] = round(minutos, 3)
+    resumen["documentos_por_minuto"] = (
+        round(resumen["procesados"] / minutos, 2) if minutos > 0 else None
+    )
+    return resumen
+
+
+def main(argv=None) -> int:
+    from secciones import SECCIONES
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directorio", help="carpeta con las sentencias (se recorre completa)")
+    parser.add_argument("--salida", default="resultados_ici.jsonl", help="archivo JSONL de resultados")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="procesos del pool (por defecto config.PROCESOS_LOTE; 0 = todos los núcleos)")
+    parser.add_argument("--no-reintentar-errores", action="store_true",
+                        help="al reanudar, no volver a procesar los documentos que fallaron")
+    parser.add_argument("--secciones", nargs="+", default=None, choices=SECCIONES,
+                        help="analizar solo estas secciones (p. ej. fundamentos valoracion)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directorio):
+        parser.error(f"no es un directorio: {args.directorio}")
+
+    resumen = procesar_lote(
+        args.directorio,
+        args.salida,
+        procesos=args.procesos,
+        reintentar_errores=not args.no_reintentar_errores,
+        secciones=args.secciones,
+    )
+    print(
+        f"{resumen['procesados']} documentos procesados ({resumen['errores']} con error, "
+        f"{resumen['omitidos']} ya estaban en {args.salida}) en {resumen['minutos']:.2f} min "
+        f"-> {resumen['documentos_por_minuto'] or 0:.1f} documentos/min"
+    )
+    return 1 if resumen["errores"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
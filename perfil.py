@@ -0,0 +1,145 @@
+# perfil.py
+"""
+Perfilado opcional del análisis: tiempo de reloj y pico de memoria asignada
+(tracemalloc) por etapa, junto con conteos asociados (párrafos, coincidencias,
+hallazgos...).
+
+Uso:
+
+    perfil = Perfil()
+    resultados = evaluar_todo(texto, perfil=perfil)
+    incong = analizar_incongruencias(texto, perfil=perfil)
+    perfil.filas()     # tabla plana para mostrar
+    perfil.a_json()    # exportación
+
+Las mediciones se anidan: lo medido dentro de otro `medir` queda como hijo.
+Con memoria=True, tracemalloc se activa mientras dure la medición exterior
+(si no estaba ya activo); eso hace el análisis bastante más lento, por lo que
+conviene comparar tiempos solo entre ejecuciones con la misma opción.
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass
+class Medicion:
+    nombre: str
+    segundos: float = 0.0
+    memoria_pico_kb: Optional[float] = None
+    datos: Dict[str, Any] = field(default_factory=dict)
+    hijos: List["Medicion"] = field(default_factory=list)
+
+    def como_dict(self) -> Dict[str, Any]:
+        salida: Dict[str, Any] = {
+            "nombre": self.nombre,
+            "segundos": round(self.segundos, 6),
+            "memoria_pico_kb": None if self.memoria_pico_kb is None else round(self.memoria_pico_kb, 1),
+        }
+        if self.datos:
+            salida["datos"] = dict(self.datos)
+        if self.hijos:
+            salida["hijos"] = [h.como_dict() for h in self.hijos]
+        return salida
+
+
+class _Marco:
+    """
+    Estado de una medición en curso: memoria al entrar y el mayor pico visto
+    antes de que una medición hija reiniciara el pico de tracemalloc.
+    """
+
+    def __init__(self, medicion: Medicion, memoria_inicial: int):
+        self.medicion = medicion
+        self.memoria_inicial = memoria_inicial
+        self.max_visto = memoria_inicial
+
+
+class Perfil:
+    """
+    Recolector de mediciones. Se pasa como `perfil=` a evaluar_todo y
+    analizar_incongruencias; sin él, esas funciones no miden nada.
+    """
+
+    def __init__(self, memoria: bool = True):
+        self.memoria = memoria
+        self.mediciones: List[Medicion] = []
+        self._pila: List[_Marco] = []
+        self._tracemalloc_propio = False
+
+    @contextmanager
+    def medir(self, nombre: str, **datos: Any) -> Iterator[Medicion]:
+        """
+        Mide el bloque `with`. Devuelve la Medicion para que el bloque agregue
+        conteos en `medicion.datos`.
+        """
+        medicion = Medicion(nombre, datos=dict(datos))
+        if self._pila:
+            self._pila[-1].medicion.hijos.append(medicion)
+        else:
+            self.mediciones.append(medicion)
+
+        if self.memoria and not self._pila and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracemalloc_propio = True
+        medir_memoria = self.memoria and tracemalloc.is_tracing()
+
+        if medir_memoria:
+            actual, pico = tracemalloc.get_traced_memory()
+            if self._pila:
+                padre = self._pila[-1]
+                padre.max_visto = max(padre.max_visto, pico)
+            tracemalloc.reset_peak()
+            marco = _Marco(medicion, actual)
+        else:
+            marco = _Marco(medicion, 0)
+        self._pila.append(marco)
+
+        t0 = time.perf_counter()
+        try:
+            yield medicion
+        finally:
+            medicion.segundos = time.perf_counter() - t0
+            self._pila.pop()
+            if medir_memoria:
+                _, pico = tracemalloc.get_traced_memory()
+                pico = max(marco.max_visto, pico)
+                medicion.memoria_pico_kb = (pico - marco.memoria_inicial) / 1024
+                if self._pila:
+                    padre = self._pila[-1]
+                    padre.max_visto = max(padre.max_visto, pico)
+            if not self._pila and self._tracemalloc_propio:
+                tracemalloc.stop()
+                self._tracemalloc_propio = False
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            "memoria": self.memoria,
+            "mediciones": [m.como_dict() for m in self.mediciones],
+        }
+
+    def a_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.como_dict(), ensure_ascii=False, indent=indent)
+
+    def filas(self) -> List[Dict[str, Any]]:
+        """
+        Mediciones aplanadas en orden, con la etapa sangrada según su nivel.
+        """
+        filas: List[Dict[str, Any]] = []
+
+        def recorrer(mediciones: List[Medicion], nivel: int) -> None:
+            for m in mediciones:
+                filas.append({
+                    "etapa": "    " * nivel + m.nombre,
+                    "ms": round(m.segundos * 1000, 2),
+                    "memoria_pico_kb": None if m.memoria_pico_kb is None else round(m.memoria_pico_kb, 1),
+                    "datos": ", ".join(f"{k}={v}" for k, v in m.datos.items()),
+                })
+                recorrer(m.hijos, nivel + 1)
+
+        recorrer(self.mediciones, 0)
+        return filas
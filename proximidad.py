@@ -0,0 +1,106 @@
+# proximidad.py
+"""
+Índice posicional de apariciones: para cada clave (una etiqueta de párrafo,
+un grupo de patrones...), sus posiciones en orden creciente. Con búsqueda
+binaria (bisect) sobre esas listas:
+
+- pares_cercanos: los k pares más próximos entre dos claves, en
+  O((n + k) log n), sin recorrer el producto cruzado;
+- contar_cercanos: cuántas apariciones de una clave tienen alguna de la otra
+  a una distancia acotada.
+
+Lo usan las reglas de pares de `incongruencias` (posición = número de
+párrafo) y la ventana de contradicción de C7 en `evaluador` (posición =
+inicio de la coincidencia en el texto normalizado).
+"""
+
+from bisect import bisect_left, insort
+from heapq import heapify, heappop, heappush
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def pares_cercanos(
+    izquierda: Sequence[int], derecha: Sequence[int], k: int, distintos: bool = False
+) -> List[Tuple[int, int]]:
+    """
+    Índices (i, j) de los k pares con menor |izquierda[i] - derecha[j]|, de
+    más cercano a más lejano; a igual distancia, primero el que aparece antes.
+    Ambas secuencias deben estar ordenadas. Con `distintos` se omiten los
+    pares en la misma posición.
+
+    Cada posición de la izquierda aporta a un montículo sus dos vecinos en la
+    derecha (bisect); al sacar un par se agrega el siguiente vecino en esa
+    dirección.
+    """
+    candidatos = []
+    for i, x in enumerate(izquierda):
+        j = bisect_left(derecha, x)
+        if j > 0:
+            y = derecha[j - 1]
+            candidatos.append((x - y, y, i, j - 1, -1))
+        if j < len(derecha):
+            y = derecha[j]
+            candidatos.append((y - x, x, i, j, 1))
+    heapify(candidatos)
+
+    pares: List[Tuple[int, int]] = []
+    while candidatos and len(pares) < k:
+        distancia, _, i, j, paso = heappop(candidatos)
+        if not (distintos and distancia == 0):
+            pares.append((i, j))
+        j += paso
+        if 0 <= j < len(derecha):
+            x, y = izquierda[i], derecha[j]
+            heappush(candidatos, (abs(x - y), min(x, y), i, j, paso))
+    return pares
+
+
+def contar_cercanos(izquierda: Sequence[int], derecha: Sequence[int], ventana: int) -> int:
+    """
+    Cuántas posiciones de `izquierda` tienen alguna de `derecha` a una
+    distancia de a lo sumo `ventana` (ambas ordenadas).
+    """
+    total = 0
+    for x in izquierda:
+        j = bisect_left(derecha, x - ventana)
+        if j < len(derecha) and derecha[j] <= x + ventana:
+            total += 1
+    return total
+
+
+class IndicePosicional:
+    """
+    Posiciones ordenadas por clave. Se alimentan con `agregar` (en orden, o
+    no: se insertan en su lugar) o, a pedido, con la función `cargar`, que
+    recibe la clave y devuelve sus posiciones ya ordenadas.
+    """
+
+    def __init__(self, cargar: Optional[Callable[[str], Sequence[int]]] = None):
+        self._posiciones: Dict[str, List[int]] = {}
+        self._cargar = cargar
+
+    def agregar(self, clave: str, posicion: int) -> None:
+        lista = self._posiciones.setdefault(clave, [])
+        if not lista or posicion >= lista[-1]:
+            lista.append(posicion)
+        else:
+            insort(lista, posicion)
+
+    def posiciones(self, clave: str) -> List[int]:
+        if clave not in self._posiciones:
+            if self._cargar is None:
+                return []
+            self._posiciones[clave] = list(self._cargar(clave))
+        return self._posiciones[clave]
+
+    def pares_cercanos(self, a: str, b: str, k: int, distintos: bool = False) -> List[Tuple[int, int]]:
+        """
+        pares_cercanos entre las posiciones de `a` y las de `b`.
+        """
+        return pares_cercanos(self.posiciones(a), self.posiciones(b), k, distintos)
+
+    def contar_cercanos(self, a: str, b: str, ventana: int) -> int:
+        """
+        contar_cercanos entre las posiciones de `a` y las de `b`.
+        """
+        return contar_cercanos(self.posiciones(a), self.posiciones(b), ventana)
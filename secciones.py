@@ -0,0 +1,172 @@
+# secciones.py
+"""
+Secciones de una sentencia, para acotar el análisis a la parte que razona.
+
+Buena parte de una sentencia larga es historia procesal, la transcripción de
+la acusación o de las declaraciones; pasar por ahí los criterios C1–C12 y las
+REGLAS 1–9 cuesta tiempo y suma falsos positivos. detectar_secciones asigna a
+cada párrafo una de SECCIONES a partir de los encabezados que la abren:
+
+- antecedentes: "VISTOS", "ANTECEDENTES", "HECHOS IMPUTADOS", "ACUSACIÓN
+  FISCAL", "ACTIVIDAD PROBATORIA", "FUNDAMENTOS DEL RECURSO"... (no los
+  títulos de cada declaración, que también aparecen dentro de la valoración);
+- fundamentos: "CONSIDERANDO", "FUNDAMENTOS DE DERECHO", "PARTE
+  CONSIDERATIVA", "JUICIO DE TIPICIDAD", "DETERMINACIÓN DE LA PENA"...
+- valoracion: "VALORACIÓN DE LA PRUEBA", "ANÁLISIS PROBATORIO", "PRUEBA
+  INDICIARIA", "HECHOS PROBADOS"...
+- resolutiva: "FALLO", "PARTE RESOLUTIVA", "SE RESUELVE", "Por estos
+  fundamentos"...
+
+Un párrafo abre sección si, tras su marcador ("II.", "3.1.-", "PRIMERO.-"),
+empieza con uno de esos encabezados y además es corto (un título) o el
+encabezado está en mayúsculas ("CONSIDERANDO: Primero.- ..."); las fórmulas
+que abren la parte resolutiva valen en cualquier párrafo. Cada párrafo
+pertenece a la última sección abierta; los anteriores al primer encabezado
+quedan en "encabezado".
+
+evaluar_todo y analizar_incongruencias reciben `secciones=` (p. ej.
+SECCIONES_RAZONAMIENTO) y analizan solo esos párrafos, con su numeración
+original (ver documento.DocumentoAnalizado.acotar).
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from canonico import canonizar, canonizar_patron, plegar_tildes
+from segmentador import ORDINALES
+
+SECCIONES = ("encabezado", "antecedentes", "fundamentos", "valoracion", "resolutiva")
+
+NOMBRES_SECCIONES = {
+    "encabezado": "Encabezado",
+    "antecedentes": "Antecedentes",
+    "fundamentos": "Fundamentos / considerandos",
+    "valoracion": "Valoración probatoria",
+    "resolutiva": "Parte resolutiva",
+}
+
+# Ámbito sugerido: la parte de la sentencia donde el juez razona.
+SECCIONES_RAZONAMIENTO = ("fundamentos", "valoracion")
+
+# Largo máximo (caracteres) de un párrafo que se toma como título.
+_MAXIMO_TITULO = 120
+
+_ORDINAL = "|".join(canonizar_patron(o, tildes=False) for o in ORDINALES)
+
+# Marcadores y artículos que pueden preceder al encabezado (texto canónico sin
+# tildes, ver canonico.plegar_tildes).
+_PREFIJO = (
+    r"(?:(?:\d{1,3}(?:\.\d{1,3})*|[ivxlc]{1,7}|[a-z])\s?(?:\.-|[.)°º:\-–])\s*"
+    rf"|(?:{_ORDINAL})(?:\s+(?:{_ORDINAL}))?\s*(?:\.-|[.:\-–])\s*)*"
+    r"(?:(?:de|sobre)\s+(?:la|el|los|las)\s+|del\s+)?"
+)
+
+# Encabezados por sección, en el orden en que se prueban: las fórmulas
+# resolutivas y "fundamentos del recurso" (antecedentes) antes que el
+# "fundamentos" genérico.
+_ENCABEZADOS: Tuple[Tuple[str, str], ...] = (
+    ("resolutiva",
+     r"fallo|fallamos|falla|parte\s+resolutiva|decision|se\s+resuelve|resuelve|resolvemos"
+     r"|por\s+(?:estos|tales|dichos|los|las)\s+(?:fundamentos|consideraciones|razones)"),
+    ("valoracion",
+     r"valoracion(?:\s+(?:de\s+(?:la|las|los)\s+(?:pruebas?|medios)|probatoria|conjunta|individual))?"
+     r"|analisis\s+(?:probatorio|de\s+(?:la|las)\s+pruebas?|de\s+los\s+medios)"
+     r"|apreciacion\s+(?:de\s+la\s+)?prueba|prueba\s+indiciaria|hechos\s+probados"
+     r"|juicio\s+(?:de\s+)?hecho"),
+    ("antecedentes",
+     r"vistos|antecedentes|resultandos?|hechos\s+imputados|imputacion(?:\s+fiscal)?"
+     r"|enunciacion\s+de\s+los\s+hechos|acusacion(?:\s+fiscal)?|pretensi(?:on|ones)"
+     r"|itinerario|desarrollo\s+del\s+(?:proceso|juicio|debate)|tramite"
+     r"|actuaci(?:on|ones)\s+(?:probatoria|procesal)|actividad\s+probatoria|alegatos|agravios"
+     r"|(?:fundamentos|argumentos)\s+(?:del\s+recurso|de\s+la\s+(?:apelacion|defensa))"),
+    ("fundamentos",
+     r"considerandos?|fundamentos?(?:\s+(?:de\s+derecho|juridicos?))?|parte\s+considerativa"
+     r"|motivacion|fundamentacion|razonamiento|analisis(?:\s+(?:del\s+caso|juridico|de\s+fondo))?"
+     r"|marco\s+(?:normativo|legal|juridico|teorico)|calificacion\s+juridica"
+     r"|juicio\s+de\s+(?:tipicidad|subsuncion)|tipicidad"
+     r"|(?:determinacion|individualizacion)\s+(?:judicial\s+)?de\s+la\s+pena|reparacion\s+civil"),
+)
+
+_ENCABEZADO = re.compile(
+    _PREFIJO + "(?:" + "|".join(f"(?P<{s}>{p})" for s, p in _ENCABEZADOS) + r")\b"
+)
+
+# Solo se mira el comienzo de cada párrafo.
+_VENTANA = 200
+
+
+def normalizar_secciones(secciones: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Secciones pedidas, sin repetir y en el orden de SECCIONES.
+    """
+    pedidas = set(secciones)
+    desconocidas = pedidas - set(SECCIONES)
+    if desconocidas:
+        raise ValueError(f"Secciones desconocidas: {sorted(desconocidas)}")
+    return tuple(s for s in SECCIONES if s in pedidas)
+
+
+def seccion_de_encabezado(parrafo: str) -> Optional[str]:
+    """
+    Sección que abre `parrafo`, o None si no es un encabezado.
+    """
+    inicio = parrafo[:_VENTANA]
+    m = _ENCABEZADO.match(plegar_tildes(canonizar(inicio)))
+    if m is None:
+        return None
+    seccion = m.lastgroup
+    if seccion == "resolutiva" or len(parrafo) <= _MAXIMO_TITULO:
+        return seccion
+    # Párrafo largo: cuenta si el encabezado está escrito en mayúsculas.
+    return seccion if inicio[m.start(seccion):m.end(seccion)].isupper() else None
+
+
+def detectar_secciones(almacen) -> np.ndarray:
+    """
+    Índice en SECCIONES de cada párrafo de un incongruencias.AlmacenParrafos.
+    """
+    codigos = np.zeros(len(almacen), dtype=np.uint8)
+    actual = 0
+    for i in range(len(almacen)):
+        seccion = seccion_de_encabezado(almacen.texto(i))
+        if seccion is not None:
+            actual = SECCIONES.index(seccion)
+        codigos[i] = actual
+    return codigos
+
+
+def tramos_secciones(almacen, codigos: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Tramos consecutivos de una misma sección: {"seccion", "desde", "hasta",
+    "parrafos", "caracteres"}, con números de párrafo como en los hallazgos.
+    """
+    if not len(codigos):
+        return []
+    cortes = np.flatnonzero(np.diff(codigos)) + 1
+    inicios = np.concatenate(([0], cortes))
+    fines = np.concatenate((cortes, [len(codigos)]))
+    largos = almacen.fines - almacen.inicios
+    return [
+        {
+            "seccion": SECCIONES[codigos[a]],
+            "desde": int(almacen.numeros[a]),
+            "hasta": int(almacen.numeros[b - 1]),
+            "parrafos": int(b - a),
+            "caracteres": int(largos[a:b].sum()),
+        }
+        for a, b in zip(inicios.tolist(), fines.tolist())
+    ]
+
+
+def estimar_ahorro(segundos: float, ambito: Dict[str, Any]) -> Optional[float]:
+    """
+    Segundos que se estima ahorró un análisis acotado que tardó `segundos`,
+    suponiendo que el costo del texto completo crece con sus caracteres.
+    None si el análisis no se acotó o no quedó texto.
+    """
+    if not ambito.get("acotado") or not ambito.get("caracteres"):
+        return None
+    proporcion = ambito["caracteres"] / ambito["caracteres_totales"]
+    return segundos * (1 / proporcion - 1)
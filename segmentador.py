@@ -0,0 +1,154 @@
+# segmentador.py
+"""
+Segmentación estructural del texto extraído de un PDF.
+
+pdfplumber entrega cada página como líneas separadas por un solo salto, sin
+líneas en blanco entre párrafos; para `segmentar_parrafos` (que corta en las
+líneas en blanco) una página entera es un único párrafo. estructurar_pagina
+reconstruye los párrafos de una página y los devuelve separados por una línea
+en blanco:
+
+- abre párrafo en los marcadores de la sentencia: considerandos numerados
+  ("1.", "2.1.-", "3)"), ordinales ("PRIMERO.", "Segundo:"), números romanos
+  ("IV.") e incisos ("a)");
+- los encabezados (línea corta en mayúsculas: "VISTOS:", "FUNDAMENTOS DE
+  DERECHO") quedan como párrafo propio;
+- una línea que termina en punto y es bastante más corta que las de la página
+  cierra el párrafo (última línea de un párrafo justificado);
+- las líneas de un mismo párrafo se unen con un espacio, y las palabras
+  cortadas con guion al final de línea se vuelven a unir;
+- ningún párrafo pasa de PARRAFO_MAX_CARACTERES: los más largos se parten en
+  fin de oración (o, si no hay, en un espacio).
+
+Todo es lineal en el largo del texto.
+"""
+
+import re
+from typing import List
+
+from config import PARRAFO_MAX_CARACTERES
+
+# Ordinales de los considerandos (también los usa `secciones`).
+ORDINALES = (
+    "primero", "segundo", "tercero", "cuarto", "quinto", "sexto", "s[eé]ptimo",
+    "setimo", "octavo", "noveno", "d[eé]cimo", "und[eé]cimo", "duod[eé]cimo",
+    "vig[eé]simo",
+)
+_MAYUSCULAS = "|".join(o.upper() for o in ORDINALES)
+_CAPITALES = "|".join(o[0].upper() + o[1:] for o in ORDINALES)
+_MINUSCULAS_ORD = "|".join(ORDINALES)
+
+# Inicio de línea que abre un párrafo.
+_MARCADOR = re.compile(
+    r"(?:"
+    r"\d{1,3}(?:\.\d{1,3})*\s?(?:\.-|\.|\)|°|º|-|–)\s"               # 1.  2.1.-  3)  4°
+    rf"|(?:{_MAYUSCULAS})(?:\s+(?:{_MAYUSCULAS}))?\s*(?:\.-|[.:\-–])"   # PRIMERO.-
+    rf"|(?:{_CAPITALES})(?:\s+(?:{_MINUSCULAS_ORD}))?\s*(?:\.-|[.:\-–])"  # Décimo primero:
+    r"|[IVXLC]{1,7}\s?(?:\.-|\.|\)|-|–)\s"                            # IV.  XII.-
+    r"|[a-z]\)\s"                                                     # a)
+    r")"
+)
+
+# Encabezado: línea corta sin minúsculas (letras, espacios y puntuación simple).
+_ENCABEZADO = re.compile(r"[^\W\d_a-záéíóúüñ][^a-záéíóúüñ]{2,79}")
+_MINUSCULAS = re.compile(r"[a-záéíóúüñ]")
+
+# Fin de oración dentro de un párrafo largo: punto (o ; :) seguido de espacio.
+_FIN_ORACION = re.compile(r"[.;:!?][»”\")]?\s")
+
+# Proporción del largo típico de línea por debajo de la cual una línea que
+# termina en punto se considera la última de su párrafo.
+_LINEA_CORTA = 0.7
+
+
+def _es_encabezado(linea: str) -> bool:
+    return bool(_ENCABEZADO.fullmatch(linea)) and not _MINUSCULAS.search(linea)
+
+
+def _ancho_tipico(lineas: List[str]) -> int:
+    largos = sorted(len(l) for l in lineas if l)
+    if not largos:
+        return 0
+    return largos[min(len(largos) - 1, int(len(largos) * 0.8))]
+
+
+def _unir(actual: List[str], linea: str) -> None:
+    """
+    Agrega `linea` al párrafo en curso, reuniendo la palabra si la línea
+    anterior terminaba con un guion de corte.
+    """
+    previa = actual[-1]
+    if (
+        len(previa) > 1
+        and previa.endswith("-")
+        and previa[-2].isalpha()
+        and linea[:1].islower()
+    ):
+        actual[-1] = previa[:-1] + linea
+    else:
+        actual.append(linea)
+
+
+def partir_largo(parrafo: str, maximo: int = PARRAFO_MAX_CARACTERES) -> List[str]:
+    """
+    Parte un párrafo en trozos de a lo sumo `maximo` caracteres, cortando en
+    el último fin de oración de cada tramo (o en el último espacio).
+    """
+    trozos: List[str] = []
+    # Se avanza un desplazamiento en lugar de recortar el párrafo: cada
+    # recorte copiaría el resto del texto.
+    inicio = 0
+    while len(parrafo) - inicio > maximo:
+        fin = inicio + maximo + 1
+        corte = -1
+        for m in _FIN_ORACION.finditer(parrafo, inicio + maximo // 2, fin):
+            corte = m.end()
+        if corte < 0:
+            corte = parrafo.rfind(" ", inicio + maximo // 2, fin) + 1
+        if corte <= inicio:
+            corte = inicio + maximo
+        trozos.append(parrafo[inicio:corte].rstrip())
+        inicio = corte
+        while inicio < len(parrafo) and parrafo[inicio].isspace():
+            inicio += 1
+    if inicio < len(parrafo):
+        trozos.append(parrafo[inicio:])
+    return trozos
+
+
+def estructurar_pagina(texto: str, maximo: int = PARRAFO_MAX_CARACTERES) -> str:
+    """
+    Texto de una página de PDF con sus párrafos separados por una línea en
+    blanco (ver el docstring del módulo).
+    """
+    if not texto:
+        return ""
+    lineas = [l.strip() for l in texto.replace("\r\n", "\n").split("\n")]
+    corta = _ancho_tipico(lineas) * _LINEA_CORTA
+
+    parrafos: List[str] = []
+    actual: List[str] = []
+
+    def cerrar() -> None:
+        if actual:
+            parrafos.extend(partir_largo(" ".join(actual), maximo))
+            actual.clear()
+
+    for linea in lineas:
+        if not linea:
+            cerrar()
+            continue
+        if _es_encabezado(linea):
+            cerrar()
+            parrafos.append(linea)
+            continue
+        if _MARCADOR.match(linea):
+            cerrar()
+        if actual:
+            _unir(actual, linea)
+        else:
+            actual.append(linea)
+        if linea[-1] in ".:" and len(linea) < corta:
+            cerrar()
+    cerrar()
+    return "\n\n".join(parrafos)
@@ -0,0 +1,434 @@
+# servicio.py
+"""
+Servicio HTTP local de análisis, para que otras herramientas obtengan el ICI
+sin pasar por Streamlit. Usa solo la biblioteca estándar y corre entero en la
+máquina, así que puede someterse a pruebas de carga en un solo equipo.
+
+    python -m servicio [--host 127.0.0.1] [--puerto 8765] [--procesos 4]
+
+    POST /analizar   cuerpo: el PDF, el Word o el texto de la sentencia
+                     -> JSON de evaluar_todo + analizar_incongruencias (el
+                        mismo formato que los registros de lote.py)
+    POST /informe    mismo cuerpo -> informe Word (.docx)
+    GET  /salud      estado del pool y de la cola
+    GET  /metricas   contadores y latencias
+
+El formato sale del parámetro `nombre` (?nombre=sentencia.pdf) o, si no se
+indica, del Content-Type (application/pdf, el de .docx, text/plain).
+`?secciones=fundamentos,valoracion` acota el análisis (ver secciones.py).
+
+Cada solicitud se resuelve en un pool de procesos acotado; el hilo HTTP solo
+espera. Se admiten a la vez hasta COLA_MAX_SERVICIO trabajos (en curso más
+en espera) y los demás reciben 503 con Retry-After. Una respuesta que tarda
+más de TIEMPO_MAX_SERVICIO_SEGUNDOS devuelve 504; el trabajo sigue ocupando
+su lugar en la cola hasta que su proceso termina, de modo que la admisión
+refleja la carga real del pool.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as TiempoAgotado
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from config import (
+    COLA_MAX_SERVICIO,
+    PROCESOS_SERVICIO,
+    TAMANO_MAX_SERVICIO_BYTES,
+    TIEMPO_MAX_SERVICIO_SEGUNDOS,
+)
+
+TIPO_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+TIPOS_CONTENIDO = {
+    "application/pdf": "pdf",
+    TIPO_DOCX: "word",
+    "application/msword": "word",
+    "text/plain": "texto",
+}
+
+# Latencias que se conservan para los percentiles de /metricas.
+_MUESTRAS_LATENCIA = 1000
+
+
+class ColaLlena(Exception):
+    """
+    No se admiten más trabajos: ya hay COLA_MAX_SERVICIO en curso o en espera.
+    """
+
+
+class DocumentoIlegible(ValueError):
+    """
+    El documento enviado no se pudo extraer (archivo dañado o con otro
+    formato): error del cliente (400). Cualquier otro error del trabajo es
+    del servicio (500).
+    """
+
+
+# -------------------
+# Trabajo (en los procesos del pool)
+# -------------------
+
+def _precargar() -> int:
+    # Importa los módulos de análisis (compila los patrones) en cada proceso.
+    import evaluador  # noqa: F401
+    import incongruencias  # noqa: F401
+
+    return os.getpid()
+
+
+def analizar_contenido(
+    datos: bytes, tipo: str, secciones: Optional[Tuple[str, ...]] = None, informe: bool = False
+):
+    """
+    Extrae (si es PDF o Word) y analiza un documento. Devuelve el dict de
+    lote.analizar_texto o, con `informe`, los bytes del informe Word.
+    """
+    if tipo == "texto":
+        texto = datos.decode("utf-8", errors="replace")
+    else:
+        from extractores import extraer_texto
+
+        # Un solo proceso por PDF: el paralelismo ya lo da el pool del servicio.
+        nombre = "documento.pdf" if tipo == "pdf" else "documento.docx"
+        try:
+            texto = extraer_texto(BytesIO(datos), nombre, procesos=1)
+        except Exception as e:
+            raise DocumentoIlegible(f"No se pudo leer el documento: {type(e).__name__}: {e}") from e
+
+    if not informe:
+        from lote import analizar_texto
+
+        return analizar_texto(texto, secciones)
+
+    from documento import DocumentoAnalizado
+    from informe_word import generar_informe
+
+    documento = DocumentoAnalizado(texto)
+    if secciones is not None:
+        documento = documento.acotar(secciones)
+    return generar_informe(documento)
+
+
+# -------------------
+# Pool, admisión y métricas
+# -------------------
+
+class ServicioAnalisis:
+    """
+    Pool de procesos con admisión acotada y métricas, independiente de HTTP:
+    `ejecutar` envía un trabajo y espera su resultado.
+    """
+
+    def __init__(
+        self,
+        procesos: Optional[int] = None,
+        cola_max: int = COLA_MAX_SERVICIO,
+        tiempo_max: float = TIEMPO_MAX_SERVICIO_SEGUNDOS,
+    ):
+        if procesos is None:
+            procesos = PROCESOS_SERVICIO
+        if procesos <= 0:
+            procesos = os.cpu_count() or 1
+        self.procesos = procesos
+        self.cola_max = cola_max
+        self.tiempo_max = tiempo_max
+        self.inicio = time.time()
+
+        self._cerrojo = threading.Lock()
+        self._admitidos = 0
+        self._contadores = {
+            "solicitudes": 0,
+            "completadas": 0,
+            "errores": 0,
+            "rechazadas_cola": 0,
+            "rechazadas_tamano": 0,
+            "vencidas": 0,
+            "pools_recreados": 0,
+        }
+        self._latencias: deque = deque(maxlen=_MUESTRAS_LATENCIA)
+        self._pool = self._crear_pool()
+
+    def _crear_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(
+            max_workers=self.procesos, mp_context=multiprocessing.get_context("spawn")
+        )
+        # Arranca los procesos y carga los módulos antes de la primera solicitud.
+        for _ in range(self.procesos):
+            pool.submit(_precargar)
+        return pool
+
+    def contar(self, contador: str) -> None:
+        with self._cerrojo:
+            self._contadores[contador] += 1
+
+    def _liberar(self, _futuro: Future) -> None:
+        with self._cerrojo:
+            self._admitidos -= 1
+
+    def _enviar(self, *argumentos) -> Tuple[Future, ProcessPoolExecutor]:
+        with self._cerrojo:
+            if self._admitidos >= self.cola_max:
+                self._contadores["rechazadas_cola"] += 1
+                raise ColaLlena()
+            self._admitidos += 1
+        try:
+            pool = self._pool
+            try:
+                futuro = pool.submit(analizar_contenido, *argumentos)
+            except BrokenProcessPool:
+                self._recrear_pool(pool)
+                pool = self._pool
+                futuro = pool.submit(analizar_contenido, *argumentos)
+        except BaseException:
+            self._liberar(None)
+            raise
+        futuro.add_done_callback(self._liberar)
+        return futuro, pool
+
+    def _recrear_pool(self, roto: ProcessPoolExecutor) -> None:
+        # Un proceso murió (p. ej. por falta de memoria): el pool queda
+        # inservible y se reemplaza (una sola vez, aunque lo noten varios
+        # hilos); los trabajos que tenía fallan.
+        with self._cerrojo:
+            if self._pool is not roto:
+                return
+            self._pool = self._crear_pool()
+            self._contadores["pools_recreados"] += 1
+        roto.shutdown(wait=False, cancel_futures=True)
+
+    def ejecutar(
+        self, datos: bytes, tipo: str, secciones: Optional[Tuple[str, ...]] = None, informe: bool = False
+    ):
+        """
+        Resultado de analizar_contenido. Lanza ColaLlena si no hay lugar,
+        TiempoAgotado si no termina a tiempo, o la excepción del trabajo.
+        """
+        t0 = time.perf_counter()
+        futuro, pool = self._enviar(datos, tipo, secciones, informe)
+        try:
+            resultado = futuro.result(timeout=self.tiempo_max)
+        except TiempoAgotado:
+            futuro.cancel()
+            self.contar("vencidas")
+            raise
+        except BrokenProcessPool:
+            self._recrear_pool(pool)
+            self.contar("errores")
+            raise
+        except Exception:
+            self.contar("errores")
+            raise
+        with self._cerrojo:
+            self._contadores["completadas"] += 1
+            self._latencias.append(time.perf_counter() - t0)
+        return resultado
+
+    def salud(self) -> Dict[str, Any]:
+        with self._cerrojo:
+            admitidos = self._admitidos
+        return {
+            "estado": "saturado" if admitidos >= self.cola_max else "ok",
+            "procesos": self.procesos,
+            "trabajos_admitidos": admitidos,
+            "cola_max": self.cola_max,
+        }
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._cerrojo:
+            contadores = dict(self._contadores)
+            latencias = sorted(self._latencias)
+            admitidos = self._admitidos
+
+        def percentil(q: float) -> Optional[float]:
+            if not latencias:
+                return None
+            return round(latencias[min(len(latencias) - 1, int(q * len(latencias)))] * 1000, 1)
+
+        return {
+            **contadores,
+            "trabajos_admitidos": admitidos,
+            "procesos": self.procesos,
+            "cola_max": self.cola_max,
+            "tiempo_max_segundos": self.tiempo_max,
+            "segundos_activo": round(time.time() - self.inicio, 1),
+            "latencia_ms": {
+                "muestras": len(latencias),
+                "p50": percentil(0.5),
+                "p95": percentil(0.95),
+                "max": round(latencias[-1] * 1000, 1) if latencias else None,
+            },
+        }
+
+    def cerrar(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# -------------------
+# HTTP
+# -------------------
+
+def _tipo_solicitud(nombre: Optional[str], content_type: str) -> Optional[str]:
+    if nombre:
+        minusculas = nombre.lower()
+        if minusculas.endswith(".pdf"):
+            return "pdf"
+        if minusculas.endswith((".docx", ".doc")):
+            return "word"
+        if minusculas.endswith(".txt"):
+            return "texto"
+        return None
+    return TIPOS_CONTENIDO.get(content_type.split(";")[0].strip().lower())
+
+
+class ManejadorAnalisis(BaseHTTPRequestHandler):
+    """
+    Traduce las rutas HTTP a ServicioAnalisis (self.server.servicio).
+    """
+
+    server_version = "ICI-V5"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def servicio(self) -> ServicioAnalisis:
+        return self.server.servicio
+
+    def log_message(self, formato: str, *args) -> None:
+        if self.server.registrar:
+            super().log_message(formato, *args)
+
+    def _responder(
+        self, codigo: int, cuerpo: bytes, tipo: str, cabeceras: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.send_response(codigo)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _json(self, codigo: int, datos: Any, cabeceras: Optional[Dict[str, str]] = None) -> None:
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self._responder(codigo, cuerpo, "application/json; charset=utf-8", cabeceras)
+
+    def _error(self, codigo: int, mensaje: str, cabeceras: Optional[Dict[str, str]] = None) -> None:
+        self._json(codigo, {"error": mensaje}, cabeceras)
+
+    def do_GET(self) -> None:
+        ruta = urlsplit(self.path).path
+        if ruta == "/salud":
+            self._json(200, self.servicio.salud())
+        elif ruta == "/metricas":
+            self._json(200, self.servicio.metricas())
+        else:
+            self._error(404, f"Ruta desconocida: {ruta}")
+
+    def do_POST(self) -> None:
+        partes = urlsplit(self.path)
+        if partes.path not in ("/analizar", "/informe"):
+            self._error(404, f"Ruta desconocida: {partes.path}")
+            return
+        servicio = self.servicio
+        servicio.contar("solicitudes")
+
+        largo = self.headers.get("Content-Length")
+        if largo is None or not largo.isdigit():
+            self.close_connection = True
+            self._error(411, "Falta Content-Length")
+            return
+        if int(largo) > TAMANO_MAX_SERVICIO_BYTES:
+            servicio.contar("rechazadas_tamano")
+            self.close_connection = True
+            self._error(413, f"El documento supera {TAMANO_MAX_SERVICIO_BYTES} bytes")
+            return
+        datos = self.rfile.read(int(largo))
+
+        parametros = parse_qs(partes.query)
+        nombre = parametros.get("nombre", [None])[0]
+        tipo = _tipo_solicitud(nombre, self.headers.get("Content-Type", ""))
+        if tipo is None:
+            self._error(415, "Formato no reconocido: enviar PDF, Word (.docx) o texto plano")
+            return
+        secciones = None
+        if "secciones" in parametros:
+            from secciones import normalizar_secciones
+
+            pedidas = [s for v in parametros["secciones"] for s in v.split(",") if s]
+            try:
+                secciones = normalizar_secciones(pedidas)
+            except ValueError as e:
+                self._error(400, str(e))
+                return
+
+        informe = partes.path == "/informe"
+        try:
+            resultado = servicio.ejecutar(datos, tipo, secciones, informe)
+        except ColaLlena:
+            self._error(503, "Servicio saturado; reintentar más tarde", {"Retry-After": "5"})
+        except TiempoAgotado:
+            self._error(504, f"El análisis superó {servicio.tiempo_max} s")
+        except DocumentoIlegible as e:
+            self._error(400, str(e))
+        except Exception as e:
+            self._error(500, f"{type(e).__name__}: {e}")
+        else:
+            if informe:
+                self._responder(
+                    200, resultado, TIPO_DOCX,
+                    {"Content-Disposition": 'attachment; filename="Informe_ICI_V5.docx"'},
+                )
+            else:
+                self._json(200, resultado)
+
+
+class ServidorAnalisis(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, direccion: Tuple[str, int], servicio: ServicioAnalisis, registrar: bool = True):
+        super().__init__(direccion, ManejadorAnalisis)
+        self.servicio = servicio
+        self.registrar = registrar
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="procesos del pool (por defecto config.PROCESOS_SERVICIO; 0 = todos los núcleos)")
+    parser.add_argument("--cola-max", type=int, default=COLA_MAX_SERVICIO,
+                        help="trabajos admitidos a la vez (en curso + en espera)")
+    parser.add_argument("--tiempo-max", type=float, default=TIEMPO_MAX_SERVICIO_SEGUNDOS,
+                        help="segundos de espera antes de responder 504")
+    parser.add_argument("--silencioso", action="store_true", help="no registrar cada solicitud")
+    args = parser.parse_args(argv)
+
+    servicio = ServicioAnalisis(args.procesos, args.cola_max, args.tiempo_max)
+    servidor = ServidorAnalisis((args.host, args.puerto), servicio, registrar=not args.silencioso)
+    print(
+        f"Servicio ICI en http://{args.host}:{servidor.server_port} "
+        f"({servicio.procesos} procesos, cola {servicio.cola_max})"
+    )
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servicio.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
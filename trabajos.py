@@ -0,0 +1,686 @@
+# trabajos.py
+"""
+Análisis en segundo plano para la app de Streamlit.
+
+Un TrabajoAnalisis recorre las etapas de ETAPAS (extracción, criterios
+C1–C12, reglas de incongruencia e informe Word) y deja a la vista, en todo
+momento, la etapa en curso, el avance de cada una (páginas extraídas,
+criterios puntuados, reglas evaluadas) y los resultados parciales: los
+criterios se pueden mostrar en cuanto se puntúan, mientras siguen las reglas.
+Mientras se extrae un PDF, `provisional` lleva además el ICI y los hallazgos
+por párrafo de las páginas ya leídas (ver _Provisional).
+
+Se ejecuta de dos maneras:
+
+- trabajo.iniciar(): en un hilo del propio proceso;
+- planificador.encolar(trabajo, usuario): en el pool de procesos de un
+  PlanificadorTrabajos, compartido por todas las sesiones de la app (ver
+  app.py, que lo crea una sola vez con st.cache_resource). El trabajo espera
+  en la cola de su usuario; cada vez que se libera un proceso pasa el
+  primero en espera del usuario con menos trabajos en curso (a igualdad, el
+  que lleva más tiempo esperando), de modo que un usuario con varios
+  documentos no deja sin turno a los demás. posicion() dice cuántos trabajos
+  van por delante. El avance y los resultados vuelven por una cola.
+
+La app guarda el trabajo en st.session_state y, mientras está activo, se
+vuelve a ejecutar cada INTERVALO_SONDEO_SEGUNDOS solo para leer su estado;
+un trabajo terminado se conserva, de modo que los reruns no lo repiten.
+
+cancelar() quita el trabajo de la cola o lo detiene en la siguiente página,
+el siguiente paso del plan de reglas o la siguiente etapa (evaluar_todo y
+generar_informe no se interrumpen a la mitad).
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from functools import partial
+from io import BytesIO
+from typing import Any, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from cache import huella
+from config import (
+    INTERVALO_PROVISIONAL_SEGUNDOS,
+    PROCESOS_APP,
+    TAMANO_MAX_TRABAJO_BYTES,
+    TRABAJOS_MAX_POR_USUARIO,
+)
+from perfil import Perfil
+from secciones import normalizar_secciones
+
+ETAPAS = ("extraccion", "criterios", "reglas", "informe")
+
+NOMBRES_ETAPAS = {
+    "extraccion": "Extracción de texto",
+    "criterios": "Criterios C1–C12",
+    "reglas": "Reglas de incongruencia",
+    "informe": "Informe Word",
+}
+
+# Qué cuenta el avance de cada etapa.
+_UNIDADES = {
+    "extraccion": "páginas",
+    "criterios": "criterios",
+    "reglas": "reglas",
+    "informe": "informes",
+}
+
+# Estados de un trabajo; los dos primeros son "activos".
+ESTADOS = ("en_espera", "en_curso", "terminado", "cancelado", "error")
+
+# En los procesos del pool, segundos mínimos entre dos avisos de avance de
+# una misma etapa (y entre dos consultas de cancelación).
+_INTERVALO_AVISOS = 0.1
+
+
+class Cancelado(Exception):
+    """
+    El trabajo se canceló mientras corría.
+    """
+
+
+class TrabajoRechazado(Exception):
+    """
+    El planificador no admite el trabajo: el documento supera
+    TAMANO_MAX_TRABAJO_BYTES o el usuario ya tiene TRABAJOS_MAX_POR_USUARIO
+    en curso o en espera.
+    """
+
+
+def clave_trabajo(
+    datos: Union[str, bytes],
+    nombre: Optional[str] = None,
+    secciones: Optional[Iterable[str]] = None,
+    diagnostico: bool = False,
+) -> str:
+    """
+    Identifica un pedido de análisis: el mismo contenido con las mismas
+    opciones da la misma clave, y la app reutiliza el trabajo guardado.
+    """
+    ambito = "*" if secciones is None else ",".join(normalizar_secciones(secciones))
+    return f"{huella(datos)}:{nombre or ''}:{ambito}:{int(diagnostico)}"
+
+
+# -------------------
+# Etapas (en el hilo o en el proceso que ejecuta el trabajo)
+# -------------------
+
+Informar = Callable[[str, int, int], None]
+Publicar = Callable[[str, Any], None]
+
+
+class _Etapas:
+    """
+    Recuerda el avance de cada etapa para poder darla por completa, y lo
+    comunica con `informar` (que puede lanzar Cancelado).
+    """
+
+    def __init__(self, informar: Informar):
+        self.informar = informar
+        self._totales: Dict[str, int] = {}
+
+    def __call__(self, etapa: str, hechos: int, total: int) -> None:
+        self._totales[etapa] = total
+        self.informar(etapa, hechos, total)
+
+    def entrar(self, etapa: str) -> None:
+        self(etapa, 0, 0)
+
+    def completar(self, etapa: str, total: int = 1) -> None:
+        total = self._totales.get(etapa) or total
+        self(etapa, total, total)
+
+
+class _Provisional:
+    """
+    Análisis progresivo de las páginas que entrega extractores.leer_pdf:
+    cada entrega alimenta una evaluación C1–C12 y un análisis de reglas
+    incrementales y, como mucho cada INTERVALO_PROVISIONAL_SEGUNDOS, se
+    publica `provisional` con el ICI y los hallazgos por párrafo hasta ese
+    punto. Las reglas de pares y globales se resuelven en la etapa de reglas,
+    sobre el documento completo, que reutiliza del memo los hallazgos por
+    párrafo ya calculados aquí.
+    """
+
+    def __init__(self, publicar: Publicar):
+        from evaluador import EvaluacionIncremental
+        from incongruencias import AnalisisIncremental
+
+        self.publicar = publicar
+        self.evaluacion = EvaluacionIncremental()
+        self.analisis = AnalisisIncremental()
+        self.paginas = 0
+        self._ultima: Optional[float] = None
+
+    def __call__(self, textos: List[str]) -> None:
+        for texto in textos:
+            self.evaluacion.agregar(texto)
+            self.analisis.agregar(texto)
+        self.paginas += len(textos)
+        ahora = time.monotonic()
+        if self._ultima is not None and ahora - self._ultima < INTERVALO_PROVISIONAL_SEGUNDOS:
+            return
+        self._ultima = ahora
+        self.publicar("provisional", {
+            "paginas": self.paginas,
+            "resultados": self.evaluacion.resultado(),
+            "incongruencias": self.analisis.provisional(),
+        })
+
+
+def _correr_etapas(
+    datos: Union[str, bytes],
+    nombre: Optional[str],
+    secciones: Optional[Tuple[str, ...]],
+    perfil: Optional[Perfil],
+    informar: Informar,
+    publicar: Publicar,
+    procesos: Optional[int] = None,
+) -> None:
+    """
+    Extrae (si `datos` son bytes) y analiza el documento. El avance sale por
+    `informar` y cada resultado, en cuanto está, por publicar(atributo, valor).
+
+    Los resultados provisionales (ver _Provisional) solo se calculan sobre
+    el texto completo y fuera del diagnóstico, para no alterar sus tiempos.
+    """
+    # Imports diferidos: cargan (y compilan) los patrones fuera del hilo de la app.
+    from documento import DocumentoAnalizado
+    from evaluador import evaluar_todo
+    from incongruencias import analizar_incongruencias
+    from informe_word import generar_informe
+
+    def medir(etapa: str):
+        return perfil.medir(etapa) if perfil is not None else nullcontext()
+
+    etapas = _Etapas(informar)
+    etapas.entrar("extraccion")
+    modos_pdf: List[str] = []
+    if isinstance(datos, str):
+        texto = datos
+    else:
+        from extractores import extraer_texto
+
+        with medir("extraer_texto"):
+            texto = extraer_texto(
+                BytesIO(datos),
+                nombre,
+                procesos=procesos,
+                avance=partial(etapas, "extraccion"),
+                modos=modos_pdf,
+                paginas=_Provisional(publicar) if secciones is None and perfil is None else None,
+            )
+        if modos_pdf:
+            publicar("modos_pdf", modos_pdf)
+    del datos
+    if not texto or not texto.strip():
+        raise ValueError("No se pudo extraer texto del documento.")
+    etapas.completar("extraccion")
+
+    # Un solo documento para las tres etapas: la normalización, la
+    # segmentación y las etiquetas se calculan una vez.
+    documento = DocumentoAnalizado(texto)
+
+    t0 = time.perf_counter()
+    etapas.entrar("criterios")
+    resultados = evaluar_todo(documento, perfil=perfil, secciones=secciones)
+    if secciones is not None:
+        publicar("tramos", documento.tramos)
+    publicar("resultados", resultados)
+    etapas.completar("criterios", len(resultados["criterios"]))
+
+    etapas.entrar("reglas")
+    incong = analizar_incongruencias(
+        documento, resultados, perfil=perfil, secciones=secciones, avance=partial(etapas, "reglas")
+    )
+    publicar("segundos_analisis", time.perf_counter() - t0)
+    publicar("incongruencias", incong)
+    etapas.completar("reglas")
+
+    etapas.entrar("informe")
+    # El informe ubica los criterios en los párrafos analizados.
+    if secciones is not None:
+        documento = documento.acotar(secciones)
+    with medir("generar_informe"):
+        publicar("informe", generar_informe(documento, resultados, incong, modos_pdf))
+    etapas.completar("informe")
+
+
+def _ejecutar_etapas(*argumentos, **opciones) -> Tuple[str, Optional[str], Optional[str], float]:
+    """
+    _correr_etapas atrapando su final: (estado, error, detalle, segundos).
+    """
+    t0 = time.perf_counter()
+    error = detalle = None
+    try:
+        _correr_etapas(*argumentos, **opciones)
+        estado = "terminado"
+    except Cancelado:
+        estado = "cancelado"
+    except Exception as e:
+        error = str(e) if isinstance(e, ValueError) else f"{type(e).__name__}: {e}"
+        detalle = traceback.format_exc()
+        estado = "error"
+    return estado, error, detalle, time.perf_counter() - t0
+
+
+# -------------------
+# Trabajo (en el proceso de la app)
+# -------------------
+
+class TrabajoAnalisis:
+    """
+    Extracción y análisis de una sentencia fuera del hilo de la app.
+
+    - datos: texto de la sentencia, o los bytes de un PDF o Word cuyo formato
+      sale de `nombre`
+    - secciones: ámbito del análisis (ver secciones.py); None = texto completo
+    - diagnostico: mide cada etapa en un perfil.Perfil (queda en `perfil`)
+
+    Los atributos de resultado (provisional, modos_pdf, resultados, tramos,
+    incongruencias, informe) quedan en None hasta que su etapa termina; `error` guarda el mensaje y
+    `detalle` la traza si el trabajo falla.
+    """
+
+    def __init__(
+        self,
+        datos: Union[str, bytes],
+        nombre: Optional[str] = None,
+        secciones: Optional[Iterable[str]] = None,
+        diagnostico: bool = False,
+    ):
+        self.secciones = None if secciones is None else normalizar_secciones(secciones)
+        self.clave = clave_trabajo(datos, nombre, self.secciones, diagnostico)
+        self.nombre = nombre
+        self.diagnostico = diagnostico
+        self.tamano = len(datos.encode("utf-8")) if isinstance(datos, str) else len(datos)
+        self._datos: Optional[Union[str, bytes]] = datos
+
+        self.estado = "en_espera"
+        self.etapa: Optional[str] = None
+        self._avance: Dict[str, Tuple[int, int]] = {etapa: (0, 0) for etapa in ETAPAS}
+        self._cerrojo = threading.Lock()
+        self._cancelar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+        # Los asigna PlanificadorTrabajos.encolar.
+        self.id: Optional[int] = None
+        self.usuario: Optional[str] = None
+        self._planificador: Optional["PlanificadorTrabajos"] = None
+
+        self.provisional: Optional[Dict[str, Any]] = None
+        self.modos_pdf: Optional[List[str]] = None
+        self.resultados: Optional[Dict[str, Any]] = None
+        self.tramos: Optional[List[Dict[str, Any]]] = None
+        self.incongruencias: Optional[List[Dict[str, Any]]] = None
+        self.informe: Optional[bytes] = None
+        self.perfil: Optional[Perfil] = None
+        self.segundos_analisis: Optional[float] = None
+        self.segundos: Optional[float] = None
+        self.error: Optional[str] = None
+        self.detalle: Optional[str] = None
+
+    # -------------------
+    # Control
+    # -------------------
+
+    def iniciar(self) -> "TrabajoAnalisis":
+        """
+        Ejecuta el trabajo en un hilo de este proceso.
+        """
+        if self._hilo is None and self._planificador is None:
+            self._hilo = threading.Thread(target=self._ejecutar, name="trabajo-ici", daemon=True)
+            self._hilo.start()
+        return self
+
+    def cancelar(self) -> None:
+        self._cancelar.set()
+        if self._planificador is not None:
+            self._planificador.cancelar(self)
+
+    def esperar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que el trabajo termine; True si ya no está activo.
+        """
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+        else:
+            limite = None if timeout is None else time.monotonic() + timeout
+            while self.activo and (limite is None or time.monotonic() < limite):
+                time.sleep(0.05)
+        return not self.activo
+
+    @property
+    def activo(self) -> bool:
+        return self.estado in ("en_espera", "en_curso")
+
+    @property
+    def cancelando(self) -> bool:
+        return self._cancelar.is_set() and self.activo
+
+    # -------------------
+    # Avance
+    # -------------------
+
+    def avance(self, etapa: str) -> Tuple[int, int]:
+        """
+        (hechos, total) de una etapa; (0, 0) si aún no empezó o no informa total.
+        """
+        with self._cerrojo:
+            return self._avance[etapa]
+
+    def fraccion(self) -> float:
+        """
+        Avance global entre 0 y 1: cada etapa pesa lo mismo.
+        """
+        with self._cerrojo:
+            total = 0.0
+            for etapa in ETAPAS:
+                hechos, de = self._avance[etapa]
+                if de:
+                    total += hechos / de
+        return min(total / len(ETAPAS), 1.0)
+
+    def resumen(self, etapa: str) -> str:
+        """
+        Línea de estado de una etapa, p. ej. "Extracción de texto: 12/80 páginas".
+        """
+        hechos, total = self.avance(etapa)
+        nombre = NOMBRES_ETAPAS[etapa]
+        if total and hechos >= total:
+            return f"✔ {nombre}: {hechos}/{total} {_UNIDADES[etapa]}"
+        if etapa == self.etapa and self.activo:
+            if total:
+                return f"⏳ {nombre}: {hechos}/{total} {_UNIDADES[etapa]}"
+            return f"⏳ {nombre}…"
+        return f"· {nombre}"
+
+    def _registrar(self, etapa: str, hechos: int, total: int) -> None:
+        with self._cerrojo:
+            self._avance[etapa] = (hechos, total)
+            self.etapa = etapa
+
+    def _informar(self, etapa: str, hechos: int, total: int) -> None:
+        """
+        Registra el avance de `etapa`; es también el punto donde se atiende
+        la cancelación (lanza Cancelado).
+        """
+        self._registrar(etapa, hechos, total)
+        if self._cancelar.is_set():
+            raise Cancelado()
+
+    def _publicar(self, atributo: str, valor: Any) -> None:
+        setattr(self, atributo, valor)
+
+    def _finalizar(
+        self,
+        estado: str,
+        error: Optional[str] = None,
+        detalle: Optional[str] = None,
+        segundos: Optional[float] = None,
+    ) -> None:
+        self._datos = None
+        self.error, self.detalle, self.segundos = error, detalle, segundos
+        self.estado = estado
+
+    def _ejecutar(self) -> None:
+        self.estado = "en_curso"
+        self.perfil = Perfil() if self.diagnostico else None
+        datos, self._datos = self._datos, None
+        self._finalizar(
+            *_ejecutar_etapas(
+                datos, self.nombre, self.secciones, self.perfil, self._informar, self._publicar
+            )
+        )
+
+
+# -------------------
+# Pool compartido (en los procesos del pool)
+# -------------------
+
+_CANAL = None
+_CANCELADOS = None
+
+
+def _iniciar_proceso(canal, cancelados) -> None:
+    global _CANAL, _CANCELADOS
+    _CANAL, _CANCELADOS = canal, cancelados
+    # Importa los módulos de análisis (compila los patrones) al arrancar.
+    import evaluador  # noqa: F401
+    import incongruencias  # noqa: F401
+
+
+def _trabajo_en_proceso(
+    id_trabajo: int,
+    datos: Union[str, bytes],
+    nombre: Optional[str],
+    secciones: Optional[Tuple[str, ...]],
+    diagnostico: bool,
+) -> None:
+    """
+    Ejecuta un trabajo en un proceso del pool; el avance, los resultados y
+    el final se envían por el canal del planificador.
+    """
+    perfil = Perfil() if diagnostico else None
+    ultimo = 0.0
+
+    def informar(etapa: str, hechos: int, total: int) -> None:
+        nonlocal ultimo
+        ahora = time.monotonic()
+        if 0 < hechos < total and ahora - ultimo < _INTERVALO_AVISOS:
+            return
+        ultimo = ahora
+        _CANAL.put(("avance", id_trabajo, etapa, hechos, total))
+        if id_trabajo in _CANCELADOS:
+            raise Cancelado()
+
+    def publicar(atributo: str, valor: Any) -> None:
+        _CANAL.put(("publicar", id_trabajo, atributo, valor))
+
+    # Un solo proceso por PDF: el paralelismo ya lo da el pool.
+    final = _ejecutar_etapas(datos, nombre, secciones, perfil, informar, publicar, procesos=1)
+    if perfil is not None:
+        publicar("perfil", perfil)
+    _CANAL.put(("fin", id_trabajo) + final)
+
+
+def _siguiente(colas: Mapping[str, Sequence[TrabajoAnalisis]], en_curso: Mapping[str, int]) -> str:
+    """
+    Usuario cuyo primer trabajo en espera pasa antes: el que tiene menos en
+    curso y, a igualdad, el que espera desde antes.
+    """
+    return min(
+        (usuario for usuario, cola in colas.items() if cola),
+        key=lambda usuario: (en_curso.get(usuario, 0), colas[usuario][0].id),
+    )
+
+
+class PlanificadorTrabajos:
+    """
+    Pool de procesos compartido con una cola por usuario (reparto equitativo,
+    ver _siguiente) y admisión acotada por tamaño de documento y por usuario.
+    A lo sumo hay `procesos` trabajos en el pool; el resto espera aquí, donde
+    todavía se puede reordenar y cancelar.
+    """
+
+    def __init__(
+        self,
+        procesos: Optional[int] = None,
+        max_por_usuario: int = TRABAJOS_MAX_POR_USUARIO,
+        tamano_max: int = TAMANO_MAX_TRABAJO_BYTES,
+    ):
+        if procesos is None:
+            procesos = PROCESOS_APP
+        if procesos <= 0:
+            procesos = os.cpu_count() or 1
+        self.procesos = procesos
+        self.max_por_usuario = max_por_usuario
+        self.tamano_max = tamano_max
+
+        self._contexto = multiprocessing.get_context("spawn")
+        self._gestor = self._contexto.Manager()
+        self._cancelados = self._gestor.dict()
+        self._canal = self._contexto.Queue()
+        self._cerrojo = threading.RLock()
+        self._colas: Dict[str, Deque[TrabajoAnalisis]] = {}
+        self._en_curso: Dict[str, int] = {}
+        self._trabajos: Dict[int, TrabajoAnalisis] = {}
+        self._ids = itertools.count(1)
+        self._pool = self._crear_pool()
+        self._receptor = threading.Thread(target=self._recibir, name="planificador-ici", daemon=True)
+        self._receptor.start()
+
+    def _crear_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(
+            max_workers=self.procesos,
+            mp_context=self._contexto,
+            initializer=_iniciar_proceso,
+            initargs=(self._canal, self._cancelados),
+        )
+        # Arranca los procesos y carga los módulos antes del primer trabajo.
+        for _ in range(self.procesos):
+            pool.submit(os.getpid)
+        return pool
+
+    # -------------------
+    # Cola
+    # -------------------
+
+    def encolar(self, trabajo: TrabajoAnalisis, usuario: str) -> TrabajoAnalisis:
+        """
+        Pone el trabajo en la cola de `usuario`. Lanza TrabajoRechazado si el
+        documento es demasiado grande o el usuario ya tiene su cupo.
+        """
+        if trabajo.tamano > self.tamano_max:
+            raise TrabajoRechazado(
+                f"El documento pesa {trabajo.tamano / 2**20:.1f} MB; el máximo por "
+                f"trabajo es {self.tamano_max / 2**20:.0f} MB."
+            )
+        with self._cerrojo:
+            propios = len(self._colas.get(usuario, ())) + self._en_curso.get(usuario, 0)
+            if propios >= self.max_por_usuario:
+                raise TrabajoRechazado(
+                    f"Ya tienes {propios} análisis en curso o en espera; espera a que "
+                    "termine alguno o cancélalo."
+                )
+            trabajo.id = next(self._ids)
+            trabajo.usuario = usuario
+            trabajo._planificador = self
+            self._colas.setdefault(usuario, deque()).append(trabajo)
+            self._despachar()
+        return trabajo
+
+    def cancelar(self, trabajo: TrabajoAnalisis) -> None:
+        with self._cerrojo:
+            cola = self._colas.get(trabajo.usuario)
+            if cola is not None and trabajo in cola:
+                cola.remove(trabajo)
+                trabajo._finalizar("cancelado")
+            elif trabajo.id in self._trabajos:
+                self._cancelados[trabajo.id] = True
+
+    def posicion(self, trabajo: TrabajoAnalisis) -> Optional[int]:
+        """
+        Trabajos en espera que pasarán antes que `trabajo` si ninguno de los
+        que están en curso termina antes; None si no está en la cola.
+        """
+        with self._cerrojo:
+            if trabajo not in self._colas.get(trabajo.usuario, ()):
+                return None
+            colas = {usuario: list(cola) for usuario, cola in self._colas.items()}
+            en_curso = dict(self._en_curso)
+        delante = 0
+        while True:
+            usuario = _siguiente(colas, en_curso)
+            if colas[usuario].pop(0) is trabajo:
+                return delante
+            en_curso[usuario] = en_curso.get(usuario, 0) + 1
+            delante += 1
+
+    def estado(self) -> Dict[str, Any]:
+        with self._cerrojo:
+            return {
+                "procesos": self.procesos,
+                "en_curso": sum(self._en_curso.values()),
+                "en_espera": sum(len(cola) for cola in self._colas.values()),
+                "usuarios": len({u for u, c in self._colas.items() if c} | set(self._en_curso)),
+            }
+
+    def _despachar(self) -> None:
+        # Con el cerrojo tomado: llena los procesos libres.
+        while sum(self._en_curso.values()) < self.procesos and any(self._colas.values()):
+            usuario = _siguiente(self._colas, self._en_curso)
+            trabajo = self._colas[usuario].popleft()
+            self._en_curso[usuario] = self._en_curso.get(usuario, 0) + 1
+            self._trabajos[trabajo.id] = trabajo
+            trabajo.estado = "en_curso"
+            argumentos = (trabajo.id, trabajo._datos, trabajo.nombre, trabajo.secciones, trabajo.diagnostico)
+            trabajo._datos = None
+            try:
+                futuro = self._pool.submit(_trabajo_en_proceso, *argumentos)
+            except BrokenProcessPool:
+                self._recrear_pool(self._pool)
+                futuro = self._pool.submit(_trabajo_en_proceso, *argumentos)
+            futuro.add_done_callback(partial(self._al_terminar, trabajo, self._pool))
+
+    def _al_terminar(self, trabajo: TrabajoAnalisis, pool: ProcessPoolExecutor, futuro: Future) -> None:
+        error = None if futuro.cancelled() else futuro.exception()
+        with self._cerrojo:
+            quedan = self._en_curso[trabajo.usuario] - 1
+            if quedan:
+                self._en_curso[trabajo.usuario] = quedan
+            else:
+                del self._en_curso[trabajo.usuario]
+            if error is not None:
+                # El proceso murió sin enviar el final (p. ej. por falta de memoria).
+                self._trabajos.pop(trabajo.id, None)
+                self._cancelados.pop(trabajo.id, None)
+                trabajo._finalizar("error", f"{type(error).__name__}: {error}")
+                if isinstance(error, BrokenProcessPool):
+                    self._recrear_pool(pool)
+            self._despachar()
+
+    def _recrear_pool(self, roto: ProcessPoolExecutor) -> None:
+        # Con el cerrojo tomado. Un proceso murió: el pool queda inservible y
+        # se reemplaza una sola vez; los trabajos que tenía fallan.
+        if self._pool is not roto:
+            return
+        self._pool = self._crear_pool()
+        roto.shutdown(wait=False, cancel_futures=True)
+
+    # -------------------
+    # Avance (hilo receptor)
+    # -------------------
+
+    def _recibir(self) -> None:
+        while True:
+            mensaje = self._canal.get()
+            if mensaje is None:
+                return
+            tipo, id_trabajo, *contenido = mensaje
+            with self._cerrojo:
+                trabajo = self._trabajos.get(id_trabajo)
+                if tipo == "fin":
+                    self._trabajos.pop(id_trabajo, None)
+                    self._cancelados.pop(id_trabajo, None)
+            if trabajo is None:
+                continue
+            if tipo == "avance":
+                trabajo._registrar(*contenido)
+            elif tipo == "publicar":
+                trabajo._publicar(*contenido)
+            else:
+                trabajo._finalizar(*contenido)
+
+    def cerrar(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._canal.put(None)
+        self._receptor.join()
+        self._gestor.shutdown()